@@ -3,13 +3,19 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 from sklearn.cluster import KMeans
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
+import medical_ai_core
+from cohort_cache import load_cohort
+from forest_inference import CompiledForest
+from metrics_engine import format_interval
+from model_registry import ModelRegistry
+from synthetic_data import FEATURE_COLUMNS, generate_cohort, memory_footprint, with_patient_ids
+from training_service import TrainingService
+
 # Import analytics and feedback systems (lazy loading)
 import importlib
+import time
 
 # Page configuration
 st.set_page_config(
@@ -49,6 +55,15 @@ def setup_google_analytics():
     except Exception as e:
         return None
 
+@st.cache_resource
+def get_training_service():
+    """Process-wide background training service backed by the model registry"""
+    try:
+        registry = ModelRegistry()
+    except OSError:
+        registry = None  # Read-only filesystem: train in memory only
+    return TrainingService(registry=registry)
+
 def track_event_safe(event_name, **kwargs):
     """Safe event tracking with lazy loading"""
     try:
@@ -90,61 +105,76 @@ st.info(
 
 
 # Generate synthetic medical data for ML demonstration
-@st.cache_data
-def generate_synthetic_data(n_patients=100):
+def generate_synthetic_data(n_patients=100, seed=42):
     """Generate synthetic medical data for educational purposes."""
-    np.random.seed(42)  # For reproducible results
-
-    data = {
-        "Patient_ID": [f"P{i:03d}" for i in range(1, n_patients + 1)],
-        "Age": np.random.randint(18, 85, n_patients),
-        "Heart_Rate": np.random.normal(75, 12, n_patients).astype(int),
-        "Systolic_BP": np.random.normal(120, 15, n_patients).astype(int),
-        "Diastolic_BP": np.random.normal(80, 10, n_patients).astype(int),
-        "Temperature": np.random.normal(98.6, 1.2, n_patients).round(1),
-        "Blood_Sugar": np.random.normal(100, 20, n_patients).astype(int),
-    }
-
-    # Create risk categories based on multiple factors
-    risk_scores = []
-    for i in range(n_patients):
-        score = 0
-        if data["Age"][i] > 65:
-            score += 2
-        if data["Heart_Rate"][i] > 100 or data["Heart_Rate"][i] < 60:
-            score += 1
-        if data["Systolic_BP"][i] > 140:
-            score += 2
-        if data["Diastolic_BP"][i] > 90:
-            score += 1
-        if data["Blood_Sugar"][i] > 126:
-            score += 1
-        risk_scores.append(score)
-
-    # Convert scores to categories
-    conditions = []
-    for score in risk_scores:
-        if score <= 1:
-            conditions.append("Low Risk")
-        elif score <= 3:
-            conditions.append("Medium Risk")
-        else:
-            conditions.append("High Risk")
+    return medical_ai_core.generate_synthetic_data(n_patients, seed=seed)
+
 
-    data["Risk_Category"] = conditions
-    data["Risk_Score"] = risk_scores
+def _read_only(df):
+    """Rebuild a frame over read-only views of its NumPy columns (no data is copied)."""
+    columns = {}
+    for name in df.columns:
+        values = df[name].values
+        if isinstance(values, np.ndarray):
+            values = values.view()
+            values.flags.writeable = False
+        columns[name] = values
+    frame = pd.DataFrame(columns, index=df.index, copy=False)
+    frame.attrs.update(df.attrs)
+    return frame
 
-    return pd.DataFrame(data)
 
+@st.cache_resource
+def _shared_cohort(n_patients=100, seed=42):
+    """One immutable cohort per process, memory-mapped from the disk cache when possible."""
+    try:
+        return load_cohort(n_patients, seed=seed)
+    except OSError:
+        # Read-only or full disk: keep the shared cohort in process memory only
+        return _read_only(generate_cohort(n_patients, seed=seed))
 
-# Generate the dataset
-df = generate_synthetic_data()
+
+@st.cache_resource
+def get_patient_scorer(job_key, _training_result):
+    """Compiled single-row scorer for a finished training job, built once per model."""
+    registered = _training_result["registered_model"]
+    if registered is not None:
+        return CompiledForest.from_registered(registered)
+    return CompiledForest.from_risk_model(_training_result["risk_model"])
+
+
+# Slider (min, max, step) for each vital in the patient scoring panel
+PATIENT_SLIDER_RANGES = {
+    "Age": (18, 85, 1),
+    "Heart_Rate": (30, 180, 1),
+    "Systolic_BP": (80, 200, 1),
+    "Diastolic_BP": (40, 120, 1),
+    "Temperature": (94.0, 104.0, 0.1),
+    "Blood_Sugar": (40, 250, 1),
+}
+
+
+def get_cohort(n_patients=100, seed=42):
+    """Return a zero-copy view of the shared, read-only cohort.
+
+    Every session and rerun gets a shallow copy of the same buffers. With
+    Copy-on-Write (pandas >= 3) an in-place edit copies the edited column;
+    without it the edit raises, since the shared buffers are read-only.
+    """
+    return _shared_cohort(n_patients, seed).copy(deep=False)
+
+
+# Get the dataset
+df = get_cohort()
 
 st.subheader("📊 Synthetic Patient Dataset")
-st.write(f"**Dataset size:** {len(df)} patients | **Features:** {len(df.columns)-2} clinical measurements")
+st.write(
+    f"**Dataset size:** {len(df)} patients | **Features:** {len(df.columns.drop(['Patient_ID', 'Risk_Category'], errors='ignore'))} clinical measurements"
+    f" | **Memory:** {memory_footprint(df) / 1024:.1f} KB"
+)
 
 # Display sample of the data
-st.dataframe(df.head(10), use_container_width=True)
+st.dataframe(with_patient_ids(df.head(10)), use_container_width=True)
 
 # Add key metrics
 col1, col2, col3, col4 = st.columns(4)
@@ -169,7 +199,7 @@ st.bar_chart(risk_counts)
 
 # Correlation Analysis
 st.subheader("🔗 Clinical Parameter Correlations")
-numeric_cols = ["Age", "Heart_Rate", "Systolic_BP", "Diastolic_BP", "Temperature", "Blood_Sugar"]
+numeric_cols = FEATURE_COLUMNS
 corr_matrix = df[numeric_cols].corr()
 st.write("**Correlation Matrix:**")
 st.dataframe(corr_matrix.style.background_gradient(cmap="coolwarm"), use_container_width=True)
@@ -192,8 +222,7 @@ with st.expander("🔍 View Model Training Process"):
     track_event_safe('model_training_viewed', 
                     event_category='ML_Features',
                     event_label='Random Forest Training')
-    # Prepare features for ML
-    X = df[numeric_cols]
+    # Prepare labels for ML
     y = df["Risk_Category"]
 
     # Show class distribution
@@ -210,33 +239,30 @@ with st.expander("🔍 View Model Training Process"):
         high_pct = (class_dist.get("High Risk", 0) / len(y)) * 100
         st.metric("High Risk", f"{class_dist.get('High Risk', 0)}", f"{high_pct:.1f}%")
 
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42, stratify=y)
-
-    # Scale features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-
     # Train Random Forest model with class weights
     st.write("⚖️ **Using Class Weights for Better Medical AI:**")
     st.write("- Automatically balances learning for rare but critical high-risk cases")
     st.write("- Maintains realistic data distribution while improving minority class detection")
 
-    rf_model = RandomForestClassifier(
-        n_estimators=100, random_state=42, class_weight="balanced"  # This is the key improvement!
+    # Trained once per process on a background thread, keyed by dataset and hyperparameters
+    training_job = get_training_service().submit(
+        df, test_size=0.3, random_state=42,
+        n_estimators=100, class_weight="balanced"  # This is the key improvement!
     )
-    rf_model.fit(X_train_scaled, y_train)
-
-    # Make predictions
-    y_pred = rf_model.predict(X_test_scaled)
-    accuracy = accuracy_score(y_test, y_pred)
-
-    # Calculate detailed metrics
-    from sklearn.metrics import f1_score
-
-    f1_macro = f1_score(y_test, y_pred, average="macro")
-    f1_weighted = f1_score(y_test, y_pred, average="weighted")
+    if not training_job.done:
+        progress_bar = st.progress(0.0, text="Training risk model...")
+        while not training_job.done:
+            progress_bar.progress(training_job.progress, text=f"Training risk model... {training_job.progress:.0%}")
+            time.sleep(0.1)
+        progress_bar.empty()
+    training_result = training_job.wait()
+
+    # Predictions and detailed metrics on the held-out set
+    risk_model = training_result["risk_model"]
+    metrics = training_result["metrics"]
+    accuracy = metrics["accuracy"]
+    f1_macro = metrics["f1_macro"]
+    f1_weighted = metrics["f1_weighted"]
 
     # Display comprehensive results
     st.write("🎯 **Model Performance (Clinically Optimized):**")
@@ -250,6 +276,15 @@ with st.expander("🔍 View Model Training Process"):
     with metric_col3:
         st.metric("Weighted F1 Score", f"{f1_weighted:.1%}")
 
+    # Bootstrap uncertainty of the held-out estimates
+    intervals = training_result["confidence_intervals"]
+    interval_lines = [f"Accuracy {format_interval(intervals['accuracy'])}",
+                      f"Macro F1 {format_interval(intervals['f1_macro'])}"]
+    if "f1_high_risk" in intervals:
+        interval_lines.append(f"High Risk F1 {format_interval(intervals['f1_high_risk'])}")
+    st.caption(f"📐 95% bootstrap confidence intervals ({len(training_result['y_test'])} test patients): "
+               + " | ".join(interval_lines))
+
     # Performance interpretation
     if f1_macro >= 0.80:
         st.success("✅ **Excellent Performance**: F1 score > 80% indicates excellent clinical AI performance")
@@ -261,28 +296,23 @@ with st.expander("🔍 View Model Training Process"):
         st.error("❌ **Poor Performance**: F1 score < 60% indicates poor clinical AI performance")
 
     st.write("📄 **Detailed Classification Report:**")
-    st.text(classification_report(y_test, y_pred))
+    st.text(metrics["report"])
 
     # Per-class performance analysis
     st.write("🏥 **Clinical Impact Analysis:**")
-    f1_per_class = f1_score(y_test, y_pred, average=None)
-    unique_classes = sorted(y.unique())
-
-    for i, class_name in enumerate(unique_classes):
+    for class_name, class_f1 in metrics["f1_per_class"].items():
         if class_name == "High Risk":
-            if f1_per_class[i] >= 0.70:
-                st.success(f"🚨 **{class_name}**: {f1_per_class[i]:.1%} F1 - Excellent detection of critical cases")
-            elif f1_per_class[i] >= 0.50:
-                st.warning(f"🚨 **{class_name}**: {f1_per_class[i]:.1%} F1 - Adequate detection of critical cases")
+            if class_f1 >= 0.70:
+                st.success(f"🚨 **{class_name}**: {class_f1:.1%} F1 - Excellent detection of critical cases")
+            elif class_f1 >= 0.50:
+                st.warning(f"🚨 **{class_name}**: {class_f1:.1%} F1 - Adequate detection of critical cases")
             else:
-                st.error(f"🚨 **{class_name}**: {f1_per_class[i]:.1%} F1 - Poor detection of critical cases")
+                st.error(f"🚨 **{class_name}**: {class_f1:.1%} F1 - Poor detection of critical cases")
         else:
-            st.write(f"📊 **{class_name}**: {f1_per_class[i]:.1%} F1 score")
+            st.write(f"📊 **{class_name}**: {class_f1:.1%} F1 score")
 
     # Feature importance
-    feature_importance = pd.DataFrame(
-        {"Feature": numeric_cols, "Importance": rf_model.feature_importances_}
-    ).sort_values("Importance", ascending=False)
+    feature_importance = risk_model.feature_importance()
 
     st.write("🔍 **Most Important Clinical Features:**")
     st.bar_chart(feature_importance.set_index("Feature"))
@@ -294,6 +324,64 @@ with st.expander("🔍 View Model Training Process"):
         f"💡 **Key Clinical Insight**: {top_feature} is the most predictive feature ({top_importance:.1%} importance)"
     )
 
+# High Risk operating point, recomputed from the cached held-out probabilities
+threshold_curve = training_result["threshold_curve"]
+if threshold_curve is not None:
+    st.subheader("🎚️ High Risk Decision Threshold")
+    st.write(
+        "Flag a patient as High Risk when its predicted probability reaches the threshold; "
+        "lower thresholds catch more critical cases at the cost of more false alarms."
+    )
+    high_risk_threshold = st.slider("High Risk probability threshold", 0.0, 1.0, 0.5, 0.01,
+                                    key="high_risk_threshold")
+    operating_point = threshold_curve.metrics_at(high_risk_threshold)
+
+    # Reference: the model's default most-probable-class decision
+    default_cm = metrics["confusion_matrix"]
+    high_index = metrics["labels"].index("High Risk")
+    default_recall = default_cm[high_index, high_index] / max(default_cm[high_index].sum(), 1)
+    default_precision = default_cm[high_index, high_index] / max(default_cm[:, high_index].sum(), 1)
+
+    threshold_col1, threshold_col2, threshold_col3 = st.columns(3)
+    with threshold_col1:
+        st.metric("High Risk Recall", f"{operating_point['recall']:.1%}",
+                  f"{operating_point['recall'] - default_recall:+.1%} vs default")
+    with threshold_col2:
+        st.metric("High Risk Precision", f"{operating_point['precision']:.1%}",
+                  f"{operating_point['precision'] - default_precision:+.1%} vs default")
+    with threshold_col3:
+        st.metric("Flagged as High Risk", f"{operating_point['n_flagged']}",
+                  f"of {len(training_result['y_test'])} test patients", delta_color="off")
+
+    st.write("🧮 **Confusion Matrix at this threshold** (rows: true risk, columns: predicted risk):")
+    st.dataframe(pd.DataFrame(operating_point["confusion_matrix"], index=threshold_curve.labels,
+                              columns=threshold_curve.labels))
+    st.line_chart(threshold_curve.curve().set_index("threshold")[["recall", "precision"]])
+
+# Interactive single-patient scoring with the already trained model
+st.subheader("🩺 Score a Patient")
+st.write("Adjust the vitals of a synthetic patient to see the model's risk assessment update live.")
+
+patient_scorer = get_patient_scorer(training_job.key, training_result)
+vitals = {}
+slider_cols = st.columns(3)
+for i, (feature, (low, high, step)) in enumerate(PATIENT_SLIDER_RANGES.items()):
+    default = float(df[feature].median()) if step < 1 else int(df[feature].median())
+    with slider_cols[i % 3]:
+        vitals[feature] = st.slider(feature.replace("_", " "), low, high, default, step, key=f"score_{feature}")
+
+score_start = time.perf_counter()
+patient_proba = patient_scorer.predict_proba([vitals[feature] for feature in FEATURE_COLUMNS])[0]
+score_latency_ms = (time.perf_counter() - score_start) * 1000
+patient_risk = patient_scorer.classes_[patient_proba.argmax()]
+
+score_col1, score_col2 = st.columns(2)
+with score_col1:
+    st.metric("Predicted Risk", patient_risk, f"{patient_proba.max():.0%} confidence", delta_color="off")
+with score_col2:
+    st.metric("Scoring Latency", f"{score_latency_ms:.2f} ms")
+st.bar_chart(pd.Series(patient_proba, index=patient_scorer.classes_, name="Probability"))
+
 # Clustering Analysis
 st.subheader("🔍 Patient Clustering Analysis")
 with st.expander("📏 View Clustering Results"):
@@ -312,9 +400,8 @@ with st.expander("📏 View Clustering Results"):
     kmeans = KMeans(n_clusters=3, random_state=42)
     clusters = kmeans.fit_predict(X_scaled)
 
-    # Add cluster labels to dataframe
-    df_clustered = df.copy()
-    df_clustered["Cluster"] = [f"Group {i+1}" for i in clusters]
+    # Add cluster labels (copy-on-write: only the new column is allocated)
+    df_clustered = df.assign(Cluster=[f"Group {i+1}" for i in clusters])
 
     # Show cluster statistics
     st.write("📏 **Cluster Distribution:**")
@@ -0,0 +1,292 @@
+"""
+Persistent, content-addressed cache of synthetic cohorts.
+
+Each cohort is stored as one ``.npy`` file per column in a directory named
+after a hash of (generator version, n_patients, seed, params). Cached
+cohorts are opened with ``mmap_mode="r"``, so repeated loads take
+milliseconds and every process reading the same cohort shares the same
+page-cache pages. Both standard and compact cohorts load entirely from
+the maps: Risk_Category is a categorical over the stored codes and the
+Patient_ID strings are not materialized (see ``frame_patient_ids``).
+Cohorts of one seed are prefixes of each other, so a smaller cohort is
+served as a view of a larger cached one, and a cached cohort is grown by
+appending the new rows to its column files in place. Entries are evicted
+least-recently-used once the cache grows past its size limit.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic_data import GENERATOR_VERSION, RISK_DTYPE, generate_cohort, generate_rows
+
+# Cache location, overridable with the NINO_COHORT_CACHE environment variable
+DEFAULT_CACHE_DIR = os.environ.get("NINO_COHORT_CACHE", ".cohort_cache")
+
+# Total size of cached cohorts before LRU eviction kicks in
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+_META_FILE = "meta.json"
+
+
+def _column_arrays(df):
+    """Yield the stored (name, array) pairs of a cohort frame (Patient_IDs are derived)."""
+    for name in df.columns:
+        if name == "Patient_ID":
+            continue
+        if name == "Risk_Category":
+            yield name, pd.Categorical(df[name], dtype=RISK_DTYPE).codes
+        else:
+            yield name, df[name].to_numpy()
+
+
+def _append_npy(path, array, n_rows):
+    """Write ``array`` after the first ``n_rows`` rows of a 1-D ``.npy`` file, in place.
+
+    Only the new rows and the header are written: ``np.save`` pads the
+    header so the shape can grow without moving the data. Rows past
+    ``n_rows`` (left by an interrupted append) are truncated first.
+    """
+    with open(path, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        read_header, write_header = {
+            (1, 0): (np.lib.format.read_array_header_1_0, np.lib.format.write_array_header_1_0),
+            (2, 0): (np.lib.format.read_array_header_2_0, np.lib.format.write_array_header_2_0),
+        }[version]
+        shape, fortran_order, dtype = read_header(f)
+        data_offset = f.tell()
+        if len(shape) != 1 or shape[0] < n_rows or dtype != array.dtype:
+            raise ValueError(f"Cannot append {array.dtype} rows to {path} ({dtype}, shape {shape})")
+
+        f.seek(data_offset + n_rows * dtype.itemsize)
+        f.truncate()
+        f.write(np.ascontiguousarray(array).tobytes())
+
+        header = io.BytesIO()
+        write_header(header, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": fortran_order,
+                              "shape": (n_rows + len(array),)})
+        if header.tell() != data_offset:
+            raise ValueError(f"No room to grow the header of {path}")
+        f.seek(0)
+        f.write(header.getvalue())
+
+
+class CohortCache:
+    """Disk cache of memory-mapped synthetic cohorts with LRU eviction."""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(n_patients, seed=42, **params):
+        """Return the content address of a cohort."""
+        spec = {"version": GENERATOR_VERSION, "n_patients": n_patients, "seed": seed, "params": params}
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, n_patients, seed=42, compact=False):
+        """Open a cached cohort memory-mapped, or return None on a miss.
+
+        Without an exact entry, the first ``n_patients`` rows of the
+        smallest larger cohort with the same seed are returned. No column
+        is copied: Risk_Category is a categorical over the mapped codes and
+        standard cohorts come without Patient_ID (``frame_patient_ids``
+        derives it from the index).
+        """
+        key = self.key(n_patients, seed, compact=compact)
+        if not os.path.exists(os.path.join(self._entry_dir(key), _META_FILE)):
+            larger = [meta for meta in self.entries()
+                      if meta["version"] == GENERATOR_VERSION and meta["seed"] == seed
+                      and meta["params"] == {"compact": compact} and meta["n_patients"] > n_patients]
+            if not larger:
+                return None
+            key = min(larger, key=lambda meta: meta["n_patients"])["key"]
+
+        entry = self._entry_dir(key)
+        meta_path = os.path.join(entry, _META_FILE)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        columns = {}
+        for name in meta["columns"]:
+            # Plain ndarray view over the read-only memory map (no copy); column files
+            # may hold rows past the entry's size from an interrupted append
+            array = np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r").view(np.ndarray)[:n_patients]
+            if name == "Risk_Category":
+                array = pd.Categorical.from_codes(array, dtype=RISK_DTYPE)
+            columns[name] = array
+
+        # Mark as recently used for LRU eviction
+        os.utime(meta_path)
+        df = pd.DataFrame(columns, index=pd.RangeIndex(n_patients), copy=False)
+        df.attrs["seed"] = seed
+        # The saved stream state is only valid at the entry's own size
+        df.attrs["cohort_stream"] = meta.get("stream_state") if meta["n_patients"] == n_patients else None
+        return df
+
+    def put(self, df, n_patients, seed=42, compact=False):
+        """Store a cohort frame and evict old entries if over the size limit."""
+        key = self.key(n_patients, seed, compact=compact)
+        tmp_dir = tempfile.mkdtemp(prefix=f".{key}-", dir=self.cache_dir)
+        try:
+            names = []
+            size = 0
+            for name, array in _column_arrays(df):
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+                names.append(name)
+                size += array.nbytes
+
+            meta = {
+                "key": key,
+                "version": GENERATOR_VERSION,
+                "n_patients": n_patients,
+                "seed": seed,
+                "params": {"compact": compact},
+                "columns": names,
+                "bytes": size,
+                "created": time.time(),
+                "stream_state": df.attrs.get("cohort_stream"),
+            }
+            self._write_meta(tmp_dir, meta)
+
+            try:
+                os.replace(tmp_dir, self._entry_dir(key))
+            except OSError:
+                # Another process stored the same cohort first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        self.evict(keep=key)
+        return key
+
+    def load_cohort(self, n_patients, seed=42, compact=False, n_jobs=None):
+        """Return a cached cohort, generating and storing it on a miss.
+
+        On a miss, the largest smaller cached cohort with the same seed is
+        extended instead of regenerating from scratch.
+        """
+        df = self.get(n_patients, seed, compact)
+        if df is not None:
+            return df
+
+        smaller = [
+            meta
+            for meta in self.entries()
+            if meta["version"] == GENERATOR_VERSION
+            and meta["seed"] == seed
+            and meta["params"] == {"compact": compact}
+            and meta["n_patients"] < n_patients
+        ]
+        if smaller:
+            meta = max(smaller, key=lambda meta: meta["n_patients"])
+            return self._grow(meta, n_patients - meta["n_patients"], seed, compact)
+
+        self.put(generate_cohort(n_patients, seed=seed, n_jobs=n_jobs, compact=compact), n_patients, seed, compact)
+        return self.get(n_patients, seed, compact)
+
+    def extend(self, n_patients, k, seed=42, compact=False):
+        """Grow the cached ``n_patients`` cohort by ``k`` patients in place.
+
+        Only the ``k`` new rows are generated, continuing the saved RNG
+        substreams, and appended to the entry's column files; the existing
+        rows are never rewritten. The entry is then renamed to the larger
+        cohort's key and still serves the smaller cohort as a prefix.
+        """
+        entry = self._entry_dir(self.key(n_patients, seed, compact=compact))
+        try:
+            with open(os.path.join(entry, _META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return self.load_cohort(n_patients + k, seed, compact)
+        meta["key"] = os.path.basename(entry)
+        return self._grow(meta, k, seed, compact)
+
+    def _grow(self, meta, k, seed, compact):
+        """Append ``k`` rows to the entry described by ``meta`` and rename it (see ``extend``)."""
+        n_patients = meta["n_patients"]
+        entry = self._entry_dir(meta["key"])
+        new_key = self.key(n_patients + k, seed, compact=compact)
+        if os.path.exists(self._entry_dir(new_key)):
+            return self.get(n_patients + k, seed, compact)
+
+        new_rows, state = generate_rows(n_patients, k, seed, meta.get("stream_state"), compact)
+        for name, array in _column_arrays(new_rows):
+            _append_npy(os.path.join(entry, f"{name}.npy"), array, n_patients)
+            meta["bytes"] += array.nbytes
+        meta.update(key=new_key, n_patients=n_patients + k, stream_state=state)
+        meta.pop("last_used", None)
+        self._write_meta(entry, meta)
+
+        try:
+            os.rename(entry, self._entry_dir(new_key))
+        except OSError:
+            # Another process stored the larger cohort first
+            shutil.rmtree(entry, ignore_errors=True)
+        self.evict(keep=new_key)
+        return self.get(n_patients + k, seed, compact)
+
+    @staticmethod
+    def _write_meta(entry, meta):
+        """Atomically (re)write an entry's metadata."""
+        fd, tmp_path = tempfile.mkstemp(prefix=".meta-", suffix=".json", dir=entry)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(entry, _META_FILE))
+
+    def entries(self):
+        """Return metadata for every cached cohort, least recently used first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            meta_path = os.path.join(self.cache_dir, name, _META_FILE)
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                meta["last_used"] = os.path.getmtime(meta_path)
+                # The directory is authoritative if a rename after an extend was interrupted
+                meta["key"] = name
+            except (OSError, ValueError):
+                continue
+            entries.append(meta)
+        return sorted(entries, key=lambda meta: meta["last_used"])
+
+    def size_bytes(self):
+        """Return the total size of cached cohort columns."""
+        return sum(meta["bytes"] for meta in self.entries())
+
+    def evict(self, keep=None):
+        """Remove least-recently-used cohorts until under ``max_bytes``."""
+        entries = self.entries()
+        total = sum(meta["bytes"] for meta in entries)
+        for meta in entries:
+            if total <= self.max_bytes:
+                break
+            if meta["key"] == keep:
+                continue
+            shutil.rmtree(self._entry_dir(meta["key"]), ignore_errors=True)
+            total -= meta["bytes"]
+
+    def clear(self):
+        """Remove every cached cohort."""
+        for meta in self.entries():
+            shutil.rmtree(self._entry_dir(meta["key"]), ignore_errors=True)
+
+
+def load_cohort(n_patients, seed=42, compact=False, n_jobs=None, cache_dir=None):
+    """Load a cohort through the default on-disk cache."""
+    return CohortCache(cache_dir).load_cohort(n_patients, seed=seed, compact=compact, n_jobs=n_jobs)
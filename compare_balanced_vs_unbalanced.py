@@ -2,119 +2,96 @@
 Compare Balanced vs Unbalanced Dataset Performance for Medical AI
 """
 
+import argparse
+import itertools
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, classification_report, f1_score, confusion_matrix
+import imblearn
+import sklearn
 from sklearn.utils.class_weight import compute_class_weight
 from imblearn.over_sampling import SMOTE
+from cross_validation import cross_validate, print_cv_summary
+from metrics_engine import bootstrap_confusion, format_interval
+from medical_ai_core import evaluate_predictions, split_dataset, train_risk_model
+from synthetic_data import GENERATOR_VERSION, generate_cohort, resolve_n_jobs
 import warnings
 warnings.filterwarnings('ignore')
 
 def generate_unbalanced_data(n_patients=500, random_state=42):
     """Generate realistic unbalanced medical data (like real world)."""
-    np.random.seed(random_state)
-    
-    data = {
-        "Patient_ID": [f"P{i:03d}" for i in range(1, n_patients + 1)],
-        "Age": np.random.randint(18, 85, n_patients),
-        "Heart_Rate": np.random.normal(75, 12, n_patients).astype(int),
-        "Systolic_BP": np.random.normal(120, 15, n_patients).astype(int),
-        "Diastolic_BP": np.random.normal(80, 10, n_patients).astype(int),
-        "Temperature": np.random.normal(98.6, 1.2, n_patients).round(1),
-        "Blood_Sugar": np.random.normal(100, 20, n_patients).astype(int),
-    }
-    
-    # Create realistic risk distribution (unbalanced - like real world)
-    risk_scores = []
-    for i in range(n_patients):
-        score = 0
-        if data["Age"][i] > 65: score += 2
-        if data["Heart_Rate"][i] > 100 or data["Heart_Rate"][i] < 60: score += 1
-        if data["Systolic_BP"][i] > 140: score += 2
-        if data["Diastolic_BP"][i] > 90: score += 1
-        if data["Blood_Sugar"][i] > 126: score += 1
-        risk_scores.append(score)
-    
-    conditions = []
-    for score in risk_scores:
-        if score <= 1:
-            conditions.append("Low Risk")
-        elif score <= 3:
-            conditions.append("Medium Risk")
-        else:
-            conditions.append("High Risk")
-    
-    data["Risk_Category"] = conditions
-    data["Risk_Score"] = risk_scores
-    
-    return pd.DataFrame(data)
+    # Realistic risk distribution (unbalanced - like real world), private RNG
+    return generate_cohort(n_patients, seed=random_state)
+
+# Per-class vitals for the artificially balanced cohort: (prefix, category, score, draws)
+BALANCED_CLASS_PROFILES = [
+    ("L", "Low Risk", 0, {
+        "Age": lambda rng, k: rng.integers(18, 50, k),  # Younger
+        "Heart_Rate": lambda rng, k: rng.integers(60, 90, k),  # Normal
+        "Systolic_BP": lambda rng, k: rng.integers(90, 120, k),  # Normal
+        "Diastolic_BP": lambda rng, k: rng.integers(60, 80, k),  # Normal
+        "Temperature": lambda rng, k: rng.normal(98.6, 0.5, k),  # Normal
+        "Blood_Sugar": lambda rng, k: rng.integers(80, 110, k),  # Normal
+    }),
+    ("M", "Medium Risk", 2, {
+        "Age": lambda rng, k: rng.integers(45, 70, k),  # Middle-aged
+        "Heart_Rate": lambda rng, k: rng.integers(55, 105, k),  # Slightly abnormal
+        "Systolic_BP": lambda rng, k: rng.integers(115, 145, k),  # Slightly high
+        "Diastolic_BP": lambda rng, k: rng.integers(75, 95, k),  # Slightly high
+        "Temperature": lambda rng, k: rng.normal(98.8, 0.8, k),  # Slightly elevated
+        "Blood_Sugar": lambda rng, k: rng.integers(95, 130, k),  # Slightly high
+    }),
+    ("H", "High Risk", 5, {
+        "Age": lambda rng, k: rng.integers(65, 85, k),  # Older
+        "Heart_Rate": lambda rng, k: rng.choice([45, 50, 55, 110, 120, 130], k),  # Abnormal
+        "Systolic_BP": lambda rng, k: rng.integers(140, 180, k),  # High
+        "Diastolic_BP": lambda rng, k: rng.integers(90, 120, k),  # High
+        "Temperature": lambda rng, k: rng.normal(99.2, 1.0, k),  # Elevated
+        "Blood_Sugar": lambda rng, k: rng.integers(125, 200, k),  # High
+    }),
+]
 
 def generate_balanced_data(n_patients=500, random_state=42):
-    """Generate artificially balanced data for comparison."""
-    np.random.seed(random_state)
+    """Generate artificially balanced data for comparison (at least one patient per risk class)."""
+    if n_patients < len(BALANCED_CLASS_PROFILES):
+        raise ValueError(f"A balanced cohort needs at least {len(BALANCED_CLASS_PROFILES)} patients "
+                         f"(one per risk class), got {n_patients}")
+    rng = np.random.default_rng(random_state)
     patients_per_class = n_patients // 3
     
-    all_data = []
-    
-    # Generate Low Risk patients
-    for i in range(patients_per_class):
-        patient = {
-            "Patient_ID": f"L{i:03d}",
-            "Age": np.random.randint(18, 50),  # Younger
-            "Heart_Rate": np.random.randint(60, 90),  # Normal
-            "Systolic_BP": np.random.randint(90, 120),  # Normal
-            "Diastolic_BP": np.random.randint(60, 80),  # Normal
-            "Temperature": np.random.normal(98.6, 0.5),  # Normal
-            "Blood_Sugar": np.random.randint(80, 110),  # Normal
-            "Risk_Category": "Low Risk",
-            "Risk_Score": 0
-        }
-        all_data.append(patient)
-    
-    # Generate Medium Risk patients
-    for i in range(patients_per_class):
-        patient = {
-            "Patient_ID": f"M{i:03d}",
-            "Age": np.random.randint(45, 70),  # Middle-aged
-            "Heart_Rate": np.random.randint(55, 105),  # Slightly abnormal
-            "Systolic_BP": np.random.randint(115, 145),  # Slightly high
-            "Diastolic_BP": np.random.randint(75, 95),  # Slightly high
-            "Temperature": np.random.normal(98.8, 0.8),  # Slightly elevated
-            "Blood_Sugar": np.random.randint(95, 130),  # Slightly high
-            "Risk_Category": "Medium Risk",
-            "Risk_Score": 2
-        }
-        all_data.append(patient)
-    
-    # Generate High Risk patients
-    for i in range(patients_per_class):
-        patient = {
-            "Patient_ID": f"H{i:03d}",
-            "Age": np.random.randint(65, 85),  # Older
-            "Heart_Rate": np.random.choice([45, 50, 55, 110, 120, 130]),  # Abnormal
-            "Systolic_BP": np.random.randint(140, 180),  # High
-            "Diastolic_BP": np.random.randint(90, 120),  # High
-            "Temperature": np.random.normal(99.2, 1.0),  # Elevated
-            "Blood_Sugar": np.random.randint(125, 200),  # High
-            "Risk_Category": "High Risk",
-            "Risk_Score": 5
-        }
-        all_data.append(patient)
-    
-    # Add remaining patients to balance exactly
-    remaining = n_patients - len(all_data)
-    for i in range(remaining):
-        patient = all_data[i % len(all_data)].copy()
-        patient["Patient_ID"] = f"X{i:03d}"
-        all_data.append(patient)
-    
-    return pd.DataFrame(all_data)
+    # Draw each risk class as one vectorized block per column
+    columns = {"Patient_ID": [], "Risk_Category": [], "Risk_Score": []}
+    for prefix, category, score, draws in BALANCED_CLASS_PROFILES:
+        columns["Patient_ID"].append(np.array([f"{prefix}{i:03d}" for i in range(patients_per_class)], dtype=object))
+        for name, draw in draws.items():
+            columns.setdefault(name, []).append(draw(rng, patients_per_class))
+        columns["Risk_Category"].append(np.full(patients_per_class, category, dtype=object))
+        columns["Risk_Score"].append(np.full(patients_per_class, score))
+    
+    data = {name: np.concatenate(parts) for name, parts in columns.items()}
+    
+    # Add remaining patients to balance exactly by repeating the first rows
+    remaining = n_patients - 3 * patients_per_class
+    if remaining:
+        pad = np.arange(remaining) % (3 * patients_per_class)
+        for name in data:
+            data[name] = np.concatenate([data[name], data[name][pad]])
+        data["Patient_ID"][-remaining:] = [f"X{i:03d}" for i in range(remaining)]
+    
+    order = ["Patient_ID", "Age", "Heart_Rate", "Systolic_BP", "Diastolic_BP",
+             "Temperature", "Blood_Sugar", "Risk_Category", "Risk_Score"]
+    return pd.DataFrame({name: data[name] for name in order})
 
-def evaluate_dataset(df, dataset_name, use_class_weights=False):
-    """Evaluate a dataset and return performance metrics."""
+def evaluate_dataset(df, dataset_name, use_class_weights=False, cv_folds=None, n_jobs=None):
+    """Evaluate a dataset and return performance metrics.
+    
+    With ``cv_folds``, also run stratified cross-validation over ``n_jobs``
+    processes and return it under ``'cross_validation'``.
+    """
     print(f"\n{'='*60}")
     print(f"📊 {dataset_name}")
     print(f"{'='*60}")
@@ -133,18 +110,8 @@ def evaluate_dataset(df, dataset_name, use_class_weights=False):
     balance_ratio = min_class / max_class
     print(f"⚖️  Balance Ratio: {balance_ratio:.3f} (1.0 = perfectly balanced)")
     
-    # Prepare features
-    numeric_cols = ['Age', 'Heart_Rate', 'Systolic_BP', 'Diastolic_BP', 'Temperature', 'Blood_Sugar']
-    X = df[numeric_cols]
-    y = df['Risk_Category']
-    
     # Split data
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42, stratify=y)
-    
-    # Scale features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    X_train, X_test, y_train, y_test = split_dataset(df, test_size=0.3, random_state=42)
     
     # Set up class weights if requested
     class_weight = None
@@ -154,26 +121,22 @@ def evaluate_dataset(df, dataset_name, use_class_weights=False):
         class_weight = dict(zip(classes, weights))
         print(f"🏋️  Using Class Weights: {class_weight}")
     
-    # Train model
-    rf_model = RandomForestClassifier(
-        n_estimators=100, 
-        random_state=42,
-        class_weight=class_weight
-    )
-    rf_model.fit(X_train_scaled, y_train)
+    # Scale features and train model
+    risk_model = train_risk_model(X_train, y_train, n_estimators=100, random_state=42, class_weight=class_weight)
     
     # Make predictions
-    y_pred = rf_model.predict(X_test_scaled)
+    y_pred = risk_model.predict(X_test)
     
     # Calculate metrics
-    accuracy = accuracy_score(y_test, y_pred)
-    f1_macro = f1_score(y_test, y_pred, average='macro')
-    f1_weighted = f1_score(y_test, y_pred, average='weighted')
-    f1_micro = f1_score(y_test, y_pred, average='micro')
+    metrics = evaluate_predictions(y_test, y_pred)
+    accuracy = metrics['accuracy']
+    f1_macro = metrics['f1_macro']
+    f1_weighted = metrics['f1_weighted']
+    f1_micro = metrics['f1_micro']
     
     # Per-class F1 scores
-    f1_per_class = f1_score(y_test, y_pred, average=None)
-    unique_classes = sorted(y.unique())
+    class_f1_dict = metrics['f1_per_class']
+    unique_classes = metrics['labels']
     
     print(f"\n🤖 Performance Metrics:")
     print(f"   Overall Accuracy:    {accuracy:.3f} ({accuracy:.1%})")
@@ -182,83 +145,212 @@ def evaluate_dataset(df, dataset_name, use_class_weights=False):
     print(f"   Micro F1 Score:      {f1_micro:.3f} ({f1_micro:.1%})")
     
     print(f"\n📊 Per-Class F1 Scores:")
-    class_f1_dict = {}
-    for i, class_name in enumerate(unique_classes):
-        class_f1_dict[class_name] = f1_per_class[i]
-        print(f"   • {class_name:12s}: {f1_per_class[i]:.3f} ({f1_per_class[i]:.1%})")
+    for class_name, class_f1 in class_f1_dict.items():
+        print(f"   • {class_name:12s}: {class_f1:.3f} ({class_f1:.1%})")
     
     # Confusion Matrix
-    cm = confusion_matrix(y_test, y_pred, labels=unique_classes)
+    cm = metrics['confusion_matrix']
     print(f"\n🔍 Confusion Matrix:")
     print(f"   Predicted:  {' '.join([f'{cls:>8s}' for cls in unique_classes])}")
     for i, true_class in enumerate(unique_classes):
         row = ' '.join([f'{cm[i][j]:8d}' for j in range(len(unique_classes))])
         print(f"   {true_class:9s}: {row}")
     
-    return {
+    # Bootstrap confidence intervals of the test-set estimates
+    intervals = bootstrap_confusion(cm, unique_classes, n_jobs=n_jobs)
+    print(f"\n📐 95% Bootstrap Confidence Intervals:")
+    for name, label in [('accuracy', 'Accuracy'), ('f1_macro', 'Macro F1'), ('f1_high_risk', 'High Risk F1')]:
+        if name in intervals:
+            print(f"   {label + ':':20s} {format_interval(intervals[name], percent=False)}")
+    
+    results = {
         'accuracy': accuracy,
         'f1_macro': f1_macro,
         'f1_weighted': f1_weighted,
         'f1_micro': f1_micro,
         'f1_per_class': class_f1_dict,
         'balance_ratio': balance_ratio,
-        'class_distribution': risk_dist.to_dict()
+        'class_distribution': risk_dist.to_dict(),
+        'confidence_intervals': intervals
     }
+    
+    # 'balanced' recomputes the same class weights from each fold's training labels
+    if cv_folds:
+        results['cross_validation'] = cross_validate(
+            df, n_splits=cv_folds, n_jobs=n_jobs, n_estimators=100, random_state=42,
+            class_weight='balanced' if use_class_weights else None
+        )
+        print_cv_summary(results['cross_validation'])
+    
+    return results
+
+# Experiment grid axes
+DATASET_VARIANTS = {
+    "unbalanced": generate_unbalanced_data,
+    "balanced": generate_balanced_data,
+}
+WEIGHTING_STRATEGIES = ["none", "class_weights", "smote"]
+
+# Cell checkpoint location, overridable with the NINO_EXPERIMENT_DIR environment variable
+DEFAULT_EXPERIMENT_DIR = os.environ.get("NINO_EXPERIMENT_DIR", ".experiments")
 
-def main():
+# Part of every checkpoint name, so cells from another generator or library version are recomputed
+CELL_VERSION = f"gen{GENERATOR_VERSION}-sklearn{sklearn.__version__}-imblearn{imblearn.__version__}"
+
+def run_cell(variant, weighting, n_patients, seed):
+    """Train and evaluate one grid cell quietly; ``seed`` drives data, split and model."""
+    df = DATASET_VARIANTS[variant](n_patients, random_state=seed)
+    risk_dist = df['Risk_Category'].value_counts()
+    X_train, X_test, y_train, y_test = split_dataset(df, test_size=0.3, random_state=seed)
+    
+    class_weight = None
+    if weighting == "class_weights":
+        classes = np.unique(y_train)
+        class_weight = dict(zip(classes, compute_class_weight('balanced', classes=classes, y=y_train)))
+    elif weighting == "smote":
+        # Oversample the training split only; SMOTE needs more minority samples than neighbours
+        k_neighbors = min(5, y_train.value_counts().min() - 1)
+        if k_neighbors >= 1:
+            X_train, y_train = SMOTE(k_neighbors=k_neighbors, random_state=seed).fit_resample(X_train, y_train)
+    
+    risk_model = train_risk_model(X_train, y_train, n_estimators=100, random_state=seed, class_weight=class_weight)
+    metrics = evaluate_predictions(y_test, risk_model.predict(X_test))
+    
+    return {
+        'variant': variant,
+        'weighting': weighting,
+        'n_patients': n_patients,
+        'seed': seed,
+        'accuracy': float(metrics['accuracy']),
+        'f1_macro': float(metrics['f1_macro']),
+        'f1_weighted': float(metrics['f1_weighted']),
+        'f1_high_risk': float(metrics['f1_per_class'].get('High Risk', 0.0)),
+        'balance_ratio': float(risk_dist.min() / risk_dist.max()),
+        'training_time': risk_model.training_time,
+    }
+
+def _cell_path(checkpoint_dir, variant, weighting, n_patients, seed):
+    return os.path.join(checkpoint_dir, f"{variant}-{weighting}-{n_patients}-{seed}-{CELL_VERSION}.json")
+
+def load_cell(checkpoint_dir, variant, weighting, n_patients, seed):
+    """Return a checkpointed cell result, or None if it was not computed yet."""
+    try:
+        with open(_cell_path(checkpoint_dir, variant, weighting, n_patients, seed), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_cell(checkpoint_dir, result):
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=checkpoint_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp_path, _cell_path(checkpoint_dir, result['variant'], result['weighting'],
+                                    result['n_patients'], result['seed']))
+
+def run_experiment_grid(variants=None, weightings=None, sizes=(500,), seeds=(42,), n_jobs=-1,
+                        checkpoint_dir=None, compute=True):
+    """Run every (variant, weighting, size, seed) cell and return one row per cell.
+    
+    Cells run in a process pool (inline for ``n_jobs=1``) and are
+    checkpointed as JSON as soon as they finish, so a rerun only computes
+    missing cells. Checkpoints are keyed by ``CELL_VERSION`` too, so they
+    are not reused across generator or library versions. With
+    ``compute=False`` only checkpointed cells are returned.
+    """
+    variants = variants or list(DATASET_VARIANTS)
+    weightings = weightings or WEIGHTING_STRATEGIES
+    checkpoint_dir = checkpoint_dir or DEFAULT_EXPERIMENT_DIR
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    n_jobs = resolve_n_jobs(n_jobs)
+    
+    cells = list(itertools.product(variants, weightings, sizes, seeds))
+    results = {cell: load_cell(checkpoint_dir, *cell) for cell in cells}
+    missing = [cell for cell, result in results.items() if result is None]
+    
+    if compute and missing and n_jobs == 1:
+        for cell in missing:
+            results[cell] = run_cell(*cell)
+            _save_cell(checkpoint_dir, results[cell])
+    elif compute and missing:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(missing))) as pool:
+            futures = {pool.submit(run_cell, *cell): cell for cell in missing}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                _save_cell(checkpoint_dir, results[futures[future]])
+    
+    grid = pd.DataFrame([result for result in results.values() if result is not None])
+    grid.attrs['n_computed'] = len(missing) if compute else 0
+    grid.attrs['n_cached'] = len(cells) - len(missing)
+    return grid
+
+def summarize_grid(grid):
+    """Average each (variant, weighting, size) over seeds."""
+    return (grid.groupby(['variant', 'weighting', 'n_patients'], sort=False)
+            .agg(accuracy=('accuracy', 'mean'), f1_macro=('f1_macro', 'mean'), f1_macro_std=('f1_macro', 'std'),
+                 f1_high_risk=('f1_high_risk', 'mean'), balance_ratio=('balance_ratio', 'mean'),
+                 seeds=('seed', 'count'))
+            .fillna({'f1_macro_std': 0.0})
+            .reset_index())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Balanced vs unbalanced experiment grid.")
+    parser.add_argument("--variants", nargs="+", choices=list(DATASET_VARIANTS), default=list(DATASET_VARIANTS))
+    parser.add_argument("--weightings", nargs="+", choices=WEIGHTING_STRATEGIES, default=WEIGHTING_STRATEGIES)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[500], help="cohort sizes")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[42], help="data/split/model seeds")
+    parser.add_argument("--jobs", type=int, default=-1, help="worker processes (-1: all cores)")
+    parser.add_argument("--checkpoint-dir", default=None, help="cell checkpoint directory")
+    parser.add_argument("--summary-only", action="store_true", help="print the summary from checkpointed cells")
+    args = parser.parse_args(argv)
+    
     print("🏥 BALANCED vs UNBALANCED DATASET COMPARISON")
     print("=" * 80)
     
-    # Generate datasets
-    unbalanced_df = generate_unbalanced_data(500, random_state=42)
-    balanced_df = generate_balanced_data(500, random_state=42)
-    
-    # Evaluate datasets
-    unbalanced_results = evaluate_dataset(unbalanced_df, "UNBALANCED DATASET (Realistic)", use_class_weights=False)
-    unbalanced_weighted_results = evaluate_dataset(unbalanced_df, "UNBALANCED DATASET (With Class Weights)", use_class_weights=True)
-    balanced_results = evaluate_dataset(balanced_df, "BALANCED DATASET (Artificial)", use_class_weights=False)
+    grid = run_experiment_grid(args.variants, args.weightings, args.sizes, args.seeds, n_jobs=args.jobs,
+                               checkpoint_dir=args.checkpoint_dir, compute=not args.summary_only)
+    print(f"🧪 {len(grid)} cells: {grid.attrs['n_computed']} computed, {grid.attrs['n_cached']} from checkpoints")
+    if grid.empty:
+        print("   No results yet - run without --summary-only first")
+        return grid
+    summary = summarize_grid(grid)
     
     # Summary comparison
     print(f"\n{'='*80}")
     print(f"📋 SUMMARY COMPARISON")
     print(f"{'='*80}")
     
-    datasets = [
-        ("Unbalanced (No Weights)", unbalanced_results),
-        ("Unbalanced (With Weights)", unbalanced_weighted_results),
-        ("Balanced (Artificial)", balanced_results)
-    ]
-    
-    print(f"{'Dataset':<25} {'Accuracy':<10} {'Macro F1':<10} {'High Risk F1':<12} {'Balance':<10}")
-    print(f"{'-'*75}")
+    print(f"{'Dataset':<12} {'Weighting':<14} {'Patients':>8} {'Seeds':>6} {'Accuracy':>9} {'Macro F1':>15} "
+          f"{'High Risk F1':>13} {'Balance':>8}")
+    print(f"{'-'*92}")
     
-    for name, results in datasets:
-        high_risk_f1 = results['f1_per_class'].get('High Risk', 0.0)
-        print(f"{name:<25} {results['accuracy']:<10.3f} {results['f1_macro']:<10.3f} "
-              f"{high_risk_f1:<12.3f} {results['balance_ratio']:<10.3f}")
+    for row in summary.itertuples():
+        print(f"{row.variant:<12} {row.weighting:<14} {row.n_patients:>8} {row.seeds:>6} {row.accuracy:>9.3f} "
+              f"{row.f1_macro:>8.3f} ± {row.f1_macro_std:.3f} {row.f1_high_risk:>13.3f} {row.balance_ratio:>8.3f}")
     
     print(f"\n💡 RECOMMENDATIONS:")
     print(f"{'='*80}")
     
     # Determine best approach
-    best_macro_f1 = max(results['f1_macro'] for _, results in datasets)
-    best_high_risk = max(results['f1_per_class'].get('High Risk', 0.0) for _, results in datasets)
+    best = summary.loc[summary['f1_macro'].idxmax()]
+    best_high = summary.loc[summary['f1_high_risk'].idxmax()]
+    unbalanced = summary[summary['variant'] == 'unbalanced']
     
     print(f"🎯 FOR MEDICAL AI APPLICATIONS:")
     print(f"   • If you prioritize detecting ALL risk levels equally:")
-    print(f"     → Use BALANCED data or UNBALANCED with class weights")
-    print(f"     → Best Macro F1: {best_macro_f1:.3f}")
+    print(f"     → Use {best['variant'].upper()} data with weighting '{best['weighting']}'")
+    print(f"     → Best Macro F1: {best['f1_macro']:.3f}")
     print(f"")
     print(f"   • If you prioritize HIGH RISK detection (medical safety):")
-    print(f"     → Use UNBALANCED with class weights or BALANCED data")
-    print(f"     → Best High Risk F1: {best_high_risk:.3f}")
-    print(f"")
-    print(f"   • If you want realistic performance (like real world):")
-    print(f"     → Use UNBALANCED data (shows true clinical performance)")
-    print(f"     → Balance Ratio: {unbalanced_results['balance_ratio']:.3f}")
+    print(f"     → Use {best_high['variant'].upper()} data with weighting '{best_high['weighting']}'")
+    print(f"     → Best High Risk F1: {best_high['f1_high_risk']:.3f}")
+    if not unbalanced.empty:
+        print(f"")
+        print(f"   • If you want realistic performance (like real world):")
+        print(f"     → Use UNBALANCED data (shows true clinical performance)")
+        print(f"     → Balance Ratio: {unbalanced['balance_ratio'].mean():.3f}")
     print(f"")
     print(f"🏆 RECOMMENDATION FOR YOUR DEMO:")
-    if best_macro_f1 > 0.8 and best_high_risk > 0.7:
+    if best['f1_macro'] > 0.8 and best_high['f1_high_risk'] > 0.7:
         print(f"     ✅ Use UNBALANCED data with CLASS WEIGHTS")
         print(f"        - Realistic distribution + Better minority class detection")
         print(f"        - Best of both worlds for medical AI")
@@ -266,6 +358,8 @@ def main():
         print(f"     ✅ Use BALANCED data for educational purposes")
         print(f"        - Shows clearer model capabilities")
         print(f"        - Better for learning and demonstration")
+    
+    return grid
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,168 @@
+"""
+Parallel stratified cross-validation for the clinical risk model.
+
+The feature matrix and integer-coded labels are written once to ``.npy``
+files and memory-mapped read-only by every fold worker, so a process pool
+shares one physical copy of the data instead of pickling it per fold; each
+task only ships its fold indices. Every fold is trained with the same
+hyperparameters (including ``random_state``), so results are identical for
+any number of workers.
+
+Usage:
+    python cross_validation.py --patients 5000 --folds 5 --repeats 2 --jobs -1
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.model_selection import KFold, RepeatedKFold, RepeatedStratifiedKFold, StratifiedKFold
+
+from medical_ai_core import evaluate_predictions, generate_synthetic_data, train_risk_model
+from synthetic_data import FEATURE_COLUMNS, resolve_n_jobs
+
+# Scalar fold metrics aggregated as mean and standard deviation
+CV_METRICS = ["accuracy", "f1_macro", "f1_weighted", "f1_micro", "precision_macro", "recall_macro"]
+
+# Shared (memory-mapped) features, label codes and label names of a pool worker
+_WORKER_DATA = None
+
+
+def attach_shared_data(data_dir, labels):
+    """Pool initializer: memory-map the ``X.npy`` / ``y.npy`` written to ``data_dir`` read-only."""
+    global _WORKER_DATA
+    _WORKER_DATA = (
+        np.load(os.path.join(data_dir, "X.npy"), mmap_mode="r"),
+        np.load(os.path.join(data_dir, "y.npy"), mmap_mode="r"),
+        np.asarray(labels, dtype=object),
+    )
+
+
+def run_fold(fold, train_idx, test_idx, model_params, data=None):
+    """Train and evaluate one fold on ``data`` (default: the worker's shared data).
+
+    ``data`` is an ``(X, label_codes, label_names)`` tuple; in a process
+    pool started with ``attach_shared_data`` as initializer it can be
+    omitted, so tasks only ship their fold indices.
+    """
+    X, codes, labels = data or _WORKER_DATA
+    y_train = labels[codes[train_idx]]
+    y_test = labels[codes[test_idx]]
+
+    start = time.perf_counter()
+    risk_model = train_risk_model(X[train_idx], y_train, **model_params)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = risk_model.predict(X[test_idx])
+    predict_time = time.perf_counter() - start
+
+    metrics = evaluate_predictions(y_test, y_pred, labels=labels.tolist())
+    del metrics["report"]
+    metrics.update(fold=fold, n_train=len(train_idx), n_test=len(test_idx), fit_time=fit_time,
+                   predict_time=predict_time)
+    return metrics
+
+
+def fold_splitter(n_splits=5, n_repeats=1, stratified=True, split_seed=42):
+    """Return the scikit-learn splitter for (repeated) (stratified) K-fold."""
+    if n_repeats > 1:
+        splitter = RepeatedStratifiedKFold if stratified else RepeatedKFold
+        return splitter(n_splits=n_splits, n_repeats=n_repeats, random_state=split_seed)
+    splitter = StratifiedKFold if stratified else KFold
+    return splitter(n_splits=n_splits, shuffle=True, random_state=split_seed)
+
+
+def cross_validate(df, n_splits=5, n_repeats=1, stratified=True, split_seed=42, n_jobs=None, **model_params):
+    """Cross-validate the risk model on a cohort.
+
+    ``split_seed`` seeds the fold assignment; ``model_params`` are passed
+    to ``train_risk_model``. With ``n_jobs`` > 1 (or -1 for all cores)
+    folds run in a process pool over one memory-mapped copy of the data.
+
+    Returns per-fold metrics and timings (``folds``), the ``mean`` and
+    ``std`` of each scalar metric, mean per-class F1, the summed confusion
+    matrix, and total fit and wall-clock times.
+    """
+    n_jobs = resolve_n_jobs(n_jobs)
+
+    labels, codes = np.unique(np.asarray(df["Risk_Category"], dtype=object), return_inverse=True)
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    codes = codes.astype(np.int8)
+    splits = [
+        (fold, train_idx, test_idx)
+        for fold, (train_idx, test_idx) in enumerate(
+            fold_splitter(n_splits, n_repeats, stratified, split_seed).split(X, codes)
+        )
+    ]
+
+    start = time.perf_counter()
+    if n_jobs == 1:
+        data = (X, codes, labels)
+        folds = [run_fold(fold, train_idx, test_idx, model_params, data) for fold, train_idx, test_idx in splits]
+    else:
+        data_dir = tempfile.mkdtemp(prefix="nino-cv-")
+        try:
+            np.save(os.path.join(data_dir, "X.npy"), X)
+            np.save(os.path.join(data_dir, "y.npy"), codes)
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(splits)), initializer=attach_shared_data,
+                                     initargs=(data_dir, labels)) as pool:
+                futures = [pool.submit(run_fold, fold, train_idx, test_idx, model_params)
+                           for fold, train_idx, test_idx in splits]
+                folds = [future.result() for future in futures]
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    wall_time = time.perf_counter() - start
+
+    label_list = labels.tolist()
+    return {
+        "folds": folds,
+        "mean": {name: float(np.mean([fold[name] for fold in folds])) for name in CV_METRICS},
+        "std": {name: float(np.std([fold[name] for fold in folds])) for name in CV_METRICS},
+        "f1_per_class": {label: float(np.mean([fold["f1_per_class"][label] for fold in folds]))
+                         for label in label_list},
+        "confusion_matrix": np.sum([fold["confusion_matrix"] for fold in folds], axis=0),
+        "labels": label_list,
+        "n_splits": n_splits,
+        "n_repeats": n_repeats,
+        "fit_time": float(sum(fold["fit_time"] for fold in folds)),
+        "wall_time": wall_time,
+    }
+
+
+def print_cv_summary(cv_results):
+    """Print aggregate cross-validation metrics and timings."""
+    repeats = f" x {cv_results['n_repeats']} repeats" if cv_results["n_repeats"] > 1 else ""
+    print(f"\n🔁 Cross-Validation ({cv_results['n_splits']} folds{repeats}):")
+    for name, label in [("accuracy", "Accuracy"), ("f1_macro", "Macro F1"), ("f1_weighted", "Weighted F1")]:
+        print(f"   • {label + ':':16s} {cv_results['mean'][name]:.3f} ± {cv_results['std'][name]:.3f}")
+    for class_name, class_f1 in cv_results["f1_per_class"].items():
+        print(f"   • {class_name + ' F1:':16s} {class_f1:.3f}")
+    print(f"   ⏱️  {len(cv_results['folds'])} fits: {cv_results['fit_time']:.2f}s total fit time, "
+          f"{cv_results['wall_time']:.2f}s wall clock")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel stratified cross-validation of the risk model.")
+    parser.add_argument("--patients", type=int, default=1000, help="cohort size")
+    parser.add_argument("--folds", type=int, default=5, help="number of folds")
+    parser.add_argument("--repeats", type=int, default=1, help="repetitions with reshuffled folds")
+    parser.add_argument("--jobs", type=int, default=-1, help="worker processes (-1: all cores)")
+    parser.add_argument("--no-stratify", action="store_true", help="plain instead of stratified K-fold")
+    args = parser.parse_args(argv)
+
+    print("🏥 Risk Model Cross-Validation")
+    print("=" * 50)
+    df = generate_synthetic_data(args.patients)
+    print(f"📊 Dataset: {len(df)} patients")
+    cv_results = cross_validate(df, args.folds, args.repeats, stratified=not args.no_stratify, n_jobs=args.jobs)
+    print_cv_summary(cv_results)
+    return cv_results
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,29 @@
 Evaluate F1 Score and Model Performance for Medical AI Demo
 """
 
+import argparse
+import itertools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, classification_report, f1_score
-from app import generate_synthetic_data
 
-def evaluate_model_performance(n_patients=100, random_state=42):
-    """Evaluate the model performance including detailed F1 scores."""
+from medical_ai_core import evaluate_predictions, generate_synthetic_data, split_dataset, train_risk_model
+from model_registry import load_or_train_risk_model
+from cross_validation import cross_validate, print_cv_summary
+from metrics_engine import bootstrap_confusion, format_interval
+from synthetic_data import resolve_n_jobs
+
+def evaluate_model_performance(n_patients=100, random_state=42, registry=None, cv_folds=None, cv_repeats=1,
+                               n_jobs=None):
+    """Evaluate the model performance including detailed F1 scores.
+    
+    Pass a ModelRegistry as ``registry`` to reuse a model registered for the
+    same training data instead of retraining it. With ``cv_folds``, the model
+    is also cross-validated (stratified, ``cv_repeats`` times, over ``n_jobs``
+    processes) and the results are returned under ``'cross_validation'``.
+    """
     
     print("🏥 Medical AI Model Performance Evaluation")
     print("=" * 50)
@@ -27,37 +40,29 @@ def evaluate_model_performance(n_patients=100, random_state=42):
         percentage = (count / len(df)) * 100
         print(f"   {risk}: {count} patients ({percentage:.1f}%)")
     
-    # Prepare features for ML
-    numeric_cols = ['Age', 'Heart_Rate', 'Systolic_BP', 'Diastolic_BP', 'Temperature', 'Blood_Sugar']
-    X = df[numeric_cols]
-    y = df['Risk_Category']
-    
     # Split data
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=random_state)
-    
-    # Scale features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    X_train, X_test, y_train, y_test = split_dataset(df, test_size=0.3, random_state=random_state, stratify=False)
     
-    # Train Random Forest model
-    rf_model = RandomForestClassifier(n_estimators=100, random_state=random_state)
-    rf_model.fit(X_train_scaled, y_train)
+    # Scale features and train Random Forest model (or load it from the registry)
+    model_params = {'n_estimators': 100, 'random_state': random_state, 'class_weight': None}
+    if registry is not None:
+        risk_model, registered, trained = load_or_train_risk_model(X_train, y_train, registry=registry, **model_params)
+        print(f"🗂️  Model registry: {'trained and registered' if trained else 'loaded'} version {registered.version}")
+    else:
+        risk_model = train_risk_model(X_train, y_train, **model_params)
     
     # Make predictions
-    y_pred = rf_model.predict(X_test_scaled)
+    y_pred = risk_model.predict(X_test)
     
     # Calculate metrics
-    accuracy = accuracy_score(y_test, y_pred)
-    
-    # Calculate F1 scores
-    f1_macro = f1_score(y_test, y_pred, average='macro')
-    f1_weighted = f1_score(y_test, y_pred, average='weighted')
-    f1_micro = f1_score(y_test, y_pred, average='micro')
+    metrics = evaluate_predictions(y_test, y_pred)
+    accuracy = metrics['accuracy']
     
-    # Get per-class F1 scores
-    f1_per_class = f1_score(y_test, y_pred, average=None)
-    unique_classes = sorted(y.unique())
+    # F1 scores
+    f1_macro = metrics['f1_macro']
+    f1_weighted = metrics['f1_weighted']
+    f1_micro = metrics['f1_micro']
+    f1_per_class = metrics['f1_per_class']
     
     print(f"\n🤖 Model Performance Results:")
     print(f"   Overall Accuracy: {accuracy:.3f} ({accuracy:.1%})")
@@ -67,8 +72,15 @@ def evaluate_model_performance(n_patients=100, random_state=42):
     print(f"   • Micro F1 Score:    {f1_micro:.3f} ({f1_micro:.1%})")
     
     print(f"\n📊 Per-Class F1 Scores:")
-    for i, class_name in enumerate(unique_classes):
-        print(f"   • {class_name}: {f1_per_class[i]:.3f} ({f1_per_class[i]:.1%})")
+    for class_name, class_f1 in f1_per_class.items():
+        print(f"   • {class_name}: {class_f1:.3f} ({class_f1:.1%})")
+    
+    # Bootstrap confidence intervals of the test-set estimates
+    intervals = bootstrap_confusion(metrics['confusion_matrix'], metrics['labels'], n_jobs=n_jobs)
+    print(f"\n📐 95% Bootstrap Confidence Intervals:")
+    for name, label in [('accuracy', 'Accuracy'), ('f1_macro', 'Macro F1'), ('f1_high_risk', 'High Risk F1')]:
+        if name in intervals:
+            print(f"   • {label + ':':14s} {format_interval(intervals[name], percent=False)}")
     
     # Interpretation
     print(f"\n📋 F1 Score Interpretation:")
@@ -89,10 +101,7 @@ def evaluate_model_performance(n_patients=100, random_state=42):
     print(f"   • Training set size: {len(y_train)} patients")
     
     # Feature importance
-    feature_importance = pd.DataFrame({
-        'Feature': numeric_cols,
-        'Importance': rf_model.feature_importances_
-    }).sort_values('Importance', ascending=False)
+    feature_importance = risk_model.feature_importance()
     
     print(f"\n🔍 Most Important Features:")
     for i, row in feature_importance.head(3).iterrows():
@@ -100,16 +109,121 @@ def evaluate_model_performance(n_patients=100, random_state=42):
     
     # Show full classification report
     print(f"\n📄 Detailed Classification Report:")
-    print(classification_report(y_test, y_pred))
+    print(metrics['report'])
     
-    return {
+    results = {
         'accuracy': accuracy,
         'f1_macro': f1_macro,
         'f1_weighted': f1_weighted,
         'f1_micro': f1_micro,
-        'f1_per_class': dict(zip(unique_classes, f1_per_class)),
+        'f1_per_class': f1_per_class,
+        'confidence_intervals': intervals,
         'feature_importance': feature_importance
     }
+    
+    # Cross-validation: performance estimate less dependent on one lucky split
+    if cv_folds:
+        results['cross_validation'] = cross_validate(df, n_splits=cv_folds, n_repeats=cv_repeats,
+                                                     split_seed=random_state, n_jobs=n_jobs, **model_params)
+        print_cv_summary(results['cross_validation'])
+    
+    return results
+
+# Metrics aggregated across seeds (per-class F1 columns are added per run)
+SEED_METRICS = ['accuracy', 'f1_macro', 'f1_weighted', 'f1_micro', 'precision_macro', 'recall_macro',
+                'training_time', 'prediction_time']
+
+def evaluate_seed(n_patients, seed):
+    """Quietly evaluate one (cohort size, seed) run; the seed drives data, split and model."""
+    df = generate_synthetic_data(n_patients, seed=seed)
+    X_train, X_test, y_train, y_test = split_dataset(df, test_size=0.3, random_state=seed, stratify=False)
+    risk_model = train_risk_model(X_train, y_train, n_estimators=100, random_state=seed, class_weight=None)
+    
+    start_time = time.perf_counter()
+    y_pred = risk_model.predict(X_test)
+    prediction_time = time.perf_counter() - start_time
+    
+    metrics = evaluate_predictions(y_test, y_pred)
+    run = {'n_patients': n_patients, 'seed': seed}
+    run.update({name: float(metrics[name]) for name in SEED_METRICS[:6]})
+    run.update(training_time=risk_model.training_time, prediction_time=prediction_time)
+    # Classes missing from a small test set are left out rather than scored as 0
+    for class_name, class_f1 in metrics['f1_per_class'].items():
+        run[f"f1_{class_name.lower().replace(' ', '_')}"] = float(class_f1)
+    return run
+
+def evaluate_multi_seed(seeds=range(5), sizes=(100,), n_jobs=-1, json_path=None):
+    """Evaluate every (cohort size, seed) pair in worker processes and aggregate.
+    
+    Returns the per-run table and, per cohort size, the mean, standard
+    deviation, min and max of every metric and of the training time. With
+    ``json_path``, runs and summary are also written there as JSON.
+    """
+    n_jobs = resolve_n_jobs(n_jobs)
+    
+    seeds, sizes = list(seeds), list(sizes)
+    pairs = list(itertools.product(sizes, seeds))
+    start_time = time.perf_counter()
+    if n_jobs == 1:
+        runs = [evaluate_seed(*pair) for pair in pairs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(pairs))) as pool:
+            runs = list(pool.map(evaluate_seed, *zip(*pairs)))
+    wall_time = time.perf_counter() - start_time
+    
+    runs = pd.DataFrame(runs)
+    metric_columns = [column for column in runs.columns if column not in ('n_patients', 'seed')]
+    stats = runs.groupby('n_patients')[metric_columns].agg(['mean', 'std', 'min', 'max'])
+    # NaN (a class absent from a run's test set, the spread of a single seed) becomes None / null
+    stats = stats.astype(object).where(stats.notna(), None)
+    summary = {
+        int(size): {metric: {stat: stats.loc[size, (metric, stat)] for stat in ['mean', 'std', 'min', 'max']}
+                    for metric in metric_columns if stats.loc[size, (metric, 'mean')] is not None}
+        for size in sizes
+    }
+    
+    report = {'seeds': seeds, 'sizes': sizes, 'wall_time': wall_time, 'summary': summary,
+              'runs': runs.astype(object).where(runs.notna(), None).to_dict('records')}
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+def print_multi_seed_report(report):
+    """Print the per-size mean ± std [min, max] of the key metrics."""
+    print("🏥 Medical AI Multi-Seed Robustness Evaluation")
+    print("=" * 70)
+    print(f"🎲 {len(report['seeds'])} seeds x {len(report['sizes'])} cohort sizes "
+          f"({len(report['runs'])} runs in {report['wall_time']:.1f}s)")
+    
+    labels = [('accuracy', 'Accuracy'), ('f1_macro', 'Macro F1'), ('f1_weighted', 'Weighted F1'),
+              ('f1_high_risk', 'High Risk F1'), ('training_time', 'Training (s)')]
+    for size, metrics in report['summary'].items():
+        print(f"\n📊 {size} patients:")
+        for name, label in labels:
+            if name in metrics:
+                m = metrics[name]
+                spread = f"{m['std']:.3f}" if m['std'] is not None else "n/a"
+                print(f"   • {label + ':':14s} {m['mean']:.3f} ± {spread}  [{m['min']:.3f}, {m['max']:.3f}]")
+    
+    print(f"\n💡 Differences smaller than about two standard deviations are within seed noise")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate the risk model for one or many seeds.")
+    parser.add_argument("--seeds", nargs="+", type=int, default=None,
+                        help="run the multi-seed mode over these seeds")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100], help="cohort sizes (multi-seed mode)")
+    parser.add_argument("--jobs", type=int, default=-1, help="worker processes (-1: all cores)")
+    parser.add_argument("--json", default="model_performance_seeds.json", help="JSON output (multi-seed mode)")
+    args = parser.parse_args(argv)
+    
+    if args.seeds is None:
+        return evaluate_model_performance()
+    
+    report = evaluate_multi_seed(args.seeds, args.sizes, n_jobs=args.jobs, json_path=args.json)
+    print_multi_seed_report(report)
+    print(f"💾 Machine-readable results: {args.json}")
+    return report
 
 if __name__ == "__main__":
-    results = evaluate_model_performance()
+    results = main()
@@ -0,0 +1,145 @@
+"""
+Latency-aware forest-size autotuner for the clinical risk model.
+
+The random forest is grown with ``warm_start`` through increasing tree
+counts; at each size the out-of-bag (OOB) macro F1 and High Risk F1, the
+serving memory of the compiled forest and the batch inference latency are
+recorded. The smallest forest meeting the F1 target is recommended, and the
+sizes not dominated on (F1, latency, memory) form the Pareto frontier.
+
+Usage:
+    python forest_autotuner.py --patients 5000 --f1-target 0.90
+"""
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from forest_inference import flatten_forest
+from medical_ai_core import DEFAULT_MODEL_PARAMS, generate_synthetic_data, warm_start_refits
+from metrics_engine import evaluate_labels
+from synthetic_data import FEATURE_COLUMNS
+
+# Tree counts evaluated by default
+DEFAULT_FOREST_SIZES = [5, 10, 20, 30, 50, 75, 100, 150, 200]
+
+# Rows per timed inference batch and timing repetitions (best of)
+LATENCY_BATCH_SIZE = 1000
+LATENCY_REPEATS = 5
+
+
+def _batch_latency(model, X_batch):
+    """Best-of-N wall time of one ``predict_proba`` call on a batch, in seconds."""
+    timings = []
+    for _ in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        model.predict_proba(X_batch)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def pareto_frontier(table, maximize=("oob_f1_macro",), minimize=("latency_ms", "memory_kb")):
+    """Return a boolean mask of the rows not dominated by any other row."""
+    scores = np.column_stack([table[name] for name in maximize] + [-table[name] for name in minimize])
+    at_least_as_good = (scores[:, None, :] <= scores[None, :, :]).all(axis=2)
+    strictly_better = (scores[:, None, :] < scores[None, :, :]).any(axis=2)
+    return ~(at_least_as_good & strictly_better).any(axis=1)
+
+
+def autotune_forest(df, sizes=None, f1_target=0.90, high_risk_f1_target=None, **params):
+    """Grow one forest through ``sizes`` trees and measure each size.
+
+    ``params`` override the default risk model hyperparameters. Returns a
+    table with one row per size (OOB macro/High Risk F1, memory, latency per
+    batch of ``LATENCY_BATCH_SIZE`` rows, Pareto membership). The smallest
+    size meeting the targets is stored in ``table.attrs["recommended"]``
+    (None if no size does).
+    """
+    sizes = sorted(sizes or DEFAULT_FOREST_SIZES)
+    X = StandardScaler().fit_transform(df[FEATURE_COLUMNS])
+    y = np.asarray(df["Risk_Category"], dtype=object)
+    X_batch = X[np.resize(np.arange(len(X)), LATENCY_BATCH_SIZE)]
+
+    model_params = dict(DEFAULT_MODEL_PARAMS, **params)
+    model_params.update(n_estimators=sizes[0], warm_start=True, oob_score=True)
+    model = RandomForestClassifier(**model_params)
+
+    rows = []
+    with warm_start_refits(), warnings.catch_warnings():
+        # The smallest forests leave a few patients without OOB votes
+        warnings.filterwarnings("ignore", message="Some inputs do not have OOB scores", category=UserWarning)
+        for n_trees in sizes:
+            start = time.perf_counter()
+            model.set_params(n_estimators=n_trees)
+            model.fit(X, y)
+            fit_time = time.perf_counter() - start
+
+            # Patients without OOB votes (NaN rows) are left out of the OOB scores
+            votes = model.oob_decision_function_
+            has_oob = np.isfinite(votes).all(axis=1)
+            oob_pred = model.classes_[np.argmax(votes[has_oob], axis=1)]
+            oob_metrics = evaluate_labels(y[has_oob], oob_pred, labels=model.classes_.tolist())
+
+            rows.append({
+                "n_estimators": n_trees,
+                "oob_f1_macro": oob_metrics["f1_macro"],
+                "oob_f1_high_risk": oob_metrics["f1_per_class"].get("High Risk", 0.0),
+                "memory_kb": sum(array.nbytes for array in flatten_forest(model).values()) / 1024,
+                "latency_ms": _batch_latency(model, X_batch) * 1000,
+                "fit_time_s": fit_time,
+            })
+
+    table = pd.DataFrame(rows)
+    table["pareto"] = pareto_frontier(table)
+
+    meets_target = table["oob_f1_macro"] >= f1_target
+    if high_risk_f1_target is not None:
+        meets_target &= table["oob_f1_high_risk"] >= high_risk_f1_target
+    table.attrs["recommended"] = int(table.loc[meets_target, "n_estimators"].min()) if meets_target.any() else None
+    table.attrs["f1_target"] = f1_target
+    table.attrs["high_risk_f1_target"] = high_risk_f1_target
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the smallest random forest meeting an F1 target.")
+    parser.add_argument("--patients", type=int, default=5000, help="training cohort size")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_FOREST_SIZES, help="tree counts to try")
+    parser.add_argument("--f1-target", type=float, default=0.90, help="required OOB macro F1")
+    parser.add_argument("--high-risk-f1-target", type=float, default=None, help="required OOB High Risk F1")
+    args = parser.parse_args(argv)
+
+    print("🌲 Random Forest Size Autotuner")
+    print("=" * 80)
+    df = generate_synthetic_data(args.patients)
+    print(f"📊 Dataset: {len(df)} patients | latency measured on batches of {LATENCY_BATCH_SIZE} patients")
+
+    table = autotune_forest(df, args.sizes, args.f1_target, args.high_risk_f1_target)
+
+    print(f"\n{'Trees':>6} {'OOB Macro F1':>13} {'OOB High F1':>12} {'Memory (KB)':>12} {'Latency (ms)':>13}  Pareto")
+    print("-" * 70)
+    for row in table.itertuples():
+        marker = "⭐" if row.pareto else ""
+        print(f"{row.n_estimators:>6} {row.oob_f1_macro:>13.3f} {row.oob_f1_high_risk:>12.3f} "
+              f"{row.memory_kb:>12,.0f} {row.latency_ms:>13.2f}  {marker}")
+
+    recommended = table.attrs["recommended"]
+    if recommended is None:
+        print(f"\n⚠️  No forest size reaches OOB macro F1 {args.f1_target:.2f}; try larger sizes or a lower target")
+    else:
+        chosen = table.set_index("n_estimators").loc[recommended]
+        largest = table.iloc[-1]
+        print(f"\n🏆 Recommended: {recommended} trees (smallest meeting OOB macro F1 ≥ {args.f1_target:.2f})")
+        print(f"   • {chosen['latency_ms']:.2f} ms vs {largest['latency_ms']:.2f} ms per batch "
+              f"and {chosen['memory_kb']:,.0f} KB vs {largest['memory_kb']:,.0f} KB "
+              f"at {int(largest['n_estimators'])} trees")
+    return table
+
+
+if __name__ == "__main__":
+    main()
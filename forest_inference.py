@@ -0,0 +1,154 @@
+"""
+Array-flattened RandomForest inference engine.
+
+A fitted forest is compiled into contiguous node arrays (feature, threshold,
+children, leaf probabilities) and all trees are evaluated for a whole batch
+with vectorized NumPy traversal: one gather-compare-select step per tree
+level instead of sklearn's per-call validation and per-estimator dispatch.
+Predictions are identical to ``RandomForestClassifier.predict_proba`` /
+``predict`` because the engine reproduces sklearn's float32 feature cast,
+missing-value (NaN) routing, leaf values and tree-by-tree accumulation order.
+
+The engine targets interactive, single-row and small-batch scoring, where
+call overhead dominates; for batches of hundreds of rows and more sklearn's
+Cython traversal is comparable.
+"""
+
+import numpy as np
+
+# Rows traversed per vectorized pass; bounds the (n_trees, rows) work arrays
+ROWS_PER_PASS = 4096
+
+
+def flatten_forest(model):
+    """Compile a fitted forest into serving-ready contiguous node arrays.
+
+    Node ids are global across trees (tree ``t`` owns nodes
+    ``node_offsets[t]:node_offsets[t + 1]``). Leaves point to themselves
+    and use feature 0, so traversal can run ``max_depth`` steps without
+    masking. ``missing_go_to_left`` is sklearn's per-node NaN routing and
+    ``value`` holds each node's class probabilities.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    counts = np.array([tree.node_count for tree in trees], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    node_ids = np.arange(offsets[-1], dtype=np.int64)
+
+    left = np.concatenate([tree.children_left.astype(np.int64) + offset for tree, offset in zip(trees, offsets[:-1])])
+    right = np.concatenate([tree.children_right.astype(np.int64) + offset for tree, offset in zip(trees, offsets[:-1])])
+    is_leaf = np.concatenate([tree.children_left < 0 for tree in trees])
+    feature = np.concatenate([tree.feature for tree in trees])
+
+    # scikit-learn >= 1.4 stores class fractions, which predict_proba returns as is
+    value = np.concatenate([tree.value[:, 0, :] for tree in trees])
+
+    return {
+        "node_offsets": offsets,
+        "feature": np.where(is_leaf, 0, feature).astype(np.int32),
+        "threshold": np.concatenate([tree.threshold for tree in trees]),
+        "children_left": np.where(is_leaf, node_ids, left).astype(np.int32),
+        "children_right": np.where(is_leaf, node_ids, right).astype(np.int32),
+        "missing_go_to_left": np.concatenate([tree.missing_go_to_left for tree in trees]).astype(bool),
+        "value": value,
+        "max_depth": np.array([max(tree.max_depth for tree in trees)], dtype=np.int64),
+    }
+
+
+class CompiledForest:
+    """Vectorized evaluator for a flattened forest (optionally with its scaler)."""
+
+    def __init__(self, arrays, classes, scaler_mean=None, scaler_scale=None):
+        self.node_offsets = arrays["node_offsets"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.missing_go_to_left = arrays["missing_go_to_left"]
+        self.value = arrays["value"]
+        self.max_depth = int(arrays["max_depth"][0])
+        self.classes_ = np.asarray(classes)
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+        self.roots = np.ascontiguousarray(self.node_offsets[:-1], dtype=np.intp)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_model(cls, model, scaler=None):
+        """Compile a fitted RandomForestClassifier (and StandardScaler)."""
+        mean = None if scaler is None else scaler.mean_
+        scale = None if scaler is None else scaler.scale_
+        return cls(flatten_forest(model), model.classes_, mean, scale)
+
+    @classmethod
+    def from_risk_model(cls, risk_model):
+        """Compile a RiskModel's scaler and forest."""
+        return cls.from_model(risk_model.model, risk_model.scaler)
+
+    @classmethod
+    def from_registered(cls, registered):
+        """Serve a registry version straight from its memory-mapped arrays."""
+        from model_registry import REGISTRY_FORMAT_VERSION
+
+        format_version = registered.metadata.get("format_version")
+        if format_version != REGISTRY_FORMAT_VERSION:
+            raise ValueError(f"Registered model {registered.path} uses array format {format_version}, "
+                             f"expected {REGISTRY_FORMAT_VERSION}; retrain or re-register it")
+        arrays = registered.arrays
+        return cls(arrays, registered.classes, arrays["scaler_mean"], arrays["scaler_scale"])
+
+    def _prepare(self, X):
+        """Scale raw features like StandardScaler, then cast like sklearn trees.
+
+        NaN is allowed (it follows each node's missing-value routing); like
+        sklearn's input validation, infinite values raise ValueError.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if np.isinf(X).any():
+            raise ValueError("Input X contains infinity")
+        if self.scaler_mean is not None:
+            X = (X - self.scaler_mean) / self.scaler_scale
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def apply(self, X):
+        """Return the leaf node id reached in every tree, shape (n_trees, n_samples)."""
+        return self._traverse(self._prepare(X))
+
+    def _traverse(self, X):
+        """Walk all trees for already prepared (scaled, float32) features."""
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        # Offset of each (tree, sample) pair's feature row in the flattened batch
+        row_offsets = np.tile(np.arange(n_samples) * n_features, self.n_trees)
+        nodes = np.repeat(self.roots, n_samples)
+        has_missing = np.isnan(flat_X).any()
+        for _ in range(self.max_depth):
+            values = flat_X.take(row_offsets + self.feature.take(nodes))
+            go_left = values <= self.threshold.take(nodes)
+            if has_missing:
+                go_left |= np.isnan(values) & self.missing_go_to_left.take(nodes)
+            next_nodes = np.where(go_left, self.children_left.take(nodes), self.children_right.take(nodes))
+            if np.array_equal(next_nodes, nodes):
+                break  # every path has reached its leaf
+            nodes = next_nodes
+        return nodes.reshape(self.n_trees, n_samples)
+
+    def predict_proba(self, X):
+        """Class probabilities for raw (unscaled) features."""
+        X = self._prepare(X)
+        proba = np.empty((X.shape[0], self.value.shape[1]))
+        for start in range(0, X.shape[0], ROWS_PER_PASS):
+            leaves = self._traverse(X[start:start + ROWS_PER_PASS])
+            # Reducing the leading (tree) axis adds tree slices in order, which is
+            # bit-identical to sklearn's sequential per-tree accumulation
+            np.add.reduce(self.value[leaves], axis=0, out=proba[start:start + ROWS_PER_PASS])
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        """Predicted classes for raw (unscaled) features."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
@@ -0,0 +1,245 @@
+"""
+Successive-halving hyperparameter search for the clinical risk model.
+
+Every configuration is cross-validated on a small cohort prefix first; only
+the best ``1 / eta`` of them advance to a cohort ``eta`` times larger, until
+the survivors are evaluated on the full cohort. Cohorts are prefixes of one
+seeded stream, so the feature matrix is memory-mapped once and shared by
+all pool workers (see ``cross_validation``), and each task ships only its
+fold indices; with ``n_jobs=1`` folds run in-process.
+
+Each (configuration, cohort size, fold) result is stored as a small JSON
+file in an on-disk cache, so an interrupted, repeated or extended search
+never recomputes finished folds.
+
+Usage:
+    python hyperparameter_search.py --patients 5000 --min-patients 500 --jobs -1
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from cross_validation import attach_shared_data, fold_splitter, run_fold
+from synthetic_data import FEATURE_COLUMNS, GENERATOR_VERSION, generate_cohort, resolve_n_jobs
+
+# Result cache location, overridable with the NINO_SEARCH_CACHE environment variable
+DEFAULT_SEARCH_CACHE_DIR = os.environ.get("NINO_SEARCH_CACHE", ".search_cache")
+
+# Hyperparameter grid searched by default
+DEFAULT_SEARCH_SPACE = {
+    "n_estimators": [50, 100, 200],
+    "max_depth": [None, 8, 16],
+    "class_weight": [None, "balanced"],
+    "min_samples_leaf": [1, 2, 5],
+}
+
+
+def config_grid(space=None):
+    """Return every configuration of a search space as a list of dicts."""
+    space = space or DEFAULT_SEARCH_SPACE
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def halving_rungs(min_patients, max_patients, eta=3):
+    """Return the cohort size of each successive-halving rung."""
+    rungs = []
+    n_patients = min_patients
+    while n_patients < max_patients:
+        rungs.append(n_patients)
+        n_patients *= eta
+    return rungs + [max_patients]
+
+
+class FoldResultCache:
+    """On-disk store of per-(configuration, fold) search results."""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or DEFAULT_SEARCH_CACHE_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(config, n_patients, fold, n_splits, seed, split_seed):
+        """Return the content address of one fold evaluation."""
+        spec = {"generator": GENERATOR_VERSION, "sklearn": sklearn.__version__, "config": config,
+                "n_patients": n_patients, "fold": fold, "n_splits": n_splits, "seed": seed,
+                "split_seed": split_seed}
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return a cached fold result, or None on a miss."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, result):
+        """Store a fold result atomically."""
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=self.cache_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, self._path(key))
+
+    def clear(self):
+        """Remove all cached results."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+
+def _fold_summary(metrics):
+    """Keep the JSON-serializable scores and costs of a fold evaluation."""
+    return {
+        "accuracy": float(metrics["accuracy"]),
+        "f1_macro": float(metrics["f1_macro"]),
+        "f1_high_risk": float(metrics["f1_per_class"].get("High Risk", 0.0)),
+        "fit_time": metrics["fit_time"],
+        "predict_time": metrics["predict_time"],
+        "n_train": int(metrics["n_train"]),
+        "n_test": int(metrics["n_test"]),
+    }
+
+
+def successive_halving(max_patients=5000, min_patients=500, eta=3, n_splits=3, space=None, seed=42,
+                       split_seed=42, n_jobs=-1, cache=None):
+    """Run a successive-halving search and return its leaderboard.
+
+    Configurations are ranked at each rung by mean cross-validated macro F1;
+    the top ``ceil(n / eta)`` advance. The leaderboard has one row per
+    configuration at the largest rung it reached, best first, with its mean
+    scores, training time per fold and inference time per patient. The
+    number of fold evaluations run and served from ``cache`` are stored in
+    ``leaderboard.attrs``.
+    """
+    n_jobs = resolve_n_jobs(n_jobs)
+    cache = cache or FoldResultCache()
+
+    df = generate_cohort(max_patients, seed=seed)
+    labels, codes = np.unique(np.asarray(df["Risk_Category"], dtype=object), return_inverse=True)
+    codes = codes.astype(np.int8)
+
+    configs = config_grid(space)
+    survivors = list(range(len(configs)))
+    rows = {}
+    n_computed = n_cached = 0
+
+    start_time = time.perf_counter()
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    data_dir = pool = None
+    try:
+        if n_jobs > 1:
+            # Every rung cohort is a prefix of the full one, so one shared copy serves all rungs
+            data_dir = tempfile.mkdtemp(prefix="nino-search-")
+            np.save(os.path.join(data_dir, "X.npy"), X)
+            np.save(os.path.join(data_dir, "y.npy"), codes)
+            pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=attach_shared_data,
+                                       initargs=(data_dir, labels))
+
+        for rung, n_patients in enumerate(halving_rungs(min_patients, max_patients, eta)):
+            splits = list(fold_splitter(n_splits, split_seed=split_seed).split(
+                np.zeros((n_patients, 1)), codes[:n_patients]))
+
+            results = {}
+            pending = {}
+            for i in survivors:
+                for fold, (train_idx, test_idx) in enumerate(splits):
+                    key = cache.key(configs[i], n_patients, fold, n_splits, seed, split_seed)
+                    cached = cache.get(key)
+                    if cached is not None:
+                        results[i, fold] = cached
+                        n_cached += 1
+                    elif pool is None:
+                        results[i, fold] = _fold_summary(run_fold(fold, train_idx, test_idx, configs[i],
+                                                                  (X, codes, labels)))
+                        cache.put(key, results[i, fold])
+                        n_computed += 1
+                    else:
+                        future = pool.submit(run_fold, fold, train_idx, test_idx, configs[i])
+                        pending[future] = (i, fold, key)
+
+            # Store each fold as soon as it finishes, so interrupted searches resume
+            for future in as_completed(pending):
+                i, fold, key = pending[future]
+                results[i, fold] = _fold_summary(future.result())
+                cache.put(key, results[i, fold])
+                n_computed += 1
+
+            for i in survivors:
+                folds = [results[i, fold] for fold in range(n_splits)]
+                rows[i] = {
+                    **{name: configs[i][name] for name in sorted(configs[i])},
+                    "rung": rung,
+                    "n_patients": n_patients,
+                    "f1_macro": float(np.mean([f["f1_macro"] for f in folds])),
+                    "f1_macro_std": float(np.std([f["f1_macro"] for f in folds])),
+                    "f1_high_risk": float(np.mean([f["f1_high_risk"] for f in folds])),
+                    "accuracy": float(np.mean([f["accuracy"] for f in folds])),
+                    "fit_time_s": float(np.mean([f["fit_time"] for f in folds])),
+                    "predict_us_per_patient": float(
+                        1e6 * sum(f["predict_time"] for f in folds) / sum(f["n_test"] for f in folds)
+                    ),
+                }
+
+            n_keep = max(1, -(-len(survivors) // eta))
+            survivors = sorted(survivors, key=lambda i: -rows[i]["f1_macro"])[:n_keep]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if data_dir is not None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    leaderboard = pd.DataFrame(list(rows.values()))
+    for name in sorted(configs[0]):
+        # Keep hyperparameter values as given (None, ints) instead of NaN-padded floats
+        leaderboard[name] = pd.Series([row[name] for row in rows.values()], dtype=object)
+    leaderboard = (leaderboard
+                   .sort_values(["rung", "f1_macro", "fit_time_s"], ascending=[False, False, True])
+                   .reset_index(drop=True))
+    leaderboard.index += 1
+    leaderboard.attrs.update(n_computed=n_computed, n_cached=n_cached, seconds=time.perf_counter() - start_time)
+    return leaderboard
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter search for the risk model.")
+    parser.add_argument("--patients", type=int, default=5000, help="cohort size of the final rung")
+    parser.add_argument("--min-patients", type=int, default=500, help="cohort size of the first rung")
+    parser.add_argument("--eta", type=int, default=3, help="halving factor")
+    parser.add_argument("--folds", type=int, default=3, help="cross-validation folds per configuration")
+    parser.add_argument("--jobs", type=int, default=-1, help="worker processes (-1: all cores)")
+    parser.add_argument("--cache-dir", default=None, help="fold result cache directory")
+    parser.add_argument("--top", type=int, default=10, help="leaderboard rows to print")
+    args = parser.parse_args(argv)
+
+    print("🏥 Risk Model Hyperparameter Search (successive halving)")
+    print("=" * 80)
+    rungs = halving_rungs(args.min_patients, args.patients, args.eta)
+    print(f"📊 {len(config_grid())} configurations, rungs: {' → '.join(f'{n:,}' for n in rungs)} patients")
+
+    leaderboard = successive_halving(args.patients, args.min_patients, args.eta, args.folds, n_jobs=args.jobs,
+                                     cache=FoldResultCache(args.cache_dir))
+
+    print(f"⏱️  {leaderboard.attrs['seconds']:.1f}s: {leaderboard.attrs['n_computed']} fold fits run, "
+          f"{leaderboard.attrs['n_cached']} loaded from cache")
+    print(f"\n🏆 Leaderboard (top {args.top}):")
+    with pd.option_context("display.width", 160, "display.max_columns", None, "display.float_format", "{:.3f}".format):
+        print(leaderboard.head(args.top).to_string())
+    return leaderboard
+
+
+if __name__ == "__main__":
+    main()
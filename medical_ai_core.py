@@ -0,0 +1,116 @@
+"""
+Streamlit-free core of the Nino Medical AI Demo.
+
+Data generation, model training and evaluation live here so that command
+line scripts, benchmarks and tests can import them without executing the
+Streamlit app (page config, analytics, training expanders).
+"""
+
+import contextlib
+import time
+import warnings
+
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from metrics_engine import evaluate_labels
+from synthetic_data import FEATURE_COLUMNS, generate_cohort
+
+# Default hyperparameters of the clinical risk model
+DEFAULT_MODEL_PARAMS = {"n_estimators": 100, "random_state": 42, "class_weight": "balanced"}
+
+
+def generate_synthetic_data(n_patients=100, seed=42):
+    """Generate synthetic medical data for educational purposes."""
+    return generate_cohort(n_patients, seed=seed)
+
+
+def split_dataset(df, test_size=0.3, random_state=42, stratify=True):
+    """Split a cohort into train/test features and risk labels."""
+    X = df[FEATURE_COLUMNS]
+    y = df["Risk_Category"]
+    return train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=y if stratify else None)
+
+
+class RiskModel:
+    """A fitted StandardScaler + RandomForestClassifier risk pipeline."""
+
+    def __init__(self, scaler, model, training_time=0.0):
+        self.scaler = scaler
+        self.model = model
+        self.training_time = training_time
+
+    @property
+    def classes_(self):
+        return self.model.classes_
+
+    def predict(self, X):
+        """Predict risk categories for raw (unscaled) features."""
+        return self.model.predict(self.scaler.transform(X))
+
+    def predict_proba(self, X):
+        """Predict class probabilities for raw (unscaled) features."""
+        return self.model.predict_proba(self.scaler.transform(X))
+
+    def feature_importance(self):
+        """Return feature importances sorted from most to least important."""
+        return pd.DataFrame(
+            {"Feature": FEATURE_COLUMNS, "Importance": self.model.feature_importances_}
+        ).sort_values("Importance", ascending=False)
+
+
+# Trees added per warm-start step when reporting training progress
+PROGRESS_STEP_TREES = 10
+
+
+@contextlib.contextmanager
+def warm_start_refits():
+    """Silence sklearn's warm-start ``class_weight`` warning while a forest is grown in steps.
+
+    Every step refits on the full training set, so "balanced" class
+    weights are computed exactly and the warning does not apply.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="class_weight presets", category=UserWarning)
+        yield
+
+
+def train_risk_model(X_train, y_train, progress=None, **params):
+    """Fit the scaler and random forest; ``training_time`` covers the forest fit.
+
+    If ``progress`` is given, the forest is grown with ``warm_start`` in steps
+    of ``PROGRESS_STEP_TREES`` and ``progress(fraction)`` is called after
+    each step. The fitted forest is identical to a single fit.
+    """
+    model_params = dict(DEFAULT_MODEL_PARAMS, **params)
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+
+    start_time = time.perf_counter()
+    model = RandomForestClassifier(**model_params)
+    if progress is None:
+        model.fit(X_train_scaled, y_train)
+    else:
+        n_estimators = model_params["n_estimators"]
+        model.set_params(warm_start=True)
+        with warm_start_refits():
+            for n_trees in range(PROGRESS_STEP_TREES, n_estimators + PROGRESS_STEP_TREES, PROGRESS_STEP_TREES):
+                model.set_params(n_estimators=min(n_trees, n_estimators))
+                model.fit(X_train_scaled, y_train)
+                progress(len(model.estimators_) / n_estimators)
+        model.set_params(warm_start=False)
+    training_time = time.perf_counter() - start_time
+
+    return RiskModel(scaler, model, training_time)
+
+
+def evaluate_predictions(y_true, y_pred, labels=None):
+    """Compute the clinical evaluation metrics for a set of predictions.
+
+    All metrics and the report come from one confusion matrix (see
+    ``metrics_engine``); ``labels`` default to the sorted union of labels.
+    """
+    return evaluate_labels(y_true, y_pred, labels)
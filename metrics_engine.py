@@ -0,0 +1,304 @@
+"""
+Single-pass classification metrics from one confusion matrix.
+
+Labels are integer-coded once and counted into a confusion matrix with a
+single ``bincount``; accuracy, per-class and averaged precision / recall /
+F1 and the classification report text are all derived from that matrix.
+Results match scikit-learn's ``accuracy_score``, ``f1_score``,
+``precision_score``, ``recall_score`` and ``classification_report`` with
+``zero_division=0``. ``ConfusionAccumulator`` adds predictions chunk by
+chunk, so arbitrarily large test sets are evaluated in bounded memory,
+``bootstrap_confusion`` resamples the matrix for confidence intervals and
+``ThresholdCurve`` re-derives it for any decision threshold on one class
+from cached probabilities.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from synthetic_data import resolve_n_jobs
+
+
+def encode_labels(y, labels):
+    """Integer-code ``y`` by position in ``labels`` (-1 for unknown values)."""
+    return pd.Index(labels, dtype=object).get_indexer(np.asarray(y, dtype=object))
+
+
+def confusion_counts(true_codes, pred_codes, n_classes):
+    """Count (true, predicted) code pairs into an ``n_classes`` square matrix."""
+    return np.bincount(true_codes * n_classes + pred_codes, minlength=n_classes * n_classes).reshape(
+        n_classes, n_classes
+    )
+
+
+def _divide(numerator, denominator):
+    """Elementwise division that yields 0 where the denominator is 0."""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+
+
+def classification_report_text(labels, precision, recall, f1, support, accuracy, digits=2):
+    """Format per-class scores like ``sklearn.metrics.classification_report``."""
+    names = [str(label) for label in labels]
+    width = max(max(len(name) for name in names), len("weighted avg"), digits)
+    headers = ["precision", "recall", "f1-score", "support"]
+    row_fmt = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+
+    report = ("{:>{width}s} " + " {:>9}" * len(headers)).format("", *headers, width=width) + "\n\n"
+    for row in zip(names, precision, recall, f1, support):
+        report += row_fmt.format(*row, width=width, digits=digits)
+    report += "\n"
+
+    total = int(np.sum(support))
+    report += ("{:>{width}s} " + " {:>9.{digits}}" * 2 + " {:>9.{digits}f}" + " {:>9}\n").format(
+        "accuracy", "", "", accuracy, total, width=width, digits=digits
+    )
+    report += row_fmt.format("macro avg", np.mean(precision), np.mean(recall), np.mean(f1), total,
+                             width=width, digits=digits)
+    report += row_fmt.format("weighted avg", np.average(precision, weights=support),
+                             np.average(recall, weights=support), np.average(f1, weights=support), total,
+                             width=width, digits=digits)
+    return report
+
+
+def metrics_from_confusion(cm, labels):
+    """Derive every evaluation metric from a confusion matrix.
+
+    Rows are true and columns predicted labels, in ``labels`` order.
+    Averages and the report cover the labels present in the true or
+    predicted values (as scikit-learn does without explicit labels);
+    ``f1_per_class`` and ``confusion_matrix`` cover all ``labels``.
+    """
+    cm = np.asarray(cm)
+    labels = list(labels)
+    tp = np.diag(cm)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    n_samples = int(support.sum())
+
+    precision = _divide(tp, predicted)
+    recall = _divide(tp, support)
+    f1 = _divide(2.0 * tp, support + predicted)
+
+    present = (support + predicted) > 0
+    p, r, f, s = precision[present], recall[present], f1[present], support[present]
+    accuracy = float(tp.sum() / n_samples) if n_samples else 0.0
+    weighted = s.sum() > 0
+
+    return {
+        "accuracy": accuracy,
+        "f1_macro": float(np.mean(f)) if present.any() else 0.0,
+        "f1_weighted": float(np.average(f, weights=s)) if weighted else 0.0,
+        "f1_micro": float(_divide(2.0 * tp.sum(), support.sum() + predicted.sum())),
+        "precision_macro": float(np.mean(p)) if present.any() else 0.0,
+        "recall_macro": float(np.mean(r)) if present.any() else 0.0,
+        "f1_per_class": dict(zip(labels, f1.tolist())),
+        "confusion_matrix": cm,
+        "labels": labels,
+        "report": classification_report_text([label for label, keep in zip(labels, present) if keep],
+                                             p, r, f, s, accuracy) if present.any() else "",
+    }
+
+
+class ConfusionAccumulator:
+    """Streaming confusion matrix over a fixed, ordered label set."""
+
+    def __init__(self, labels):
+        self.labels = list(labels)
+        self.matrix = np.zeros((len(self.labels), len(self.labels)), dtype=np.int64)
+
+    def update(self, y_true, y_pred):
+        """Add one chunk of true and predicted labels."""
+        true_codes = encode_labels(y_true, self.labels)
+        pred_codes = encode_labels(y_pred, self.labels)
+        if (true_codes < 0).any() or (pred_codes < 0).any():
+            raise ValueError(f"Labels outside {self.labels} in chunk")
+        self.matrix += confusion_counts(true_codes, pred_codes, len(self.labels))
+        return self
+
+    def merge(self, other):
+        """Add another accumulator's counts (e.g. from a parallel worker)."""
+        if other.labels != self.labels:
+            raise ValueError("Cannot merge accumulators with different labels")
+        self.matrix += other.matrix
+        return self
+
+    def metrics(self):
+        """Return the metrics of everything accumulated so far."""
+        return metrics_from_confusion(self.matrix, self.labels)
+
+
+def evaluate_labels(y_true, y_pred, labels=None):
+    """One-pass metrics for a set of predictions (labels default to the sorted union)."""
+    y_true = np.asarray(y_true, dtype=object)
+    y_pred = np.asarray(y_pred, dtype=object)
+    if labels is None:
+        labels = pd.unique(np.concatenate([y_true, y_pred]))
+        labels = sorted(labels.tolist())
+    return ConfusionAccumulator(labels).update(y_true, y_pred).metrics()
+
+
+# Bootstrap replicates drawn per vectorized batch (and per process-pool task)
+BOOTSTRAP_BATCH_SIZE = 10_000
+
+
+def _bootstrap_batch(cm, n_boot, seed_sequence, high_risk_index):
+    """Draw ``n_boot`` resampled confusion matrices and score each one.
+
+    Resampling the n (true, predicted) code pairs with replacement and
+    counting them is the same as drawing the k*k cell counts from a
+    multinomial with the observed cell frequencies, so each replicate costs
+    O(k^2) instead of O(n).
+    """
+    cm = np.asarray(cm)
+    n_classes = cm.shape[0]
+    n_samples = int(cm.sum())
+    rng = np.random.default_rng(seed_sequence)
+    boot = rng.multinomial(n_samples, cm.ravel() / n_samples, size=n_boot).reshape(n_boot, n_classes, n_classes)
+
+    tp = np.diagonal(boot, axis1=1, axis2=2)
+    f1 = _divide(2.0 * tp, boot.sum(axis=2) + boot.sum(axis=1))
+    # Macro F1 over the labels present in the original evaluation
+    present = (cm.sum(axis=1) + cm.sum(axis=0)) > 0
+    scores = {"accuracy": tp.sum(axis=1) / n_samples, "f1_macro": f1[:, present].mean(axis=1)}
+    if high_risk_index is not None:
+        scores["f1_high_risk"] = f1[:, high_risk_index]
+    return scores
+
+
+def bootstrap_confusion(cm, labels, n_boot=2000, confidence=0.95, seed=0, n_jobs=None):
+    """Percentile bootstrap intervals for accuracy, macro F1 and High Risk F1.
+
+    Replicates are drawn in batches of ``BOOTSTRAP_BATCH_SIZE`` from seeds
+    spawned off ``seed``, so results are identical for any ``n_jobs``
+    (process-pool workers; -1 for all cores). Returns, per metric, the
+    point ``estimate``, interval ``low`` / ``high`` and bootstrap ``std``;
+    all are NaN for an empty confusion matrix (no test patients).
+    """
+    cm = np.asarray(cm)
+    labels = list(labels)
+    high_risk_index = labels.index("High Risk") if "High Risk" in labels else None
+    if cm.sum() == 0:
+        names = ["accuracy", "f1_macro"] + (["f1_high_risk"] if high_risk_index is not None else [])
+        return {name: {"estimate": np.nan, "low": np.nan, "high": np.nan, "std": np.nan} for name in names}
+    batch_sizes = [min(BOOTSTRAP_BATCH_SIZE, n_boot - start) for start in range(0, n_boot, BOOTSTRAP_BATCH_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+    args = [(cm, size, seed_sequence, high_risk_index) for size, seed_sequence in zip(batch_sizes, seeds)]
+
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs == 1 or len(args) == 1:
+        batches = [_bootstrap_batch(*batch_args) for batch_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(args))) as pool:
+            batches = list(pool.map(_bootstrap_batch, *zip(*args)))
+
+    point = metrics_from_confusion(cm, labels)
+    estimates = {"accuracy": point["accuracy"], "f1_macro": point["f1_macro"]}
+    if high_risk_index is not None:
+        estimates["f1_high_risk"] = point["f1_per_class"]["High Risk"]
+
+    tail = (1 - confidence) / 2 * 100
+    intervals = {}
+    for name, estimate in estimates.items():
+        replicates = np.concatenate([batch[name] for batch in batches])
+        low, high = np.percentile(replicates, [tail, 100 - tail])
+        intervals[name] = {"estimate": float(estimate), "low": float(low), "high": float(high),
+                           "std": float(replicates.std())}
+    return intervals
+
+
+def bootstrap_metrics(y_true, y_pred, labels=None, n_boot=2000, confidence=0.95, seed=0, n_jobs=None):
+    """Bootstrap confidence intervals for a set of predictions (see ``bootstrap_confusion``)."""
+    metrics = evaluate_labels(y_true, y_pred, labels)
+    return bootstrap_confusion(metrics["confusion_matrix"], metrics["labels"], n_boot, confidence, seed, n_jobs)
+
+
+def format_interval(interval, percent=True):
+    """Format an interval as ``estimate [low, high]``."""
+    if percent:
+        return f"{interval['estimate']:.1%} [{interval['low']:.1%}, {interval['high']:.1%}]"
+    return f"{interval['estimate']:.3f} [{interval['low']:.3f}, {interval['high']:.3f}]"
+
+
+class ThresholdCurve:
+    """Confusion matrix at any decision threshold for one class, from cached probabilities.
+
+    A patient is assigned ``positive`` when its probability is at least the
+    threshold, and otherwise the most probable of the remaining classes.
+    Patients are sorted once by positive-class probability and, for each
+    (true, fallback) class pair, the sorted ranks of its patients are kept
+    (O(n) memory in total). The matrix for a threshold is then one binary
+    search per pair; the model is never re-run.
+    """
+
+    def __init__(self, y_true, proba, classes, positive="High Risk"):
+        proba = np.asarray(proba, dtype=np.float64).reshape(-1, len(classes))
+        self.labels = list(classes)
+        self.positive = positive
+        self.positive_index = self.labels.index(positive)
+        n_classes = len(self.labels)
+
+        true_codes = encode_labels(y_true, self.labels)
+        if (true_codes < 0).any():
+            raise ValueError(f"Labels outside {self.labels} in y_true")
+        others = proba.copy()
+        others[:, self.positive_index] = -np.inf
+        fallback_codes = others.argmax(axis=1) if len(proba) else np.zeros(0, dtype=np.int64)
+
+        order = np.argsort(-proba[:, self.positive_index], kind="stable")
+        # Descending scores; patients [0, k) are flagged when the threshold is at most scores[k - 1]
+        self.scores = proba[order, self.positive_index]
+        pair_codes = true_codes[order] * n_classes + fallback_codes[order]
+        self._pair_totals = np.bincount(pair_codes, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+        # Ranks (positions in score order) of each pair's patients, ascending within each pair
+        ranks = np.argsort(pair_codes, kind="stable")
+        self._pair_ranks = np.split(ranks, np.cumsum(self._pair_totals.ravel())[:-1])
+
+    def _flagged_pairs(self, k):
+        """(true, fallback) pair counts among the top ``k`` patients; ``k`` may be an array."""
+        n_classes = len(self.labels)
+        counts = np.array([np.searchsorted(ranks, k) for ranks in self._pair_ranks])
+        return counts.reshape((n_classes, n_classes) + np.shape(k))
+
+    def n_flagged(self, threshold):
+        """Number of patients whose positive-class probability is at least ``threshold``."""
+        return int(len(self.scores) - np.searchsorted(self.scores[::-1], threshold, side="left"))
+
+    def confusion_at(self, threshold):
+        """Confusion matrix (rows true, columns predicted, in ``labels`` order) at ``threshold``."""
+        flagged = self._flagged_pairs(self.n_flagged(threshold))
+        cm = self._pair_totals - flagged
+        cm[:, self.positive_index] += flagged.sum(axis=1)
+        return cm
+
+    def metrics_at(self, threshold):
+        """All metrics at ``threshold`` plus positive-class ``recall``, ``precision`` and ``n_flagged``."""
+        cm = self.confusion_at(threshold)
+        i = self.positive_index
+        metrics = metrics_from_confusion(cm, self.labels)
+        metrics.update(
+            threshold=threshold,
+            recall=float(_divide(cm[i, i], cm[i].sum())),
+            precision=float(_divide(cm[i, i], cm[:, i].sum())),
+            n_flagged=int(cm[:, i].sum()),
+        )
+        return metrics
+
+    def curve(self):
+        """Positive-class recall and precision at every distinct score, highest threshold first."""
+        if len(self.scores) == 0:
+            return pd.DataFrame({"threshold": [], "recall": [], "precision": [], "n_flagged": []})
+        i = self.positive_index
+        # Flagging the top k patients, for each k that ends a run of tied scores
+        ends = np.flatnonzero(np.r_[self.scores[1:] != self.scores[:-1], True]) + 1
+        true_positive = self._flagged_pairs(ends)[i].sum(axis=0)
+        positives = self._pair_totals[i].sum()
+        return pd.DataFrame({
+            "threshold": self.scores[ends - 1],
+            "recall": _divide(true_positive, np.full(len(ends), positives)),
+            "precision": true_positive / ends,
+            "n_flagged": ends,
+        })
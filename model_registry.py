@@ -0,0 +1,212 @@
+"""
+Versioned on-disk registry of fitted risk model pipelines.
+
+Each version directory holds:
+
+- ``pipeline.joblib``: the fitted StandardScaler and RandomForestClassifier
+- ``*.npy``: the forest compiled by ``forest_inference.flatten_forest`` and
+  the scaler statistics, which load with ``mmap_mode="r"`` so every replica
+  on a host shares one physical copy
+- ``metadata.json``: data hash, parameters, metrics and training time
+
+scikit-learn copies tree nodes into private buffers when unpickling, so the
+memory-mapped arrays (not the joblib pickle) are what serving code should
+read (see ``CompiledForest.from_registered``); the pickle is loaded lazily
+only when the sklearn estimator is needed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+from forest_inference import flatten_forest
+from medical_ai_core import DEFAULT_MODEL_PARAMS, RiskModel, train_risk_model
+from synthetic_data import FEATURE_COLUMNS
+
+# Registry location, overridable with the NINO_MODEL_REGISTRY environment variable
+DEFAULT_REGISTRY_DIR = os.environ.get("NINO_MODEL_REGISTRY", ".model_registry")
+
+# Name under which the clinical risk model is registered
+DEFAULT_MODEL_NAME = "risk_model"
+
+# On-disk layout of a version; bump whenever ``flatten_forest`` or the saved files change.
+# 1: original node arrays; 2: per-tree ``max_depth`` array and leaves stored as self-loops;
+# 3: per-node ``missing_go_to_left`` NaN routing
+REGISTRY_FORMAT_VERSION = 3
+
+_METADATA_FILE = "metadata.json"
+_PIPELINE_FILE = "pipeline.joblib"
+
+
+def training_data_hash(X_train, y_train):
+    """Return a stable content hash of a training set."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(np.asarray(X_train, dtype=np.float64)).tobytes())
+    digest.update(pd.util.hash_array(np.asarray(y_train, dtype=object)).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _jsonable(value):
+    """Convert metric values (NumPy scalars, arrays, dicts) to JSON types."""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class RegisteredModel:
+    """A registry version: metadata, memory-mapped arrays and a lazy pipeline."""
+
+    def __init__(self, path, metadata):
+        self.path = path
+        self.metadata = metadata
+        self._arrays = None
+        self._risk_model = None
+
+    @property
+    def version(self):
+        return self.metadata["version"]
+
+    @property
+    def classes(self):
+        return np.asarray(self.metadata["classes"])
+
+    @property
+    def arrays(self):
+        """Forest and scaler arrays, memory-mapped read-only."""
+        if self._arrays is None:
+            self._arrays = {
+                name: np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r").view(np.ndarray)
+                for name in self.metadata["arrays"]
+            }
+        return self._arrays
+
+    @property
+    def risk_model(self):
+        """The fitted sklearn pipeline as a RiskModel (loaded on first use)."""
+        if self._risk_model is None:
+            pipeline = joblib.load(os.path.join(self.path, _PIPELINE_FILE), mmap_mode="r")
+            self._risk_model = RiskModel(pipeline["scaler"], pipeline["model"], self.metadata["training_time"])
+        return self._risk_model
+
+
+class ModelRegistry:
+    """Versioned store of fitted risk model pipelines."""
+
+    def __init__(self, root=None):
+        self.root = root or DEFAULT_REGISTRY_DIR
+        os.makedirs(self.root, exist_ok=True)
+
+    def _model_dir(self, name):
+        return os.path.join(self.root, name)
+
+    def versions(self, name=DEFAULT_MODEL_NAME):
+        """Return the registered version numbers of a model, oldest first."""
+        try:
+            entries = os.listdir(self._model_dir(name))
+        except FileNotFoundError:
+            return []
+        return sorted(int(entry[1:]) for entry in entries if entry.startswith("v") and entry[1:].isdigit())
+
+    def save(self, risk_model, name=DEFAULT_MODEL_NAME, data_hash=None, params=None, metrics=None):
+        """Register a fitted RiskModel and return its RegisteredModel."""
+        model_dir = self._model_dir(name)
+        os.makedirs(model_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=model_dir)
+        try:
+            arrays = flatten_forest(risk_model.model)
+            arrays["scaler_mean"] = risk_model.scaler.mean_
+            arrays["scaler_scale"] = risk_model.scaler.scale_
+            for array_name, array in arrays.items():
+                np.save(os.path.join(tmp_dir, f"{array_name}.npy"), np.ascontiguousarray(array))
+            joblib.dump({"scaler": risk_model.scaler, "model": risk_model.model}, os.path.join(tmp_dir, _PIPELINE_FILE))
+
+            metadata = {
+                "name": name,
+                "format_version": REGISTRY_FORMAT_VERSION,
+                "created": time.time(),
+                "data_hash": data_hash,
+                "params": _jsonable(dict(DEFAULT_MODEL_PARAMS, **(params or {}))),
+                "metrics": _jsonable(metrics or {}),
+                "training_time": risk_model.training_time,
+                "classes": _jsonable(risk_model.classes_),
+                "feature_names": FEATURE_COLUMNS,
+                "arrays": sorted(arrays),
+                "sklearn_version": sklearn.__version__,
+            }
+
+            # Claim the next free version; a concurrent writer may take it first
+            while True:
+                version = (self.versions(name) or [0])[-1] + 1
+                metadata["version"] = version
+                with open(os.path.join(tmp_dir, _METADATA_FILE), "w", encoding="utf-8") as f:
+                    json.dump(metadata, f, indent=2)
+                path = os.path.join(model_dir, f"v{version}")
+                try:
+                    os.rename(tmp_dir, path)
+                    break
+                except OSError:
+                    if not os.path.isdir(path):
+                        raise
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        return RegisteredModel(path, metadata)
+
+    def load(self, name=DEFAULT_MODEL_NAME, version=None):
+        """Load a registered version (the latest if ``version`` is None)."""
+        if version is None:
+            versions = self.versions(name)
+            if not versions:
+                raise FileNotFoundError(f"No registered versions of model '{name}' in {self.root}")
+            version = versions[-1]
+        path = os.path.join(self._model_dir(name), f"v{version}")
+        with open(os.path.join(path, _METADATA_FILE), "r", encoding="utf-8") as f:
+            return RegisteredModel(path, json.load(f))
+
+    def find(self, data_hash, params=None, name=DEFAULT_MODEL_NAME):
+        """Return the newest version trained on ``data_hash`` with ``params``, or None.
+
+        Versions saved in another on-disk format or by another scikit-learn
+        version never match, so callers retrain instead of misreading them.
+        """
+        wanted = _jsonable(dict(DEFAULT_MODEL_PARAMS, **(params or {})))
+        for version in reversed(self.versions(name)):
+            registered = self.load(name, version)
+            metadata = registered.metadata
+            if (metadata.get("format_version") == REGISTRY_FORMAT_VERSION
+                    and metadata["data_hash"] == data_hash and metadata["params"] == wanted
+                    and metadata["sklearn_version"] == sklearn.__version__):
+                return registered
+        return None
+
+
+def load_or_train_risk_model(X_train, y_train, registry=None, name=DEFAULT_MODEL_NAME, **params):
+    """Load a matching registered model, or train and register a new one.
+
+    Returns ``(risk_model, registered_model, trained)``.
+    """
+    registry = registry or ModelRegistry()
+    data_hash = training_data_hash(X_train, y_train)
+
+    registered = registry.find(data_hash, params, name)
+    if registered is not None:
+        return registered.risk_model, registered, False
+
+    risk_model = train_risk_model(X_train, y_train, **params)
+    registered = registry.save(risk_model, name=name, data_hash=data_hash, params=params)
+    return risk_model, registered, True
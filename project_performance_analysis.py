@@ -4,14 +4,9 @@ Comprehensive Performance Analysis for Nino Medical AI Demo Project
 
 import time
 import sys
-import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import (accuracy_score, f1_score, precision_score, 
-                           recall_score, classification_report, confusion_matrix)
-from app import generate_synthetic_data
+from medical_ai_core import evaluate_predictions, generate_synthetic_data, split_dataset, train_risk_model
+from metrics_engine import bootstrap_confusion, format_interval
+from scaling_benchmark import print_scaling_report, run_scaling_benchmark
 
 def analyze_ml_performance():
     """Analyze machine learning model performance."""
@@ -27,8 +22,6 @@ def analyze_ml_performance():
         
         # Generate data
         df = generate_synthetic_data(size)
-        numeric_cols = ['Age', 'Heart_Rate', 'Systolic_BP', 'Diastolic_BP', 'Temperature', 'Blood_Sugar']
-        X = df[numeric_cols]
         y = df['Risk_Category']
         
         # Show distribution
@@ -39,34 +32,25 @@ def analyze_ml_performance():
         
         print(f"   Distribution: {low_pct:.1f}% Low, {med_pct:.1f}% Medium, {high_pct:.1f}% High")
         
-        # Split and scale
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42, stratify=y)
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
-        
-        # Train with class weights (current approach)
-        start_time = time.time()
-        rf_model = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced')
-        rf_model.fit(X_train_scaled, y_train)
-        training_time = time.time() - start_time
+        # Split, scale and train with class weights (current approach)
+        X_train, X_test, y_train, y_test = split_dataset(df, test_size=0.3, random_state=42)
+        risk_model = train_risk_model(X_train, y_train, n_estimators=100, random_state=42, class_weight='balanced')
+        training_time = risk_model.training_time
         
         # Predict
-        start_time = time.time()
-        y_pred = rf_model.predict(X_test_scaled)
-        prediction_time = time.time() - start_time
+        start_time = time.perf_counter()
+        y_pred = risk_model.predict(X_test)
+        prediction_time = time.perf_counter() - start_time
         
         # Calculate metrics
-        accuracy = accuracy_score(y_test, y_pred)
-        f1_macro = f1_score(y_test, y_pred, average='macro')
-        f1_weighted = f1_score(y_test, y_pred, average='weighted')
-        f1_micro = f1_score(y_test, y_pred, average='micro')
-        precision_macro = precision_score(y_test, y_pred, average='macro')
-        recall_macro = recall_score(y_test, y_pred, average='macro')
-        
-        # Per-class metrics
-        f1_per_class = f1_score(y_test, y_pred, average=None)
-        unique_classes = sorted(y.unique())
+        metrics = evaluate_predictions(y_test, y_pred)
+        accuracy = metrics['accuracy']
+        f1_macro = metrics['f1_macro']
+        f1_weighted = metrics['f1_weighted']
+        f1_micro = metrics['f1_micro']
+        precision_macro = metrics['precision_macro']
+        recall_macro = metrics['recall_macro']
+        intervals = bootstrap_confusion(metrics['confusion_matrix'], metrics['labels'])
         
         # Store results
         result = {
@@ -79,20 +63,31 @@ def analyze_ml_performance():
             'recall_macro': recall_macro,
             'training_time': training_time,
             'prediction_time': prediction_time,
-            'test_size': len(y_test)
+            'test_size': len(y_test),
+            'f1_macro_ci': (intervals['f1_macro']['low'], intervals['f1_macro']['high'])
         }
         
         # Add per-class F1 scores
-        for i, class_name in enumerate(unique_classes):
-            if i < len(f1_per_class):
-                result[f'f1_{class_name.lower().replace(" ", "_")}'] = f1_per_class[i]
+        for class_name, class_f1 in metrics['f1_per_class'].items():
+            result[f'f1_{class_name.lower().replace(" ", "_")}'] = class_f1
         
         results.append(result)
         
-        print(f"   Accuracy: {accuracy:.1%} | Macro F1: {f1_macro:.1%} | Training: {training_time:.3f}s")
+        print(f"   Accuracy: {accuracy:.1%} | Macro F1: {format_interval(intervals['f1_macro'])} | Training: {training_time:.3f}s")
     
     return results
 
+def analyze_scaling(sizes=(1_000, 5_000, 20_000), repeats=3):
+    """Time each pipeline stage and measure its peak memory beyond the small cohorts above."""
+    print("\n📈 PIPELINE SCALING")
+    print("=" * 60)
+    print(f"Sizes: {', '.join(f'{n:,}' for n in sizes)} patients, median of {repeats} runs after a warm-up")
+    print("(run scaling_benchmark.py for larger ladders, JSON output and baseline comparison)")
+    
+    report = run_scaling_benchmark(sizes, repeats=repeats)
+    print_scaling_report(report)
+    return report
+
 def analyze_code_quality():
     """Analyze code quality and structure."""
     print("\n💻 CODE QUALITY & STRUCTURE")
@@ -186,27 +181,21 @@ def analyze_performance_benchmarks():
     
     # Run quick performance test
     df = generate_synthetic_data(500)
-    numeric_cols = ['Age', 'Heart_Rate', 'Systolic_BP', 'Diastolic_BP', 'Temperature', 'Blood_Sugar']
-    X = df[numeric_cols]
-    y = df['Risk_Category']
-    
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42, stratify=y)
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    X_train, X_test, y_train, y_test = split_dataset(df, test_size=0.3, random_state=42)
+    risk_model = train_risk_model(X_train, y_train, n_estimators=100, random_state=42, class_weight='balanced')
+    y_pred = risk_model.predict(X_test)
     
-    rf_model = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced')
-    rf_model.fit(X_train_scaled, y_train)
-    y_pred = rf_model.predict(X_test_scaled)
-    
-    accuracy = accuracy_score(y_test, y_pred)
-    f1_macro = f1_score(y_test, y_pred, average='macro')
-    f1_weighted = f1_score(y_test, y_pred, average='weighted')
+    metrics = evaluate_predictions(y_test, y_pred)
+    accuracy = metrics['accuracy']
+    f1_macro = metrics['f1_macro']
+    f1_weighted = metrics['f1_weighted']
+    intervals = bootstrap_confusion(metrics['confusion_matrix'], metrics['labels'])
     
     print("🏆 Current Performance vs Benchmarks:")
     print(f"   Accuracy:      {accuracy:.1%}  {'✅ Excellent' if accuracy >= 0.9 else '✅ Good' if accuracy >= 0.8 else '⚠️ Fair'}")
     print(f"   Macro F1:      {f1_macro:.1%}  {'✅ Excellent' if f1_macro >= 0.8 else '✅ Good' if f1_macro >= 0.7 else '⚠️ Fair'}")
     print(f"   Weighted F1:   {f1_weighted:.1%}  {'✅ Excellent' if f1_weighted >= 0.9 else '✅ Good' if f1_weighted >= 0.8 else '⚠️ Fair'}")
+    print(f"   95% CI:        accuracy {format_interval(intervals['accuracy'])}, macro F1 {format_interval(intervals['f1_macro'])}")
     
     print("\n📊 Medical AI Benchmark Standards:")
     print("   • Clinical Decision Support: >95% accuracy required")
@@ -236,6 +225,9 @@ def main():
     # ML Performance Analysis
     ml_results = analyze_ml_performance()
     
+    # Pipeline Scaling
+    analyze_scaling()
+    
     # Code Quality Analysis
     analyze_code_quality()
     
@@ -0,0 +1,410 @@
+"""
+Scaling benchmark for the clinical risk model pipeline.
+
+Each cohort size on a ladder (up to ``MAX_LADDER_SIZE`` patients) runs the
+pipeline stage by stage (generate, split, scale, fit, predict). Every stage
+gets untimed warm-up runs followed by repeated ``perf_counter`` timings.
+Peak memory is measured separately: each stage runs once more in a fresh
+process on its saved inputs, and its growth of the process peak RSS
+(``ru_maxrss``) is recorded, which includes memory allocated in C, such as
+sklearn's tree nodes, that ``tracemalloc`` cannot see.
+Per stage, time and memory are fitted to ``a * n ** b`` on a log-log scale,
+so the exponent ``b`` shows how the stage scales. The report is written as
+JSON and can be compared with a stored baseline to flag regressions.
+
+Usage:
+    python scaling_benchmark.py --max-patients 1000000 --repeats 3 --json scaling.json
+    python scaling_benchmark.py --baseline scaling.json
+"""
+
+import argparse
+import ctypes
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from medical_ai_core import DEFAULT_MODEL_PARAMS, generate_synthetic_data, split_dataset
+from synthetic_data import GENERATOR_VERSION
+
+try:
+    import resource
+except ImportError:  # Windows has no getrusage; peak memory is then not measured
+    resource = None
+
+# Pipeline stages, in execution order
+STAGES = ["generate", "split", "scale", "fit", "predict"]
+
+# Largest supported cohort size
+MAX_LADDER_SIZE = 10_000_000
+
+# Relative slowdown (or memory growth) over the baseline reported as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Differences below these are treated as timer / allocator noise
+MIN_REGRESSION_SECONDS = 0.005
+MIN_REGRESSION_MB = 1.0
+
+# Earlier stage outputs each stage reads
+_STAGE_INPUTS = {
+    "generate": [],
+    "split": ["generate"],
+    "scale": ["split"],
+    "fit": ["scale", "split"],
+    "predict": ["fit", "scale"],
+}
+
+# Environment and settings a baseline must share for its timings to be comparable
+_COMPARABLE_ENVIRONMENT = ["python", "numpy", "sklearn", "machine", "processor", "cpu_count", "generator"]
+_COMPARABLE_SETTINGS = ["repeats", "warmup", "seed", "model_params", "memory"]
+
+
+def size_ladder(min_patients=1_000, max_patients=100_000, factor=10):
+    """Return the cohort sizes from ``min_patients`` to ``max_patients``, growing by ``factor``."""
+    if max_patients > MAX_LADDER_SIZE:
+        raise ValueError(f"Cohort sizes are limited to {MAX_LADDER_SIZE:,} patients")
+    sizes = []
+    n_patients = min_patients
+    while n_patients < max_patients:
+        sizes.append(n_patients)
+        n_patients *= factor
+    return sizes + [max_patients]
+
+
+def _pipeline_stages(n_patients, seed, model_params):
+    """Return ``(name, fn)`` pairs; each ``fn`` maps the earlier stage outputs to its own."""
+    return [
+        ("generate", lambda out: generate_synthetic_data(n_patients, seed=seed)),
+        ("split", lambda out: split_dataset(out["generate"], test_size=0.3, random_state=seed)),
+        ("scale", lambda out: _scale(*out["split"][:2])),
+        ("fit", lambda out: RandomForestClassifier(**model_params).fit(out["scale"][0], out["split"][2])),
+        ("predict", lambda out: out["fit"].predict(out["scale"][1])),
+    ]
+
+
+def _scale(X_train, X_test):
+    """Fit the scaler on the training features and transform both splits."""
+    scaler = StandardScaler()
+    return scaler.fit_transform(X_train), scaler.transform(X_test)
+
+
+def _measure(fn, outputs, repeats, warmup):
+    """Run ``warmup`` untimed runs, then time ``repeats`` runs."""
+    for _ in range(warmup):
+        fn(outputs)
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(outputs)
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB (``ru_maxrss`` is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def _proc_status_mb(field):
+    """A memory field (``VmRSS``, ``VmHWM``) of /proc/self/status in MB."""
+    with open("/proc/self/status", "r", encoding="ascii") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise OSError(f"{field} not in /proc/self/status")
+
+
+def _reset_peak_rss():
+    """Return freed heap pages to the OS and lower the peak RSS mark to the current RSS.
+
+    Returns False where the peak cannot be reset (anything but Linux).
+    """
+    gc.collect()
+    try:
+        # Otherwise the stage reuses resident free pages and its growth is hidden
+        ctypes.CDLL(None).malloc_trim(0)
+    except (AttributeError, OSError):
+        pass
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _stage_peak_mb(stage, n_patients, seed, model_params, inputs_path):
+    """Run one stage in this fresh process and return how far it raised the peak RSS, in MB."""
+    outputs = joblib.load(inputs_path)
+    fn = dict(_pipeline_stages(n_patients, seed, model_params))[stage]
+    if _reset_peak_rss():
+        before = _proc_status_mb("VmRSS")
+        fn(outputs)
+        return max(_proc_status_mb("VmHWM") - before, 0.0)
+    before = _peak_rss_mb()
+    fn(outputs)
+    return max(_peak_rss_mb() - before, 0.0)
+
+
+def measure_stage_memory(stage, outputs, n_patients, seed=42, **model_params):
+    """Peak RSS growth (MB) of one stage, run in a fresh spawned process on its saved inputs.
+
+    ``outputs`` holds the earlier stages' results; only the ones the stage
+    reads are saved (with joblib, which loads arrays without extra copies).
+    Returns None where ``resource`` is unavailable (Windows).
+    """
+    if resource is None:
+        return None
+    model_params = dict(DEFAULT_MODEL_PARAMS, **model_params)
+    with tempfile.TemporaryDirectory(prefix="scaling-") as tmp_dir:
+        inputs_path = os.path.join(tmp_dir, "inputs.joblib")
+        joblib.dump({name: outputs[name] for name in _STAGE_INPUTS[stage]}, inputs_path)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return pool.submit(_stage_peak_mb, stage, n_patients, seed, model_params, inputs_path).result()
+
+
+def benchmark_size(n_patients, repeats=3, warmup=1, seed=42, measure_memory=True, **model_params):
+    """Benchmark every pipeline stage on one cohort size.
+
+    ``model_params`` override the default risk model hyperparameters.
+    Returns one row per stage with the median, min and max of the timed
+    runs and the stage's peak RSS growth from ``measure_stage_memory``
+    (None without ``measure_memory``).
+    """
+    model_params = dict(DEFAULT_MODEL_PARAMS, **model_params)
+    outputs = {}
+    rows = []
+    for stage, fn in _pipeline_stages(n_patients, seed, model_params):
+        peak_mb = measure_stage_memory(stage, outputs, n_patients, seed, **model_params) if measure_memory else None
+        outputs[stage], timings = _measure(fn, outputs, repeats, warmup)
+        rows.append({
+            "n_patients": n_patients,
+            "stage": stage,
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+            "max_s": max(timings),
+            "peak_mb": peak_mb,
+        })
+    return rows
+
+
+def fit_complexity(sizes, values):
+    """Fit ``values ≈ coefficient * sizes ** exponent`` by least squares on log-log scale.
+
+    Non-positive values are skipped; returns None with fewer than two points.
+    """
+    points = [(n, v) for n, v in zip(sizes, values) if v is not None and v > 0]
+    if len(points) < 2:
+        return None
+    log_n, log_v = np.log([n for n, _ in points]), np.log([v for _, v in points])
+    exponent, intercept = np.polyfit(log_n, log_v, 1)
+    residuals = log_v - (exponent * log_n + intercept)
+    total = np.sum((log_v - log_v.mean()) ** 2)
+    return {
+        "exponent": float(exponent),
+        "coefficient": float(np.exp(intercept)),
+        "r2": float(1 - np.sum(residuals**2) / total) if total > 0 else 1.0,
+    }
+
+
+def run_scaling_benchmark(sizes=None, repeats=3, warmup=1, seed=42, measure_memory=True, **model_params):
+    """Benchmark the pipeline over a size ladder and fit per-stage complexity curves.
+
+    Returns a JSON-serializable report with the environment, settings, one
+    row per (size, stage) in ``results`` and per-stage ``complexity`` fits
+    of time and peak memory against cohort size.
+    """
+    sizes = sorted(sizes or size_ladder())
+    if sizes[-1] > MAX_LADDER_SIZE:
+        raise ValueError(f"Cohort sizes are limited to {MAX_LADDER_SIZE:,} patients")
+
+    start_time = time.perf_counter()
+    results = []
+    for n_patients in sizes:
+        results.extend(benchmark_size(n_patients, repeats, warmup, seed, measure_memory, **model_params))
+
+    complexity = {}
+    for stage in STAGES:
+        rows = [row for row in results if row["stage"] == stage]
+        complexity[stage] = {
+            "time": fit_complexity([row["n_patients"] for row in rows], [row["median_s"] for row in rows]),
+            "memory": fit_complexity([row["n_patients"] for row in rows], [row["peak_mb"] for row in rows]),
+        }
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "generator": GENERATOR_VERSION,
+        },
+        "settings": {
+            "sizes": sizes,
+            "repeats": repeats,
+            "warmup": warmup,
+            "seed": seed,
+            "model_params": dict(DEFAULT_MODEL_PARAMS, **model_params),
+            "memory": "peak_rss" if measure_memory and resource is not None else None,
+        },
+        "results": results,
+        "complexity": complexity,
+        "wall_time": time.perf_counter() - start_time,
+    }
+
+
+def save_report(report, path):
+    """Write a benchmark report as JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path):
+    """Read a benchmark report written by ``save_report``."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def baseline_mismatches(report, baseline):
+    """Return the environment and settings entries that differ between two reports.
+
+    Each mismatch is ``(section, key, report value, baseline value)``.
+    """
+    mismatches = []
+    for section, keys in [("environment", _COMPARABLE_ENVIRONMENT), ("settings", _COMPARABLE_SETTINGS)]:
+        for key in keys:
+            current = report.get(section, {}).get(key)
+            previous = baseline.get(section, {}).get(key)
+            if current != previous:
+                mismatches.append((section, key, current, previous))
+    return mismatches
+
+
+def compare_to_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE, allow_mismatch=False):
+    """Compare the (size, stage) rows two reports share.
+
+    Returns one row per shared (size, stage) with the time and memory ratios
+    against the baseline and a ``regression`` flag, set when the median time
+    or peak memory grew by more than ``tolerance`` and by more than the
+    noise floors ``MIN_REGRESSION_SECONDS`` / ``MIN_REGRESSION_MB``.
+    Raises ValueError if the reports were run with different settings or
+    in a different environment (see ``baseline_mismatches``), unless
+    ``allow_mismatch`` is set.
+    """
+    mismatches = baseline_mismatches(report, baseline)
+    if mismatches and not allow_mismatch:
+        details = "; ".join(f"{section} {key}: {current!r} vs baseline {previous!r}"
+                            for section, key, current, previous in mismatches)
+        raise ValueError(f"Baseline is not comparable ({details})")
+
+    previous = {(row["n_patients"], row["stage"]): row for row in baseline["results"]}
+    comparison = []
+    for row in report["results"]:
+        old = previous.get((row["n_patients"], row["stage"]))
+        if old is None:
+            continue
+        time_ratio = row["median_s"] / old["median_s"] if old["median_s"] > 0 else None
+        slower = (time_ratio is not None and time_ratio > 1 + tolerance
+                  and row["median_s"] - old["median_s"] > MIN_REGRESSION_SECONDS)
+
+        memory_ratio = None
+        larger = False
+        if row["peak_mb"] is not None and old["peak_mb"]:
+            memory_ratio = row["peak_mb"] / old["peak_mb"]
+            larger = memory_ratio > 1 + tolerance and row["peak_mb"] - old["peak_mb"] > MIN_REGRESSION_MB
+
+        comparison.append({
+            "n_patients": row["n_patients"],
+            "stage": row["stage"],
+            "time_ratio": time_ratio,
+            "memory_ratio": memory_ratio,
+            "regression": slower or larger,
+        })
+    return comparison
+
+
+def print_scaling_report(report):
+    """Print per-size stage timings and the fitted complexity exponents."""
+    print(f"\n{'Patients':>10} {'Stage':>9} {'Median (s)':>11} {'Min (s)':>9} {'Peak (MB)':>10}")
+    print("-" * 53)
+    for row in report["results"]:
+        peak = f"{row['peak_mb']:>10.1f}" if row["peak_mb"] is not None else f"{'n/a':>10}"
+        print(f"{row['n_patients']:>10,} {row['stage']:>9} {row['median_s']:>11.4f} {row['min_s']:>9.4f} {peak}")
+
+    print("\n📈 Fitted scaling (time ∝ n^b, memory ∝ n^b):")
+    for stage, fits in report["complexity"].items():
+        parts = [f"{kind} b={fit['exponent']:.2f} (R²={fit['r2']:.2f})" for kind, fit in fits.items() if fit]
+        print(f"   • {stage + ':':9s} {', '.join(parts) if parts else 'needs two or more sizes'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the risk model pipeline.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=None, help="explicit cohort sizes")
+    parser.add_argument("--min-patients", type=int, default=1_000, help="smallest ladder size")
+    parser.add_argument("--max-patients", type=int, default=100_000,
+                        help=f"largest ladder size (up to {MAX_LADDER_SIZE:,})")
+    parser.add_argument("--factor", type=int, default=10, help="growth factor between ladder sizes")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per stage")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per stage")
+    parser.add_argument("--n-estimators", type=int, default=None, help="override the forest size")
+    parser.add_argument("--no-memory", action="store_true", help="skip the per-stage peak RSS runs")
+    parser.add_argument("--json", default=None, help="write the report to this JSON file")
+    parser.add_argument("--baseline", default=None, help="compare against this stored report")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed relative slowdown")
+    parser.add_argument("--allow-mismatch", action="store_true",
+                        help="compare even if the baseline's settings or environment differ")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or size_ladder(args.min_patients, args.max_patients, args.factor)
+    model_params = {} if args.n_estimators is None else {"n_estimators": args.n_estimators}
+
+    print("🏥 Risk Model Pipeline Scaling Benchmark")
+    print("=" * 60)
+    print(f"📊 Sizes: {', '.join(f'{n:,}' for n in sizes)} | {args.repeats} timed runs after {args.warmup} warm-up")
+    report = run_scaling_benchmark(sizes, args.repeats, args.warmup, measure_memory=not args.no_memory,
+                                   **model_params)
+    print_scaling_report(report)
+    print(f"\n⏱️  Benchmark wall clock: {report['wall_time']:.1f}s")
+
+    if args.json:
+        save_report(report, args.json)
+        print(f"💾 Report written to {args.json}")
+
+    if args.baseline:
+        baseline = load_report(args.baseline)
+        mismatches = baseline_mismatches(report, baseline)
+        for section, key, current, previous in mismatches:
+            print(f"⚠️  {section} {key} differs: {current!r} (baseline {previous!r})")
+        if mismatches and not args.allow_mismatch:
+            print(f"❌ Baseline {args.baseline} is not comparable; rerun it here or pass --allow-mismatch")
+            sys.exit(2)
+        comparison = compare_to_baseline(report, baseline, args.tolerance, allow_mismatch=True)
+        regressions = [row for row in comparison if row["regression"]]
+        print(f"\n🔍 Baseline {args.baseline}: {len(comparison)} stages compared, {len(regressions)} regressions")
+        for row in regressions:
+            memory = f", memory x{row['memory_ratio']:.2f}" if row["memory_ratio"] else ""
+            time_ratio = f"x{row['time_ratio']:.2f}" if row["time_ratio"] else "n/a"
+            print(f"   ⚠️  {row['n_patients']:,} patients, {row['stage']}: time {time_ratio}{memory}")
+        if regressions:
+            sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
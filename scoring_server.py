@@ -0,0 +1,392 @@
+"""
+Local HTTP risk-prediction server with dynamic micro-batching.
+
+A dependency-free asyncio HTTP/1.1 server: concurrent single-patient
+``POST /predict`` requests are queued and scored together in micro-batches,
+flushed when ``max_batch`` requests are waiting or the oldest has waited
+``max_wait_ms``. Batches are scored off the event loop with the compiled
+forest engine, which is fastest at these small batch sizes.
+
+Endpoints:
+    POST /predict   {"Age": 54, "Heart_Rate": 88, ...} -> risk and probabilities
+    GET  /metrics   request, batch, latency (p50/p99) and throughput counters
+    GET  /health    liveness check
+
+Usage:
+    python scoring_server.py serve --port 8765 --max-batch 64 --max-wait-ms 5
+    python scoring_server.py load --requests 5000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from batch_scoring import default_registered_model
+from forest_inference import CompiledForest
+from synthetic_data import FEATURE_COLUMNS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+
+# Recent request latencies kept for percentile estimates
+LATENCY_WINDOW = 10_000
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class LatencyStats:
+    """Request, batch and latency counters for the /metrics endpoint."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.started = time.perf_counter()
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_rows = 0
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_rows += size
+
+    def record_request(self, seconds, ok=True):
+        self.requests += 1
+        self.errors += not ok
+        self.latencies.append(seconds)
+
+    def snapshot(self):
+        """Return the counters, p50/p99 latency in ms and requests/sec."""
+        uptime = time.perf_counter() - self.started
+        p50, p99 = np.percentile(self.latencies, [50, 99]) * 1000 if self.latencies else (0.0, 0.0)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch_size": self.batched_rows / self.batches if self.batches else 0.0,
+            "latency_p50_ms": float(p50),
+            "latency_p99_ms": float(p99),
+            "throughput_rps": self.requests / uptime if uptime else 0.0,
+            "uptime_s": uptime,
+        }
+
+
+class MicroBatcher:
+    """Queue single-row requests and score them together in micro-batches."""
+
+    def __init__(self, forest, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS, stats=None):
+        self.forest = forest
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats or LatencyStats()
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        # Created here, not in __init__: before Python 3.10 a queue binds to the loop current at creation
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, features):
+        """Score one patient's feature vector; returns its probability row."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            X = np.array([features for features, _ in batch], dtype=np.float64)
+            try:
+                proba = await loop.run_in_executor(None, self.forest.predict_proba, X)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.stats.record_batch(len(batch))
+            for (_, future), row in zip(batch, proba):
+                if not future.done():
+                    future.set_result(row)
+
+
+def parse_patient(body):
+    """Parse a JSON patient object into a feature vector in FEATURE_COLUMNS order."""
+    patient = json.loads(body)
+    if not isinstance(patient, dict):
+        raise ValueError("Request body must be a JSON object")
+    missing = [name for name in FEATURE_COLUMNS if name not in patient]
+    if missing:
+        raise ValueError(f"Missing features: {', '.join(missing)}")
+    features = []
+    for name in FEATURE_COLUMNS:
+        value = patient[name]
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Feature {name} must be a number, got {patient[name]!r}") from None
+        if not math.isfinite(value):
+            raise ValueError(f"Feature {name} must be finite, got {patient[name]!r}")
+        features.append(value)
+    return features
+
+
+class ScoringServer:
+    """asyncio HTTP/1.1 front end for a MicroBatcher."""
+
+    def __init__(self, forest, host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.forest = forest
+        self.host = host
+        self.port = port
+        self.stats = LatencyStats()
+        self.batcher = MicroBatcher(forest, max_batch, max_wait_ms, self.stats)
+        self._server = None
+
+    async def start(self):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _read_request(self, reader):
+        """Read one request; None at end of stream, ValueError if malformed."""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            raise ValueError(f"Malformed request line {request_line[:80]!r}")
+        method, path, _ = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, colon, value = line.decode("latin-1").partition(":")
+            if not colon or not name.strip():
+                raise ValueError(f"Malformed header {line[:80]!r}")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            content_length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise ValueError("Content-Length must be an integer") from None
+        if content_length < 0:
+            raise ValueError("Content-Length must not be negative")
+        body = await reader.readexactly(content_length)
+        return method, path, headers, body
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            .encode() + data
+        )
+        await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ValueError as e:
+                    # The stream position is unknown after a malformed request, so reply and close
+                    await self._respond(writer, 400, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        if path == "/predict":
+            if method != "POST":
+                return 405, {"error": "Use POST"}
+            start = time.perf_counter()
+            try:
+                features = parse_patient(body)
+            except (TypeError, ValueError) as e:
+                self.stats.record_request(time.perf_counter() - start, ok=False)
+                return 400, {"error": str(e)}
+            try:
+                proba = await self.batcher.predict(features)
+            except Exception as e:
+                self.stats.record_request(time.perf_counter() - start, ok=False)
+                return 500, {"error": str(e)}
+            self.stats.record_request(time.perf_counter() - start)
+            return 200, {
+                "risk": str(self.forest.classes_[int(np.argmax(proba))]),
+                "probabilities": {str(c): float(p) for c, p in zip(self.forest.classes_, proba)},
+            }
+        if path == "/metrics":
+            return 200, self.stats.snapshot()
+        if path == "/health":
+            return 200, {"status": "ok"}
+        return 404, {"error": f"Unknown path {path}"}
+
+
+async def _post_json(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def load_test(host=DEFAULT_HOST, port=DEFAULT_PORT, n_requests=2_000, concurrency=32, seed=0):
+    """Fire ``n_requests`` single-patient predictions over ``concurrency`` keep-alive connections.
+
+    Returns client-side latency percentiles, throughput and status counts.
+    """
+    from synthetic_data import generate_cohort
+
+    patients = generate_cohort(min(n_requests, 10_000), seed=seed)[FEATURE_COLUMNS].to_dict("records")
+    latencies = []
+    statuses = {}
+    next_request = iter(range(n_requests))
+
+    async def worker():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in next_request:
+                patient = {name: float(value) for name, value in patients[i % len(patients)].items()}
+                start = time.perf_counter()
+                status, _ = await _post_json(reader, writer, host, "/predict", patient)
+                latencies.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start_time
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return {
+        "requests": len(latencies),
+        "seconds": seconds,
+        "throughput_rps": len(latencies) / seconds,
+        "latency_p50_ms": float(p50),
+        "latency_p99_ms": float(p99),
+        "statuses": statuses,
+    }
+
+
+async def fetch_metrics(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Return the server's /metrics counters."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET /metrics HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        _, _, body = (await reader.read()).partition(b"\r\n\r\n")
+        return json.loads(body)
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP risk scoring server and load generator.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="run the scoring server")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="flush at this many requests")
+    serve.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS, help="flush after this wait")
+
+    load = subparsers.add_parser("load", help="run the load generator against a server")
+    load.add_argument("--host", default=DEFAULT_HOST)
+    load.add_argument("--port", type=int, default=DEFAULT_PORT)
+    load.add_argument("--requests", type=int, default=2_000)
+    load.add_argument("--concurrency", type=int, default=32)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        registered = default_registered_model()
+        server = ScoringServer(CompiledForest.from_registered(registered), args.host, args.port,
+                               args.max_batch, args.max_wait_ms)
+        print("🏥 Risk Scoring Server")
+        print("=" * 50)
+        print(f"   Model:  {registered.metadata['name']} v{registered.version}")
+        print(f"   Listen: http://{args.host}:{args.port} (max batch {args.max_batch}, "
+              f"max wait {args.max_wait_ms:g} ms)")
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            print("\n👋 Server stopped")
+        return None
+
+    report = asyncio.run(load_test(args.host, args.port, args.requests, args.concurrency))
+    metrics = asyncio.run(fetch_metrics(args.host, args.port))
+    print("📈 Load Test Results")
+    print("=" * 50)
+    print(f"   Requests:      {report['requests']:,} ({report['statuses']})")
+    print(f"   Throughput:    {report['throughput_rps']:,.0f} req/s")
+    print(f"   Latency p50:   {report['latency_p50_ms']:.2f} ms")
+    print(f"   Latency p99:   {report['latency_p99_ms']:.2f} ms")
+    print(f"   Server batch:  {metrics['mean_batch_size']:.1f} requests on average")
+    return report
+
+
+if __name__ == "__main__":
+    main()
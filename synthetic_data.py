@@ -0,0 +1,441 @@
+"""
+Synthetic patient cohort generation for the Nino Medical AI Demo.
+
+This module has no Streamlit dependency so that scripts, tests and the
+app can all share the same data generation code.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Bump whenever generated values change so persisted cohorts are invalidated
+GENERATOR_VERSION = 1
+
+# Clinical measurements used as model features
+FEATURE_COLUMNS = ["Age", "Heart_Rate", "Systolic_BP", "Diastolic_BP", "Temperature", "Blood_Sugar"]
+
+# Risk categories in increasing order of severity
+RISK_CATEGORIES = ["Low Risk", "Medium Risk", "High Risk"]
+
+
+def compute_risk_scores(age, heart_rate, systolic_bp, diastolic_bp, blood_sugar):
+    """Score patient risk from vitals using vectorized boolean masks."""
+    age = np.asarray(age)
+    heart_rate = np.asarray(heart_rate)
+
+    scores = 2 * (age > 65).astype(np.int64)
+    scores += (heart_rate > 100) | (heart_rate < 60)
+    scores += 2 * (np.asarray(systolic_bp) > 140)
+    scores += np.asarray(diastolic_bp) > 90
+    scores += np.asarray(blood_sugar) > 126
+    return scores
+
+
+def categorize_risk(scores):
+    """Map risk scores to risk categories (0-1 Low, 2-3 Medium, 4+ High)."""
+    scores = np.asarray(scores)
+    return np.select([scores <= 1, scores <= 3], RISK_CATEGORIES[:2], default=RISK_CATEGORIES[2])
+
+
+# Compact per-column dtypes; ranges comfortably cover the generated vitals
+COMPACT_DTYPES = {
+    "Age": np.int8,
+    "Heart_Rate": np.int16,
+    "Systolic_BP": np.int16,
+    "Diastolic_BP": np.int16,
+    "Temperature": np.float32,
+    "Blood_Sugar": np.int16,
+    "Risk_Score": np.int8,
+}
+
+# Ordered categorical for Risk_Category in compact frames
+RISK_DTYPE = pd.CategoricalDtype(RISK_CATEGORIES, ordered=True)
+
+
+def add_risk_columns(data):
+    """Add Risk_Category and Risk_Score to a column dict or DataFrame."""
+    scores = compute_risk_scores(
+        data["Age"], data["Heart_Rate"], data["Systolic_BP"], data["Diastolic_BP"], data["Blood_Sugar"]
+    )
+    data["Risk_Category"] = categorize_risk(scores)
+    data["Risk_Score"] = scores
+    return data
+
+
+# Patients per independent RNG block; chunk boundaries never change the output
+BLOCK_SIZE = 1 << 16
+
+# Default number of patients per streamed chunk
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Per-column draws, in column order. Each column of each block owns a substream.
+_COLUMN_DRAWS = [
+    ("Age", lambda rng, k: rng.integers(18, 85, k)),
+    ("Heart_Rate", lambda rng, k: rng.normal(75, 12, k).astype(int)),
+    ("Systolic_BP", lambda rng, k: rng.normal(120, 15, k).astype(int)),
+    ("Diastolic_BP", lambda rng, k: rng.normal(80, 10, k).astype(int)),
+    ("Temperature", lambda rng, k: rng.normal(98.6, 1.2, k).round(1)),
+    ("Blood_Sugar", lambda rng, k: rng.normal(100, 20, k).astype(int)),
+]
+
+
+def patient_ids(start, stop):
+    """Return Patient_IDs for 0-based patient positions [start, stop)."""
+    return [f"P{i:03d}" for i in range(start + 1, stop + 1)]
+
+
+class CohortStream:
+    """Sequential cohort generator over independent per-block RNG substreams.
+
+    Patient ``i`` lives in block ``i // BLOCK_SIZE``. Every column of every
+    block is drawn from ``SeedSequence(seed).spawn()[block].spawn()[column]``,
+    so the values of a patient depend only on ``(seed, i)`` and never on how
+    the cohort is split into chunks.
+    """
+
+    def __init__(self, seed=42, start=0):
+        self.seed = seed
+        self.position = start
+        self._block = None
+        self._rngs = None
+
+    def _open_block(self, block):
+        # SeedSequence(seed, spawn_key=(b, c)) is the c-th child of the b-th
+        # child of SeedSequence(seed), i.e. the same stream spawn() hands out.
+        self._block = block
+        self._rngs = [
+            np.random.Generator(np.random.PCG64(np.random.SeedSequence(self.seed, spawn_key=(block, column))))
+            for column in range(len(_COLUMN_DRAWS))
+        ]
+
+    @property
+    def state(self):
+        """JSON-serializable snapshot from which ``from_state`` resumes exactly."""
+        return {
+            "seed": self.seed,
+            "position": self.position,
+            "block": self._block,
+            "rng_states": None if self._rngs is None else [rng.bit_generator.state for rng in self._rngs],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Resume a stream from a ``state`` snapshot without replaying draws."""
+        stream = cls(state["seed"], state["position"])
+        if state["rng_states"] is not None:
+            stream._open_block(state["block"])
+            for rng, rng_state in zip(stream._rngs, state["rng_states"]):
+                rng.bit_generator.state = rng_state
+        return stream
+
+    def draw(self, n_patients):
+        """Draw the next ``n_patients`` patients as a dict of column arrays."""
+        parts = {name: [] for name, _ in _COLUMN_DRAWS}
+        remaining = n_patients
+        while remaining > 0:
+            block, offset = divmod(self.position, BLOCK_SIZE)
+            if block != self._block:
+                self._open_block(block)
+                if offset:
+                    # Starting mid-block: replay the skipped prefix of each substream
+                    for (_, draw), rng in zip(_COLUMN_DRAWS, self._rngs):
+                        draw(rng, offset)
+            take = min(remaining, BLOCK_SIZE - offset)
+            for (name, draw), rng in zip(_COLUMN_DRAWS, self._rngs):
+                parts[name].append(draw(rng, take))
+            self.position += take
+            remaining -= take
+
+        data = {}
+        for name, draw in _COLUMN_DRAWS:
+            # An empty draw takes its dtype from a zero-length sample that leaves the stream untouched
+            arrays = parts[name] or [draw(np.random.default_rng(), 0)]
+            data[name] = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+        return add_risk_columns(data)
+
+
+def frame_patient_ids(df):
+    """Derive Patient_IDs on demand from a cohort frame's positional index."""
+    return [f"P{i + 1:03d}" for i in df.index]
+
+
+def with_patient_ids(df):
+    """Return ``df`` with a leading Patient_ID column, derived if the frame has none."""
+    if "Patient_ID" in df.columns:
+        return df
+    frame = df.copy(deep=False)
+    frame.insert(0, "Patient_ID", pd.Series(frame_patient_ids(df), index=df.index, dtype=str))
+    return frame
+
+
+def _compact_columns(data):
+    """Downcast generated columns to their compact dtypes."""
+    compact = {name: np.asarray(data[name]).astype(dtype, copy=False) for name, dtype in COMPACT_DTYPES.items()}
+    compact["Risk_Category"] = pd.Categorical.from_codes(
+        np.asarray(data["Risk_Score"]).clip(1, 4).astype(np.int8) // 2, dtype=RISK_DTYPE
+    )
+    return {name: compact[name] for name in data}
+
+
+def _chunk_frame(data, start, stop, compact=False):
+    """Build a cohort DataFrame chunk for patient positions [start, stop).
+
+    Compact chunks drop the Patient_ID strings (see ``frame_patient_ids``)
+    and use the narrow dtypes in ``COMPACT_DTYPES`` and ``RISK_DTYPE``.
+    """
+    index = pd.RangeIndex(start, stop)
+    if compact:
+        return pd.DataFrame(_compact_columns(data), index=index)
+    frame = {"Patient_ID": pd.Series(patient_ids(start, stop), index=index, dtype=str)}
+    frame.update(data)
+    return pd.DataFrame(frame, index=index)
+
+
+def to_compact(df):
+    """Convert a standard cohort frame to the compact representation."""
+    return pd.DataFrame(_compact_columns(df.drop(columns="Patient_ID")), index=df.index)
+
+
+def feature_matrix(df, dtype=np.float32):
+    """Return the model features as a C-contiguous array.
+
+    float32 is what RandomForestClassifier uses internally, and
+    StandardScaler preserves it, so no float64 copies are made.
+    """
+    return np.ascontiguousarray(df[FEATURE_COLUMNS].to_numpy(dtype=dtype))
+
+
+def memory_footprint(df):
+    """Return the in-memory size of a frame in bytes, including strings."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def compare_memory_footprint(n_patients=100_000, seed=42):
+    """Compare standard and compact cohort memory footprints."""
+    standard = memory_footprint(generate_cohort(n_patients, seed=seed))
+    compact = memory_footprint(generate_cohort(n_patients, seed=seed, compact=True))
+    return {
+        "n_patients": n_patients,
+        "standard_bytes": standard,
+        "compact_bytes": compact,
+        "ratio": standard / compact,
+    }
+
+
+def iter_cohort_chunks(n_patients, chunk_size=DEFAULT_CHUNK_SIZE, seed=42, as_frame=True, compact=False):
+    """Yield a synthetic cohort of ``n_patients`` in chunks of ``chunk_size``.
+
+    Chunks are DataFrames with the same columns as ``generate_synthetic_data``
+    or, with ``as_frame=False``, dicts of NumPy arrays. Concatenating the
+    chunks gives the same cohort for every chunk size. ``compact=True``
+    yields compact frames (see ``_chunk_frame``).
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    stream = CohortStream(seed)
+    for start in range(0, n_patients, chunk_size):
+        stop = min(start + chunk_size, n_patients)
+        data = stream.draw(stop - start)
+        if as_frame:
+            yield _chunk_frame(data, start, stop, compact)
+        else:
+            data["Patient_ID"] = np.array(patient_ids(start, stop))
+            yield data
+
+
+def resolve_n_jobs(n_jobs):
+    """Map an ``n_jobs`` argument to a worker count: None or 0 means 1, negative means all cores."""
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+def _generate_shard(seed, start, stop):
+    """Generate patient positions [start, stop) as column arrays (pool worker)."""
+    return CohortStream(seed, start).draw(stop - start)
+
+
+def _shard_bounds(n_patients, n_shards):
+    """Split [0, n_patients) into at most n_shards block-aligned ranges."""
+    n_blocks = -(-n_patients // BLOCK_SIZE)
+    blocks_per_shard = max(1, -(-n_blocks // n_shards))
+    step = blocks_per_shard * BLOCK_SIZE
+    return [(start, min(start + step, n_patients)) for start in range(0, n_patients, step)]
+
+
+def generate_cohort(n_patients=100, seed=42, n_jobs=None, compact=False):
+    """Generate a synthetic cohort without touching the global NumPy RNG.
+
+    With ``n_jobs`` > 1 (or -1 for all cores) block-aligned shards are
+    generated in a process pool. Each shard draws from its own spawned
+    SeedSequence substreams, so the result is identical for any worker count.
+    ``compact=True`` returns narrow dtypes without Patient_ID strings.
+    """
+    if n_patients < 0:
+        raise ValueError(f"n_patients must be non-negative, got {n_patients}")
+    n_jobs = resolve_n_jobs(n_jobs)
+
+    shards = _shard_bounds(n_patients, n_jobs)
+    if n_jobs == 1 or len(shards) <= 1:
+        stream = CohortStream(seed)
+        data = stream.draw(n_patients)
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(shards))) as pool:
+            parts = list(pool.map(_generate_shard, *zip(*[(seed, a, b) for a, b in shards])))
+        data = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        stream = None
+
+    df = _chunk_frame(data, 0, n_patients, compact)
+    df.attrs["seed"] = seed
+    df.attrs["cohort_stream"] = None if stream is None else stream.state
+    return df
+
+
+def generate_rows(start, k, seed=42, state=None, compact=False):
+    """Generate patient positions [start, start + k) as a cohort frame.
+
+    ``state`` is a saved ``CohortStream.state``; when it stopped at ``start``
+    the substreams resume from it, otherwise the stream is re-opened at
+    ``start`` by replaying at most one block. Returns the frame and the
+    stream state after the new rows.
+    """
+    if state is not None and state["seed"] == seed and state["position"] == start:
+        stream = CohortStream.from_state(state)
+    else:
+        stream = CohortStream(seed, start)
+    return _chunk_frame(stream.draw(k), start, start + k, compact), stream.state
+
+
+def extend_cohort(df, k, seed=None):
+    """Return a copy of a ``generate_cohort`` frame with ``k`` new patients appended.
+
+    Only the ``k`` new rows are generated (see ``generate_rows``, resuming
+    the state saved in ``df.attrs``), so the result equals a fresh
+    generation of ``len(df) + k`` patients; the existing rows are copied
+    once into the new frame. The new rows take ``df``'s columns and dtypes,
+    so cache-loaded frames (no Patient_ID) extend like generated ones.
+    ``CohortCache.extend`` grows cached cohorts on disk without that copy.
+    """
+    n_patients = len(df)
+    if seed is None:
+        seed = df.attrs.get("seed", 42)
+    new_rows, state = generate_rows(n_patients, k, seed, df.attrs.get("cohort_stream"),
+                                    compact=df["Age"].dtype == COMPACT_DTYPES["Age"])
+    new_rows = new_rows[df.columns].astype(df.dtypes.to_dict())
+    extended = pd.concat([df, new_rows])
+    extended.attrs["seed"] = seed
+    extended.attrs["cohort_stream"] = state
+    return extended
+
+
+# Philox counter increments per virtual patient (4 x 64-bit words each)
+_PHILOX_STEPS_PER_PATIENT = 2
+
+
+class VirtualCohort:
+    """Random-access cohort backed by a counter-based (Philox) generator.
+
+    Patient ``i`` is computed directly from ``(seed, i)``: its random words
+    come from Philox counters ``[2 * i, 2 * i + 2)``, so any patient or row
+    range can be materialized without generating the patients before it.
+    The vitals follow the same distributions as ``generate_cohort`` but are
+    a different sample of them.
+    """
+
+    def __init__(self, n_patients=1_000_000_000, seed=42):
+        self.n_patients = n_patients
+        self.seed = seed
+        self._key = np.random.SeedSequence(seed).generate_state(2, np.uint64)
+
+    def __len__(self):
+        return self.n_patients
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.n_patients)
+            if step != 1:
+                raise ValueError("VirtualCohort slices must be contiguous")
+            return self.rows(start, stop)
+        return self.patient(item)
+
+    def _uniforms(self, start, stop):
+        """Return uniforms in (0, 1) with one row of 8 per patient."""
+        bit_generator = np.random.Philox(key=self._key, counter=start * _PHILOX_STEPS_PER_PATIENT)
+        words = bit_generator.random_raw((stop - start) * 4 * _PHILOX_STEPS_PER_PATIENT).reshape(stop - start, -1)
+        return ((words >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0**-53
+
+    def rows(self, start, stop):
+        """Materialize patients at 0-based positions [start, stop)."""
+        if not 0 <= start <= stop <= self.n_patients:
+            raise IndexError(f"rows [{start}, {stop}) outside cohort of {self.n_patients}")
+
+        u = self._uniforms(start, stop)
+        # Box-Muller on three uniform pairs gives up to six standard normals
+        radius = np.sqrt(-2.0 * np.log(u[:, 1:7:2]))
+        angle = 2.0 * np.pi * u[:, 2:7:2]
+        z = np.concatenate([radius * np.cos(angle), radius * np.sin(angle)], axis=1)
+
+        data = {
+            "Age": 18 + (u[:, 0] * 67).astype(np.int64),
+            "Heart_Rate": (75 + 12 * z[:, 0]).astype(int),
+            "Systolic_BP": (120 + 15 * z[:, 1]).astype(int),
+            "Diastolic_BP": (80 + 10 * z[:, 2]).astype(int),
+            "Temperature": (98.6 + 1.2 * z[:, 3]).round(1),
+            "Blood_Sugar": (100 + 20 * z[:, 4]).astype(int),
+        }
+        return _chunk_frame(add_risk_columns(data), start, stop)
+
+    def patient(self, i):
+        """Materialize a single patient as a Series."""
+        if i < 0:
+            i += self.n_patients
+        return self.rows(i, i + 1).iloc[0]
+
+
+def write_cohort_csv(path, n_patients, chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+    """Stream a synthetic cohort to a CSV file with bounded memory."""
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for chunk in iter_cohort_chunks(n_patients, chunk_size, seed):
+            chunk.to_csv(f, header=rows == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def write_cohort_parquet(path, n_patients, chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+    """Stream a synthetic cohort to a Parquet file, one row group per chunk."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Writing Parquet cohorts requires pyarrow (pip install pyarrow)") from e
+
+    rows = 0
+    writer = None
+    try:
+        for chunk in iter_cohort_chunks(n_patients, chunk_size, seed):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+if __name__ == "__main__":
+    report = compare_memory_footprint(1_000_000)
+    print("🧮 Cohort Memory Footprint")
+    print("=" * 50)
+    print(f"   Patients:  {report['n_patients']:,}")
+    print(f"   Standard:  {report['standard_bytes'] / 1e6:8.1f} MB")
+    print(f"   Compact:   {report['compact_bytes'] / 1e6:8.1f} MB")
+    print(f"   Reduction: {report['ratio']:.1f}x more patients per replica")
@@ -9,6 +9,26 @@ import pytest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+@pytest.fixture(autouse=True)
+def isolated_app_caches(tmp_path, monkeypatch):
+    """Point the cohort cache and model registry at empty temp dirs, with cold Streamlit caches."""
+    import streamlit as st
+
+    import cohort_cache
+    import model_registry
+
+    cache_dir, registry_dir = str(tmp_path / "cohort_cache"), str(tmp_path / "model_registry")
+    monkeypatch.setenv("NINO_COHORT_CACHE", cache_dir)
+    monkeypatch.setenv("NINO_MODEL_REGISTRY", registry_dir)
+    monkeypatch.setattr(cohort_cache, "DEFAULT_CACHE_DIR", cache_dir)
+    monkeypatch.setattr(model_registry, "DEFAULT_REGISTRY_DIR", registry_dir)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    yield registry_dir
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
 class TestMedicalAIApp:
     """Test class for medical AI application."""
 
@@ -31,6 +51,33 @@ class TestMedicalAIApp:
         for col in expected_cols:
             assert col in test_df.columns, f"Column {col} should be present"
 
+    @pytest.mark.unit
+    def test_cohort_views_are_isolated(self):
+        """Test that edits to one session's cohort never reach the shared cohort."""
+        from app import get_cohort
+
+        first = get_cohort(30)
+        original_age = first.loc[0, "Age"]
+        try:
+            first.loc[0, "Age"] = original_age + 1
+        except ValueError:
+            pass  # without Copy-on-Write the shared buffers are read-only, so the edit is refused
+        first["Cluster"] = 0
+
+        second = get_cohort(30)
+        assert second.loc[0, "Age"] == original_age
+        assert "Cluster" not in second.columns
+
+    @pytest.mark.unit
+    def test_generated_cohort_is_read_only(self):
+        """Test the in-memory fallback cohort is frozen like the memory-mapped one."""
+        from app import _read_only
+        from synthetic_data import FEATURE_COLUMNS, generate_cohort
+
+        shared = _read_only(generate_cohort(20))
+        assert not any(shared[name].to_numpy().flags.writeable for name in FEATURE_COLUMNS)
+        assert shared.equals(generate_cohort(20))
+
     @pytest.mark.unit
     def test_patient_data_values(self):
         """Test that patient data values are valid."""
@@ -170,3 +217,60 @@ class TestMachineLearningComponents:
         assert len(predictions) == len(y_test), "Should predict for all test samples"
         assert all(pred in ['A', 'B', 'C'] for pred in predictions), \
             "All predictions should be valid classes"
+
+
+class TestPatientScoringPanel:
+    """Test the interactive single-patient scoring panel."""
+
+    @pytest.mark.unit
+    def test_sliders_rescore_without_retraining(self, isolated_app_caches):
+        """Test that moving a slider rescores the patient using the cached model."""
+        from streamlit.testing.v1 import AppTest
+
+        app_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+        at = AppTest.from_file(app_path, default_timeout=120).run()
+        assert not at.exception
+        assert os.listdir(isolated_app_caches), "the first run should train and register a model"
+
+        for feature, value in {"Age": 80, "Systolic_BP": 190, "Blood_Sugar": 200}.items():
+            at.slider(key=f"score_{feature}").set_value(value)
+        at.run()
+
+        assert not at.exception
+        metrics = {m.label: m.value for m in at.metric}
+        assert metrics["Predicted Risk"] in ["Low Risk", "Medium Risk", "High Risk"]
+        assert metrics["Scoring Latency"].endswith(" ms")
+        assert not any(p.proto.text.startswith("Training risk model") for p in at.get("progress"))
+
+
+class TestThresholdExplorer:
+    """Test the High Risk decision threshold explorer."""
+
+    @pytest.mark.unit
+    def test_threshold_slider_never_reruns_forest(self, monkeypatch, isolated_app_caches):
+        """Test that moving the threshold recomputes metrics from cached probabilities only."""
+        from sklearn.ensemble import RandomForestClassifier
+        from streamlit.testing.v1 import AppTest
+
+        app_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+        at = AppTest.from_file(app_path, default_timeout=120).run()
+        assert not at.exception
+        assert os.listdir(isolated_app_caches), "the first run should train and register a model"
+
+        def forest_called(*args, **kwargs):
+            raise AssertionError("random forest re-run for a threshold change")
+
+        monkeypatch.setattr(RandomForestClassifier, "predict", forest_called)
+        monkeypatch.setattr(RandomForestClassifier, "predict_proba", forest_called)
+
+        at.slider(key="high_risk_threshold").set_value(0.0)
+        at.run()
+        assert not at.exception
+        metrics = {m.label: m.value for m in at.metric}
+        assert metrics["High Risk Recall"] == "100.0%"
+        assert metrics["Flagged as High Risk"] == "30"
+
+        at.slider(key="high_risk_threshold").set_value(1.0)
+        at.run()
+        assert not at.exception
+        assert {m.label: m.value for m in at.metric}["Flagged as High Risk"] == "0"
@@ -0,0 +1,91 @@
+"""Unit tests for chunked batch scoring of patient files."""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def registered_model(tmp_path):
+    from medical_ai_core import generate_synthetic_data, split_dataset, train_risk_model
+    from model_registry import ModelRegistry
+
+    X_train, _, y_train, _ = split_dataset(generate_synthetic_data(500))
+    risk_model = train_risk_model(X_train, y_train, n_estimators=10)
+    return risk_model, ModelRegistry(str(tmp_path / "registry")).save(risk_model)
+
+
+class TestBatchScoring:
+    """Test streaming a patient file through the registered risk model."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_csv_scores_match_model(self, tmp_path, registered_model, executor):
+        """Test chunked scores equal the model's predictions, in input order."""
+        from batch_scoring import score_file
+        from synthetic_data import FEATURE_COLUMNS, write_cohort_csv
+
+        risk_model, registered = registered_model
+        input_path = str(tmp_path / "patients.csv")
+        output_path = str(tmp_path / "scores.csv")
+        write_cohort_csv(input_path, 1_000, chunk_size=300)
+
+        report = score_file(input_path, output_path, registered, chunk_size=128, executor=executor, workers=2)
+
+        patients = pd.read_csv(input_path)
+        scores = pd.read_csv(output_path)
+        assert report["rows"] == len(scores) == 1_000
+        assert report["metrics"]["confusion_matrix"].sum() == 1_000
+        assert scores["Patient_ID"].tolist() == patients["Patient_ID"].tolist()
+        assert scores["Predicted_Risk"].tolist() == risk_model.predict(patients[FEATURE_COLUMNS]).tolist()
+        proba = scores[[f"Prob_{c.replace(' ', '_')}" for c in risk_model.classes_]].to_numpy()
+        assert np.allclose(proba, risk_model.predict_proba(patients[FEATURE_COLUMNS]))
+
+    @pytest.mark.unit
+    def test_parquet_round_trip(self, tmp_path, registered_model):
+        """Test Parquet input and output."""
+        pytest.importorskip("pyarrow")
+        from batch_scoring import score_file
+        from synthetic_data import write_cohort_parquet
+
+        _, registered = registered_model
+        input_path = str(tmp_path / "patients.parquet")
+        output_path = str(tmp_path / "scores.parquet")
+        write_cohort_parquet(input_path, 700, chunk_size=300)
+
+        report = score_file(input_path, output_path, registered, chunk_size=200)
+
+        scores = pd.read_parquet(output_path)
+        assert report["rows"] == len(scores) == 700
+        assert scores["Patient_ID"].tolist() == pd.read_parquet(input_path)["Patient_ID"].tolist()
+
+    @pytest.mark.unit
+    def test_bad_labels_excluded_from_metrics(self, tmp_path, registered_model):
+        """Test that rows with missing or unknown labels mid-file are scored but not evaluated."""
+        from batch_scoring import score_file
+        from metrics_engine import evaluate_labels
+        from synthetic_data import FEATURE_COLUMNS, RISK_CATEGORIES, generate_cohort
+
+        risk_model, registered = registered_model
+        patients = generate_cohort(1_000, seed=3)
+        patients["Risk_Category"] = patients["Risk_Category"].astype(object)
+        patients.loc[500, "Risk_Category"] = None
+        patients.loc[501, "Risk_Category"] = "Critical"
+        input_path = str(tmp_path / "patients.csv")
+        output_path = str(tmp_path / "scores.csv")
+        patients.to_csv(input_path, index=False)
+
+        report = score_file(input_path, output_path, registered, chunk_size=128)
+
+        assert report["rows"] == len(pd.read_csv(output_path)) == 1_000
+        assert report["excluded_labels"] == 2
+        known = patients.drop(index=[500, 501])
+        expected = evaluate_labels(known["Risk_Category"], risk_model.predict(known[FEATURE_COLUMNS]),
+                                   labels=RISK_CATEGORIES)
+        assert (report["metrics"]["confusion_matrix"] == expected["confusion_matrix"]).all()
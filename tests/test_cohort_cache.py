@@ -0,0 +1,145 @@
+"""Unit tests for the persistent cohort cache."""
+
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _as_cached(df):
+    """Return a generated cohort as the cache loads it: categorical risk, no Patient_ID."""
+    from synthetic_data import RISK_DTYPE
+
+    return df.drop(columns="Patient_ID", errors="ignore").astype({"Risk_Category": RISK_DTYPE})
+
+
+class TestCohortCache:
+    """Test content-addressed, memory-mapped cohort caching."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_round_trip_matches_generation(self, tmp_path, compact):
+        """Test that cached cohorts reload identical and read-only."""
+        import pandas as pd
+
+        from cohort_cache import CohortCache
+        from synthetic_data import RISK_DTYPE, generate_cohort, with_patient_ids
+
+        cache = CohortCache(str(tmp_path))
+        assert cache.get(500, seed=4, compact=compact) is None
+
+        cache.load_cohort(500, seed=4, compact=compact)
+        cached = cache.get(500, seed=4, compact=compact)
+
+        expected = generate_cohort(500, seed=4, compact=compact)
+        pd.testing.assert_frame_equal(cached, _as_cached(expected))
+        if not compact:
+            # Patient_IDs are derived from the index instead of stored
+            pd.testing.assert_frame_equal(with_patient_ids(cached), expected.astype({"Risk_Category": RISK_DTYPE}))
+        assert not cached["Age"].to_numpy().flags.writeable
+        assert not cached["Risk_Category"].array.codes.flags.writeable
+
+    @pytest.mark.unit
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used cohort is evicted first."""
+        from cohort_cache import CohortCache
+
+        cache = CohortCache(str(tmp_path), max_bytes=10**9)
+        cache.load_cohort(1_000, seed=1)
+        os.utime(os.path.join(cache.cache_dir, cache.key(1_000, 1, compact=False), "meta.json"), (0, 0))
+        cache.load_cohort(1_000, seed=2)
+
+        cache.max_bytes = cache.size_bytes() - 1
+        cache.evict()
+
+        assert cache.get(1_000, seed=1) is None
+        assert cache.get(1_000, seed=2) is not None
+
+    @pytest.mark.unit
+    def test_extend_matches_fresh_generation(self, tmp_path):
+        """Test that extending a cached cohort equals generating the larger one."""
+        import pandas as pd
+
+        from cohort_cache import CohortCache
+        from synthetic_data import BLOCK_SIZE, generate_cohort
+
+        cache = CohortCache(str(tmp_path))
+        cache.load_cohort(BLOCK_SIZE - 10, seed=8, compact=True)
+        extended = cache.extend(BLOCK_SIZE - 10, 200, seed=8, compact=True)
+        grown = cache.load_cohort(BLOCK_SIZE + 400, seed=8, compact=True)
+
+        pd.testing.assert_frame_equal(extended, generate_cohort(BLOCK_SIZE + 190, seed=8, compact=True))
+        pd.testing.assert_frame_equal(grown, generate_cohort(BLOCK_SIZE + 400, seed=8, compact=True))
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_extend_appends_without_rewriting(self, tmp_path, compact):
+        """Test that extending appends to the existing column files instead of rewriting them."""
+        import pandas as pd
+
+        from cohort_cache import CohortCache
+        from synthetic_data import generate_cohort
+
+        cache = CohortCache(str(tmp_path))
+        cache.load_cohort(1_000, seed=5, compact=compact)
+        entry = os.path.join(cache.cache_dir, cache.key(1_000, 5, compact=compact))
+        before = {name: os.stat(os.path.join(entry, name)) for name in os.listdir(entry) if name.endswith(".npy")}
+        with open(os.path.join(entry, "Age.npy"), "rb") as f:
+            age_prefix = f.read()[-1_000:]
+
+        extended = cache.extend(1_000, 300, seed=5, compact=compact)
+
+        grown = os.path.join(cache.cache_dir, cache.key(1_300, 5, compact=compact))
+        for name, stat in before.items():
+            after = os.stat(os.path.join(grown, name))
+            assert after.st_ino == stat.st_ino, f"{name} was rewritten"
+            assert after.st_size > stat.st_size
+        with open(os.path.join(grown, "Age.npy"), "rb") as f:
+            assert age_prefix in f.read()
+
+        pd.testing.assert_frame_equal(extended, _as_cached(generate_cohort(1_300, seed=5, compact=compact)))
+        # The smaller cohort is still served, as a prefix of the grown entry
+        pd.testing.assert_frame_equal(cache.get(1_000, seed=5, compact=compact),
+                                      _as_cached(generate_cohort(1_000, seed=5, compact=compact)))
+        assert len(cache.entries()) == 1
+
+    @pytest.mark.unit
+    def test_interrupted_append_is_truncated(self, tmp_path):
+        """Test that rows past the recorded size are ignored on load and overwritten on the next extend."""
+        import numpy as np
+        import pandas as pd
+
+        from cohort_cache import CohortCache
+        from synthetic_data import generate_cohort
+
+        cache = CohortCache(str(tmp_path))
+        cache.load_cohort(500, seed=6, compact=True)
+        entry = os.path.join(cache.cache_dir, cache.key(500, 6, compact=True))
+        with open(os.path.join(entry, "Age.npy"), "ab") as f:
+            f.write(np.zeros(7, dtype=np.int8).tobytes())
+
+        pd.testing.assert_frame_equal(cache.get(500, seed=6, compact=True), generate_cohort(500, seed=6, compact=True))
+        pd.testing.assert_frame_equal(cache.extend(500, 100, seed=6, compact=True),
+                                      generate_cohort(600, seed=6, compact=True))
+
+    @pytest.mark.unit
+    def test_loaded_standard_cohort_opens_without_copies(self, tmp_path):
+        """Test a cached standard cohort shares its maps and extends in memory like a generated one."""
+        import pandas as pd
+
+        from cohort_cache import CohortCache
+        from synthetic_data import extend_cohort, generate_cohort
+
+        cache = CohortCache(str(tmp_path))
+        cache.load_cohort(2_000, seed=9)
+        cached = cache.get(2_000, seed=9)
+
+        assert "Patient_ID" not in cached.columns
+        for name in cached.columns:
+            array = cached[name].array
+            array = array.codes if name == "Risk_Category" else array.to_numpy()
+            assert not array.flags.writeable, f"{name} should be a read-only view of its column file"
+        pd.testing.assert_frame_equal(extend_cohort(cached, 300), _as_cached(generate_cohort(2_300, seed=9)))
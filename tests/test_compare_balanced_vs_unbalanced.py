@@ -0,0 +1,90 @@
+"""Unit tests for the balanced vs unbalanced comparison script."""
+
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("imblearn")
+
+
+class TestBalancedGeneration:
+    """Test the block-vectorized balanced cohort generator."""
+
+    @pytest.mark.unit
+    def test_balanced_classes_and_padding(self):
+        """Test class sizes, per-class ranges and exact padding."""
+        from compare_balanced_vs_unbalanced import generate_balanced_data
+
+        df = generate_balanced_data(301, random_state=1)
+
+        assert len(df) == 301
+        assert df["Risk_Category"].value_counts().tolist() == [101, 100, 100]
+        assert df["Patient_ID"].tolist()[-1] == "X000"
+        assert df["Patient_ID"].is_unique
+
+        high = df[df["Risk_Category"] == "High Risk"]
+        assert high["Age"].between(65, 84).all()
+        assert set(high["Heart_Rate"]) <= {45, 50, 55, 110, 120, 130}
+        assert (df.loc[df["Risk_Category"] == "Low Risk", "Risk_Score"] == 0).all()
+
+    @pytest.mark.unit
+    def test_too_few_patients(self):
+        """Test that cohorts smaller than one patient per class are rejected, not returned empty."""
+        from compare_balanced_vs_unbalanced import generate_balanced_data
+
+        for n_patients in [0, 1, 2]:
+            with pytest.raises(ValueError, match="at least 3 patients"):
+                generate_balanced_data(n_patients)
+        assert generate_balanced_data(3)["Risk_Category"].nunique() == 3
+
+
+class TestExperimentGrid:
+    """Test the checkpointed experiment grid runner."""
+
+    @pytest.mark.unit
+    def test_rerun_only_computes_missing_cells(self, tmp_path):
+        """Test that checkpointed cells are reused and new seeds are computed."""
+        from compare_balanced_vs_unbalanced import run_experiment_grid, summarize_grid
+
+        kwargs = dict(variants=["unbalanced"], weightings=["none", "smote"], sizes=[150], n_jobs=1,
+                      checkpoint_dir=str(tmp_path))
+
+        first = run_experiment_grid(seeds=[1], **kwargs)
+        assert len(first) == 2 and first.attrs["n_computed"] == 2
+        assert len(list(tmp_path.glob("*.json"))) == 2
+
+        cached = run_experiment_grid(seeds=[1], compute=False, **kwargs)
+        assert cached.attrs["n_cached"] == 2
+        assert cached.sort_values("weighting")["f1_macro"].tolist() == first.sort_values("weighting")["f1_macro"].tolist()
+
+        extended = run_experiment_grid(seeds=[1, 2], **kwargs)
+        assert extended.attrs["n_computed"] == 2 and extended.attrs["n_cached"] == 2
+
+        summary = summarize_grid(extended)
+        assert summary["seeds"].tolist() == [2, 2]
+        assert summary["f1_macro"].between(0, 1).all()
+
+    @pytest.mark.unit
+    def test_checkpoints_keyed_by_versions_and_serial_runs_inline(self, tmp_path, monkeypatch):
+        """Test that checkpoints from other library versions are recomputed, without a pool for n_jobs=1."""
+        import compare_balanced_vs_unbalanced
+        from compare_balanced_vs_unbalanced import run_experiment_grid
+
+        def no_pool(*args, **kw):
+            raise AssertionError("process pool started for n_jobs=1")
+
+        monkeypatch.setattr(compare_balanced_vs_unbalanced, "ProcessPoolExecutor", no_pool)
+        kwargs = dict(variants=["unbalanced"], weightings=["none"], sizes=[150], seeds=[3], n_jobs=1,
+                      checkpoint_dir=str(tmp_path))
+
+        first = run_experiment_grid(**kwargs)
+        assert first.attrs["n_computed"] == 1
+        assert all(compare_balanced_vs_unbalanced.CELL_VERSION in path.name for path in tmp_path.glob("*.json"))
+
+        monkeypatch.setattr(compare_balanced_vs_unbalanced, "CELL_VERSION", "gen0-sklearn0.0-imblearn0.0")
+        upgraded = run_experiment_grid(**kwargs)
+        assert upgraded.attrs["n_computed"] == 1 and upgraded.attrs["n_cached"] == 0
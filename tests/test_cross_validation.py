@@ -0,0 +1,52 @@
+"""Unit tests for the parallel cross-validation engine."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestCrossValidate:
+    """Test fold metrics, aggregation and worker-count independence."""
+
+    @pytest.mark.unit
+    def test_parallel_matches_sequential(self):
+        """Test that pooled folds over the memory-mapped data equal in-process folds."""
+        from cross_validation import cross_validate
+        from medical_ai_core import generate_synthetic_data
+
+        df = generate_synthetic_data(600)
+        sequential = cross_validate(df, n_splits=3, n_estimators=10)
+        parallel = cross_validate(df, n_splits=3, n_jobs=2, n_estimators=10)
+
+        assert sequential["mean"] == parallel["mean"]
+        assert np.array_equal(sequential["confusion_matrix"], parallel["confusion_matrix"])
+        assert sequential["confusion_matrix"].sum() == len(df)
+
+    @pytest.mark.unit
+    def test_repeated_folds_and_aggregates(self):
+        """Test repeated K-fold fold count, timings and mean/std aggregation."""
+        from cross_validation import cross_validate
+        from medical_ai_core import generate_synthetic_data
+
+        cv = cross_validate(generate_synthetic_data(300), n_splits=3, n_repeats=2, n_estimators=5)
+
+        assert len(cv["folds"]) == 6
+        assert cv["confusion_matrix"].sum() == 2 * 300
+        assert all(fold["fit_time"] > 0 and fold["n_test"] == 100 for fold in cv["folds"])
+        assert cv["mean"]["accuracy"] == pytest.approx(np.mean([fold["accuracy"] for fold in cv["folds"]]))
+        assert set(cv["f1_per_class"]) == {"High Risk", "Low Risk", "Medium Risk"}
+
+    @pytest.mark.unit
+    def test_evaluate_model_performance_hook(self):
+        """Test that evaluate_model_performance reports cross-validation on request."""
+        from evaluate_model_performance import evaluate_model_performance
+
+        results = evaluate_model_performance(200, cv_folds=3)
+
+        assert len(results["cross_validation"]["folds"]) == 3
+        assert 0.0 <= results["cross_validation"]["mean"]["f1_macro"] <= 1.0
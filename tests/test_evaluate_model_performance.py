@@ -0,0 +1,55 @@
+"""Unit tests for the multi-seed robustness evaluation."""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestMultiSeedEvaluation:
+    """Test seed x size runs, aggregation and the JSON report."""
+
+    @pytest.mark.unit
+    def test_seed_run_is_deterministic(self):
+        """Test that the same seed and cohort size give the same scores."""
+        from evaluate_model_performance import evaluate_seed
+
+        first = evaluate_seed(100, 3)
+        second = evaluate_seed(100, 3)
+        assert first["seed"] == 3 and first["n_patients"] == 100
+        for name in ["accuracy", "f1_macro", "f1_weighted"]:
+            assert first[name] == second[name]
+
+    @pytest.mark.unit
+    def test_multi_seed_summary_and_json(self, tmp_path):
+        """Test that every seed x size runs once and the JSON matches the summary."""
+        from evaluate_model_performance import evaluate_multi_seed
+
+        json_path = tmp_path / "seeds.json"
+        report = evaluate_multi_seed(seeds=[0, 1, 2], sizes=[100, 200], n_jobs=2, json_path=str(json_path))
+
+        assert len(report["runs"]) == 6
+        for size in [100, 200]:
+            accuracy = report["summary"][size]["accuracy"]
+            assert accuracy["min"] <= accuracy["mean"] <= accuracy["max"]
+            assert accuracy["std"] >= 0
+            assert "training_time" in report["summary"][size]
+
+        saved = json.loads(json_path.read_text())
+        assert saved["seeds"] == [0, 1, 2]
+        assert len(saved["runs"]) == 6
+        assert saved["summary"]["100"]["f1_macro"]["mean"] == pytest.approx(report["summary"][100]["f1_macro"]["mean"])
+
+    @pytest.mark.unit
+    def test_results_independent_of_workers(self):
+        """Test that worker processes do not change the scores."""
+        from evaluate_model_performance import evaluate_multi_seed
+
+        serial = evaluate_multi_seed(seeds=[0, 1], sizes=[100], n_jobs=1)
+        parallel = evaluate_multi_seed(seeds=[0, 1], sizes=[100], n_jobs=2)
+        for a, b in zip(serial["runs"], parallel["runs"]):
+            assert (a["seed"], a["accuracy"], a["f1_macro"]) == (b["seed"], b["accuracy"], b["f1_macro"])
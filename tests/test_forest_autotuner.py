@@ -0,0 +1,43 @@
+"""Unit tests for the forest-size autotuner."""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestForestAutotuner:
+    """Test per-size measurements, target selection and the Pareto frontier."""
+
+    @pytest.mark.unit
+    def test_pareto_frontier(self):
+        """Test that dominated sizes are excluded."""
+        from forest_autotuner import pareto_frontier
+
+        table = pd.DataFrame({
+            "oob_f1_macro": [0.80, 0.90, 0.90, 0.95],
+            "latency_ms": [1.0, 2.0, 3.0, 4.0],
+            "memory_kb": [10, 20, 30, 40],
+        })
+        assert pareto_frontier(table).tolist() == [True, True, False, True]
+
+    @pytest.mark.unit
+    def test_autotune_measures_each_size(self):
+        """Test that each size is measured and the smallest one meeting the target is chosen."""
+        from forest_autotuner import autotune_forest
+        from medical_ai_core import generate_synthetic_data
+
+        df = generate_synthetic_data(800)
+        table = autotune_forest(df, sizes=[10, 3, 20], f1_target=0.0)
+
+        assert table["n_estimators"].tolist() == [3, 10, 20]
+        assert table["memory_kb"].is_monotonic_increasing
+        assert table["oob_f1_macro"].between(0, 1).all() and (table["latency_ms"] > 0).all()
+        assert table.attrs["recommended"] == 3
+        assert table["pareto"].iloc[0]
+
+        assert autotune_forest(df, sizes=[3], f1_target=1.1).attrs["recommended"] is None
@@ -0,0 +1,66 @@
+"""Unit tests for the array-flattened forest inference engine."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestCompiledForest:
+    """Test that compiled forests reproduce sklearn exactly."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("params", [{}, {"max_depth": 3, "class_weight": None}])
+    def test_predictions_identical_to_sklearn(self, params):
+        """Test bit-identical probabilities and classes for batches and single rows."""
+        from forest_inference import CompiledForest
+        from medical_ai_core import generate_synthetic_data, split_dataset, train_risk_model
+
+        X_train, X_test, y_train, _ = split_dataset(generate_synthetic_data(2_000))
+        risk_model = train_risk_model(X_train, y_train, n_estimators=20, **params)
+        compiled = CompiledForest.from_risk_model(risk_model)
+
+        X = X_test.to_numpy()
+        assert np.array_equal(compiled.predict_proba(X), risk_model.predict_proba(X_test))
+        assert np.array_equal(compiled.predict(X), risk_model.predict(X_test))
+        assert compiled.predict(X[0]).tolist() == risk_model.predict(X_test.iloc[[0]]).tolist()
+
+    @pytest.mark.unit
+    def test_missing_values_follow_sklearn_routing(self):
+        """Test NaN features take sklearn's per-node missing-value branch and infinities raise."""
+        from forest_inference import CompiledForest
+        from medical_ai_core import generate_synthetic_data, split_dataset, train_risk_model
+
+        X_train, X_test, y_train, _ = split_dataset(generate_synthetic_data(2_000))
+        risk_model = train_risk_model(X_train, y_train, n_estimators=20)
+        compiled = CompiledForest.from_risk_model(risk_model)
+
+        X_missing = X_test.iloc[:50].copy()
+        X_missing["Age"] = np.nan
+        X_missing.iloc[::3, 1] = np.nan
+        assert np.array_equal(compiled.predict_proba(X_missing.to_numpy()), risk_model.predict_proba(X_missing))
+
+        X_inf = X_test.to_numpy()[:1].copy()
+        X_inf[0, 0] = np.inf
+        with pytest.raises(ValueError, match="infinity"):
+            compiled.predict_proba(X_inf)
+
+    @pytest.mark.unit
+    def test_serves_from_registry_arrays(self, tmp_path):
+        """Test that a registry version serves directly from its memory-mapped arrays."""
+        from forest_inference import CompiledForest
+        from medical_ai_core import generate_synthetic_data, split_dataset, train_risk_model
+        from model_registry import ModelRegistry
+
+        X_train, X_test, y_train, _ = split_dataset(generate_synthetic_data(500))
+        risk_model = train_risk_model(X_train, y_train, n_estimators=10)
+        registry = ModelRegistry(str(tmp_path))
+        registry.save(risk_model)
+
+        compiled = CompiledForest.from_registered(registry.load())
+        assert not compiled.threshold.flags.writeable
+        assert np.array_equal(compiled.predict_proba(X_test.to_numpy()), risk_model.predict_proba(X_test))
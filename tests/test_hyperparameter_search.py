@@ -0,0 +1,63 @@
+"""Unit tests for the successive-halving hyperparameter search."""
+
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SMALL_SPACE = {"n_estimators": [5, 10], "max_depth": [2, None], "min_samples_leaf": [1]}
+
+
+class TestSuccessiveHalving:
+    """Test rung elimination and fold-result caching."""
+
+    @pytest.mark.unit
+    def test_rungs(self):
+        """Test rung sizes grow by eta and end at the full cohort."""
+        from hyperparameter_search import halving_rungs
+
+        assert halving_rungs(100, 1000, eta=3) == [100, 300, 900, 1000]
+        assert halving_rungs(500, 500) == [500]
+
+    @pytest.mark.unit
+    def test_halving_and_cache_reuse(self, tmp_path):
+        """Test that configurations are halved per rung and a rerun only reads the cache."""
+        from hyperparameter_search import FoldResultCache, successive_halving
+
+        cache = FoldResultCache(str(tmp_path / "cache"))
+        kwargs = dict(max_patients=400, min_patients=200, eta=2, n_splits=2, space=SMALL_SPACE, n_jobs=1, cache=cache)
+
+        first = successive_halving(**kwargs)
+        assert first["rung"].value_counts().to_dict() == {0: 2, 1: 2}
+        assert first.iloc[0]["n_patients"] == 400
+        assert first.iloc[0]["f1_macro"] >= first.iloc[1]["f1_macro"]
+        assert first.attrs["n_computed"] == (4 + 2) * 2 and first.attrs["n_cached"] == 0
+
+        second = successive_halving(**kwargs)
+        assert second.attrs["n_computed"] == 0 and second.attrs["n_cached"] == 12
+        assert second["f1_macro"].tolist() == first["f1_macro"].tolist()
+
+        # Extending the search reuses every finished rung
+        extended = successive_halving(**dict(kwargs, max_patients=800))
+        assert extended.attrs["n_cached"] == 12 and extended.attrs["n_computed"] == 2
+
+    @pytest.mark.unit
+    def test_serial_runs_inline_and_matches_pool(self, tmp_path, monkeypatch):
+        """Test that n_jobs=1 starts no process pool and scores like the pooled search."""
+        import hyperparameter_search
+        from hyperparameter_search import FoldResultCache, successive_halving
+
+        kwargs = dict(max_patients=400, min_patients=200, eta=2, n_splits=2, space=SMALL_SPACE)
+        pooled = successive_halving(n_jobs=2, cache=FoldResultCache(str(tmp_path / "pooled")), **kwargs)
+
+        def no_pool(*args, **kw):
+            raise AssertionError("process pool started for n_jobs=1")
+
+        monkeypatch.setattr(hyperparameter_search, "ProcessPoolExecutor", no_pool)
+        serial = successive_halving(n_jobs=1, cache=FoldResultCache(str(tmp_path / "serial")), **kwargs)
+
+        assert serial.attrs["n_computed"] == pooled.attrs["n_computed"]
+        assert serial["f1_macro"].tolist() == pooled["f1_macro"].tolist()
@@ -0,0 +1,65 @@
+"""Unit tests for the Streamlit-free training and evaluation core."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class TestMedicalAICore:
+    """Test the importable core used by scripts and benchmarks."""
+
+    @pytest.mark.unit
+    def test_core_import_does_not_load_streamlit(self):
+        """Test that importing the core never imports Streamlit."""
+        code = "import sys, medical_ai_core; print('streamlit' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "False"
+
+    @pytest.mark.unit
+    def test_train_and_evaluate(self):
+        """Test training the risk pipeline and evaluating its predictions."""
+        from medical_ai_core import evaluate_predictions, generate_synthetic_data, split_dataset, train_risk_model
+
+        df = generate_synthetic_data(300)
+        X_train, X_test, y_train, y_test = split_dataset(df)
+        risk_model = train_risk_model(X_train, y_train, n_estimators=10)
+
+        metrics = evaluate_predictions(y_test, risk_model.predict(X_test))
+
+        assert 0.0 <= metrics["f1_macro"] <= 1.0
+        assert metrics["confusion_matrix"].sum() == len(y_test)
+        assert set(metrics["f1_per_class"]) == set(metrics["labels"])
+        assert risk_model.training_time > 0
+        assert list(risk_model.feature_importance().columns) == ["Feature", "Importance"]
+
+
+class TestTrainingService:
+    """Test the background, cached training service."""
+
+    @pytest.mark.unit
+    def test_trains_once_and_matches_direct_fit(self):
+        """Test that jobs are reused and progress-trained forests match a plain fit."""
+        import numpy as np
+
+        from medical_ai_core import generate_synthetic_data, split_dataset, train_risk_model
+        from training_service import TrainingService
+
+        df = generate_synthetic_data(300)
+        service = TrainingService()
+        job = service.submit(df, n_estimators=25)
+        result = job.wait(timeout=60)
+
+        assert service.submit(df, n_estimators=25) is job
+        assert job.status == "done" and job.progress == 1.0
+
+        X_train, X_test, y_train, _ = split_dataset(df)
+        direct = train_risk_model(X_train, y_train, n_estimators=25)
+        assert np.array_equal(result["risk_model"].predict_proba(X_test), direct.predict_proba(X_test))
+        interval = result["confidence_intervals"]["f1_macro"]
+        assert interval["low"] <= interval["estimate"] <= interval["high"]
@@ -0,0 +1,179 @@
+"""Unit tests for the single-pass metrics engine."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LABELS = np.array(["High Risk", "Low Risk", "Medium Risk"])
+
+
+def _random_predictions(seed, n=300, n_true_classes=3):
+    rng = np.random.default_rng(seed)
+    y_true = LABELS[rng.integers(0, n_true_classes, n)]
+    # Mostly correct predictions with some noise, like a fitted model
+    y_pred = np.where(rng.random(n) < 0.8, y_true, LABELS[rng.integers(0, 3, n)])
+    return y_true, y_pred
+
+
+class TestMetricsEngine:
+    """Test that one confusion matrix reproduces scikit-learn's metrics."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("seed, n_true_classes", [(0, 3), (1, 3), (2, 2)])
+    def test_matches_sklearn(self, seed, n_true_classes):
+        """Test every metric and the report text against scikit-learn."""
+        from sklearn.metrics import (accuracy_score, classification_report, confusion_matrix, f1_score,
+                                     precision_score, recall_score)
+
+        from metrics_engine import evaluate_labels
+
+        y_true, y_pred = _random_predictions(seed, n_true_classes=n_true_classes)
+        metrics = evaluate_labels(y_true, y_pred)
+        labels = np.union1d(y_true, y_pred).tolist()
+
+        assert metrics["accuracy"] == accuracy_score(y_true, y_pred)
+        for average in ["macro", "weighted", "micro"]:
+            assert metrics[f"f1_{average}"] == f1_score(y_true, y_pred, average=average, zero_division=0)
+        assert metrics["precision_macro"] == precision_score(y_true, y_pred, average="macro", zero_division=0)
+        assert metrics["recall_macro"] == recall_score(y_true, y_pred, average="macro", zero_division=0)
+        assert list(metrics["f1_per_class"].values()) == f1_score(
+            y_true, y_pred, labels=labels, average=None, zero_division=0).tolist()
+        assert np.array_equal(metrics["confusion_matrix"], confusion_matrix(y_true, y_pred, labels=labels))
+        assert metrics["report"] == classification_report(y_true, y_pred, zero_division=0)
+
+    @pytest.mark.unit
+    def test_streaming_equals_one_pass(self):
+        """Test that chunked and merged accumulation equals a single pass."""
+        from metrics_engine import ConfusionAccumulator, evaluate_labels
+
+        y_true, y_pred = _random_predictions(3, n=1000)
+        labels = LABELS.tolist()
+
+        streamed = ConfusionAccumulator(labels)
+        for start in range(0, 600, 128):
+            streamed.update(y_true[start:min(start + 128, 600)], y_pred[start:min(start + 128, 600)])
+        streamed.merge(ConfusionAccumulator(labels).update(y_true[600:], y_pred[600:]))
+
+        one_pass = evaluate_labels(y_true, y_pred, labels)
+        metrics = streamed.metrics()
+        assert np.array_equal(metrics["confusion_matrix"], one_pass["confusion_matrix"])
+        assert metrics["f1_macro"] == one_pass["f1_macro"] and metrics["report"] == one_pass["report"]
+
+        with pytest.raises(ValueError):
+            streamed.update(["Unknown"], ["Low Risk"])
+
+
+class TestBootstrap:
+    """Test vectorized bootstrap confidence intervals."""
+
+    @pytest.mark.unit
+    def test_intervals_reproducible(self):
+        """Test intervals bracket the estimate, are seed-stable and worker-independent."""
+        from metrics_engine import bootstrap_metrics
+
+        y_true, y_pred = _random_predictions(4, n=2000)
+        intervals = bootstrap_metrics(y_true, y_pred, n_boot=5000, seed=1)
+
+        assert set(intervals) == {"accuracy", "f1_macro", "f1_high_risk"}
+        for interval in intervals.values():
+            assert interval["low"] <= interval["estimate"] <= interval["high"]
+            assert interval["std"] > 0
+        assert bootstrap_metrics(y_true, y_pred, n_boot=5000, seed=1) == intervals
+
+        sequential = bootstrap_metrics(y_true, y_pred, n_boot=25_000, seed=2)
+        assert bootstrap_metrics(y_true, y_pred, n_boot=25_000, seed=2, n_jobs=2) == sequential
+
+    @pytest.mark.unit
+    def test_empty_confusion_matrix(self):
+        """Test that an empty test set gives NaN intervals instead of failing."""
+        from metrics_engine import bootstrap_confusion
+
+        intervals = bootstrap_confusion(np.zeros((3, 3), dtype=np.int64), ["High Risk", "Low Risk", "Medium Risk"])
+
+        assert set(intervals) == {"accuracy", "f1_macro", "f1_high_risk"}
+        for interval in intervals.values():
+            assert all(np.isnan(value) for value in interval.values())
+
+    @pytest.mark.unit
+    def test_matches_pair_resampling(self):
+        """Test the multinomial draw agrees with resampling (y_true, y_pred) pairs."""
+        from metrics_engine import bootstrap_metrics
+
+        y_true, y_pred = _random_predictions(5, n=1000)
+        interval = bootstrap_metrics(y_true, y_pred, n_boot=4000)["accuracy"]
+
+        rng = np.random.default_rng(0)
+        idx = rng.integers(0, len(y_true), (4000, len(y_true)))
+        resampled = (y_true[idx] == y_pred[idx]).mean(axis=1)
+        assert interval["std"] == pytest.approx(resampled.std(), rel=0.1)
+        assert interval["low"] == pytest.approx(np.percentile(resampled, 2.5), abs=0.01)
+
+
+class TestThresholdCurve:
+    """Test operating points derived from cached probabilities."""
+
+    @staticmethod
+    def _probabilities(n=2000, seed=0):
+        classes = ["High Risk", "Low Risk", "Medium Risk"]
+        rng = np.random.default_rng(seed)
+        # Rounded so that many patients share a score (tied thresholds)
+        proba = np.round(rng.dirichlet([1, 1, 1], n), 2)
+        y_true = np.asarray(classes, dtype=object)[rng.integers(0, 3, n)]
+        return y_true, proba, classes
+
+    @pytest.mark.unit
+    def test_confusion_matches_relabelled_predictions(self):
+        """Test every threshold against explicitly relabelling and re-counting."""
+        from metrics_engine import ThresholdCurve, evaluate_labels
+
+        y_true, proba, classes = self._probabilities()
+        curve = ThresholdCurve(y_true, proba, classes)
+        others = proba.copy()
+        others[:, 0] = -np.inf
+        for threshold in [0.0, 0.1, 0.33, 0.5, 0.77, 1.0, 1.1]:
+            codes = np.where(proba[:, 0] >= threshold, 0, others.argmax(axis=1))
+            expected = evaluate_labels(y_true, np.asarray(classes, dtype=object)[codes], labels=classes)
+            assert (curve.confusion_at(threshold) == expected["confusion_matrix"]).all()
+            assert curve.metrics_at(threshold)["f1_macro"] == pytest.approx(expected["f1_macro"])
+
+    @pytest.mark.unit
+    def test_curve_matches_operating_points(self):
+        """Test that the precomputed curve agrees with per-threshold metrics."""
+        from metrics_engine import ThresholdCurve
+
+        y_true, proba, classes = self._probabilities()
+        curve = ThresholdCurve(y_true, proba, classes)
+        table = curve.curve()
+        assert table["threshold"].is_monotonic_decreasing
+        assert table["recall"].is_monotonic_increasing
+        assert table["recall"].iloc[-1] == pytest.approx(1.0)
+        for row in table.iloc[::10].itertuples():
+            point = curve.metrics_at(row.threshold)
+            assert point["recall"] == pytest.approx(row.recall)
+            assert point["precision"] == pytest.approx(row.precision)
+            assert point["n_flagged"] == row.n_flagged
+
+    @pytest.mark.unit
+    def test_unknown_labels_raise(self):
+        """Test that labels outside the class list are rejected."""
+        from metrics_engine import ThresholdCurve
+
+        with pytest.raises(ValueError):
+            ThresholdCurve(["Unknown"], [[0.2, 0.5, 0.3]], ["High Risk", "Low Risk", "Medium Risk"])
+
+    @pytest.mark.unit
+    def test_empty_held_out_set(self):
+        """Test that a curve over zero patients is empty instead of failing."""
+        from metrics_engine import ThresholdCurve
+
+        classes = ["High Risk", "Low Risk", "Medium Risk"]
+        curve = ThresholdCurve([], np.zeros((0, 3)), classes)
+
+        assert curve.curve().empty
+        assert curve.confusion_at(0.5).sum() == 0
+        assert curve.metrics_at(0.0)["n_flagged"] == 0
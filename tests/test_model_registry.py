@@ -0,0 +1,82 @@
+"""Unit tests for the on-disk model registry."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestModelRegistry:
+    """Test versioned, memory-mapped model storage."""
+
+    @pytest.mark.unit
+    def test_load_or_train_reuses_registered_model(self, tmp_path):
+        """Test that a second request loads the registered model instead of training."""
+        from medical_ai_core import generate_synthetic_data, split_dataset
+        from model_registry import ModelRegistry, load_or_train_risk_model
+
+        X_train, X_test, y_train, _ = split_dataset(generate_synthetic_data(300))
+        registry = ModelRegistry(str(tmp_path))
+
+        trained_model, first, trained = load_or_train_risk_model(X_train, y_train, registry=registry, n_estimators=10)
+        loaded_model, second, retrained = load_or_train_risk_model(X_train, y_train, registry=registry, n_estimators=10)
+
+        assert trained and not retrained
+        assert first.version == second.version == 1
+        assert np.array_equal(trained_model.predict_proba(X_test), loaded_model.predict_proba(X_test))
+        assert second.metadata["params"]["n_estimators"] == 10
+
+    @pytest.mark.unit
+    def test_forest_arrays_are_memory_mapped(self, tmp_path):
+        """Test that forest node arrays load read-only and match the fitted trees."""
+        from medical_ai_core import generate_synthetic_data, split_dataset, train_risk_model
+        from model_registry import ModelRegistry
+
+        X_train, _, y_train, _ = split_dataset(generate_synthetic_data(300))
+        risk_model = train_risk_model(X_train, y_train, n_estimators=5)
+        registry = ModelRegistry(str(tmp_path))
+        registry.save(risk_model, data_hash="abc", metrics={"f1_macro": np.float64(0.5)})
+
+        registered = registry.load()
+        arrays = registered.arrays
+        n_nodes = sum(estimator.tree_.node_count for estimator in risk_model.model.estimators_)
+
+        assert registered.metadata["metrics"]["f1_macro"] == 0.5
+        assert arrays["feature"].shape == (n_nodes,)
+        assert not arrays["threshold"].flags.writeable
+        assert arrays["node_offsets"][-1] == n_nodes
+
+    @pytest.mark.unit
+    def test_old_format_versions_are_not_reused(self, tmp_path):
+        """Test that a version in the previous array layout is skipped and retrained."""
+        import json
+
+        from forest_inference import CompiledForest
+        from medical_ai_core import generate_synthetic_data, split_dataset
+        from model_registry import ModelRegistry, load_or_train_risk_model
+
+        X_train, _, y_train, _ = split_dataset(generate_synthetic_data(300))
+        registry = ModelRegistry(str(tmp_path))
+        _, old, _ = load_or_train_risk_model(X_train, y_train, registry=registry, n_estimators=5)
+
+        # Rewrite v1 as the pre-format-version layout (no max_depth array, no format_version)
+        metadata_path = os.path.join(old.path, "metadata.json")
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        del metadata["format_version"]
+        metadata["arrays"].remove("max_depth")
+        os.remove(os.path.join(old.path, "max_depth.npy"))
+        with open(metadata_path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+        _, registered, trained = load_or_train_risk_model(X_train, y_train, registry=registry, n_estimators=5)
+
+        assert trained and registered.version == 2
+        assert registry.find(registered.metadata["data_hash"], {"n_estimators": 5}).version == 2
+        with pytest.raises(ValueError, match="array format"):
+            CompiledForest.from_registered(registry.load(version=1))
+        CompiledForest.from_registered(registered)
@@ -0,0 +1,116 @@
+"""Unit tests for the pipeline scaling benchmark."""
+
+import copy
+import os
+import sys
+
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestScalingBenchmark:
+    """Test the size ladder, per-stage measurements, complexity fits and baseline comparison."""
+
+    @pytest.mark.unit
+    def test_size_ladder(self):
+        """Test ladder sizes and the 10M patient limit."""
+        from scaling_benchmark import size_ladder
+
+        assert size_ladder(1_000, 100_000, 10) == [1_000, 10_000, 100_000]
+        assert size_ladder(1_000, 50_000, 10) == [1_000, 10_000, 50_000]
+        assert size_ladder(1_000, 10_000_000)[-1] == 10_000_000
+        with pytest.raises(ValueError):
+            size_ladder(1_000, 20_000_000)
+
+    @pytest.mark.unit
+    def test_fit_complexity_recovers_exponent(self):
+        """Test that the log-log fit recovers a known power law."""
+        from scaling_benchmark import fit_complexity
+
+        sizes = [100, 1_000, 10_000]
+        fit = fit_complexity(sizes, [2e-6 * n**1.5 for n in sizes])
+        assert fit["exponent"] == pytest.approx(1.5)
+        assert fit["coefficient"] == pytest.approx(2e-6)
+        assert fit["r2"] == pytest.approx(1.0)
+        assert fit_complexity([100], [0.1]) is None
+
+    @pytest.mark.unit
+    def test_benchmark_report(self, tmp_path):
+        """Test that every (size, stage) is measured and the report round-trips through JSON."""
+        from scaling_benchmark import STAGES, load_report, run_scaling_benchmark, save_report
+
+        report = run_scaling_benchmark([200, 400], repeats=2, warmup=1, measure_memory=False, n_estimators=5)
+        assert [(row["n_patients"], row["stage"]) for row in report["results"]] == [
+            (n, stage) for n in [200, 400] for stage in STAGES
+        ]
+        for row in report["results"]:
+            assert 0 < row["min_s"] <= row["median_s"] <= row["max_s"]
+            assert row["peak_mb"] is None
+        assert set(report["complexity"]) == set(STAGES)
+        assert report["settings"]["model_params"]["n_estimators"] == 5
+
+        path = tmp_path / "scaling.json"
+        save_report(report, str(path))
+        assert load_report(str(path))["results"] == report["results"]
+
+    @pytest.mark.unit
+    def test_fit_memory_includes_the_forest(self):
+        """Test the fit stage's peak RSS covers the tree nodes sklearn allocates in C."""
+        import scaling_benchmark
+        from medical_ai_core import DEFAULT_MODEL_PARAMS
+
+        if scaling_benchmark.resource is None:
+            pytest.skip("peak RSS needs the resource module")
+
+        params = dict(DEFAULT_MODEL_PARAMS, n_estimators=20)
+        outputs = {}
+        for stage, fn in scaling_benchmark._pipeline_stages(20_000, 42, params):
+            outputs[stage] = fn(outputs)
+        forest_mb = sum(tree.tree_.__getstate__()["nodes"].nbytes + tree.tree_.value.nbytes
+                        for tree in outputs["fit"].estimators_) / 1024**2
+
+        peak_mb = scaling_benchmark.measure_stage_memory("fit", outputs, 20_000, n_estimators=20)
+        assert peak_mb >= forest_mb
+
+    @pytest.mark.unit
+    def test_baseline_comparison(self):
+        """Test that only slowdowns beyond tolerance and noise floor are regressions."""
+        from scaling_benchmark import compare_to_baseline
+
+        baseline = {"environment": {"sklearn": "1.6.0"}, "settings": {"model_params": {"n_estimators": 100}},
+                    "results": [
+            {"n_patients": 1000, "stage": "fit", "median_s": 0.5, "peak_mb": 10.0},
+            {"n_patients": 1000, "stage": "predict", "median_s": 0.001, "peak_mb": 0.1},
+        ]}
+        report = copy.deepcopy(baseline)
+        assert not any(row["regression"] for row in compare_to_baseline(report, baseline))
+
+        report["results"][0]["median_s"] = 1.0
+        report["results"][1]["median_s"] = 0.002  # doubled, but under the noise floor
+        comparison = {row["stage"]: row for row in compare_to_baseline(report, baseline)}
+        assert comparison["fit"]["regression"] and comparison["fit"]["time_ratio"] == pytest.approx(2.0)
+        assert not comparison["predict"]["regression"]
+
+        report = copy.deepcopy(baseline)
+        report["results"][0]["peak_mb"] = 20.0
+        assert compare_to_baseline(report, baseline)[0]["regression"]
+
+    @pytest.mark.unit
+    def test_mismatched_baseline_is_refused(self):
+        """Test that baselines from other settings or environments are not compared silently."""
+        from scaling_benchmark import baseline_mismatches, compare_to_baseline
+
+        baseline = {"environment": {"sklearn": "1.6.0", "cpu_count": 8},
+                    "settings": {"model_params": {"n_estimators": 100}},
+                    "results": [{"n_patients": 1000, "stage": "fit", "median_s": 0.5, "peak_mb": 10.0}]}
+        report = copy.deepcopy(baseline)
+        report["environment"]["cpu_count"] = 2
+        report["settings"]["model_params"]["n_estimators"] = 10
+
+        assert {(section, key) for section, key, _, _ in baseline_mismatches(report, baseline)} == {
+            ("environment", "cpu_count"), ("settings", "model_params")}
+        with pytest.raises(ValueError, match="n_estimators"):
+            compare_to_baseline(report, baseline)
+        assert len(compare_to_baseline(report, baseline, allow_mismatch=True)) == 1
@@ -0,0 +1,117 @@
+"""Unit tests for the micro-batching HTTP scoring server."""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="module")
+def compiled_forest():
+    from forest_inference import CompiledForest
+    from medical_ai_core import generate_synthetic_data, split_dataset, train_risk_model
+
+    X_train, _, y_train, _ = split_dataset(generate_synthetic_data(500))
+    return CompiledForest.from_risk_model(train_risk_model(X_train, y_train, n_estimators=10))
+
+
+class TestScoringServer:
+    """Test micro-batched serving over a local socket."""
+
+    @pytest.mark.unit
+    def test_predictions_batched_and_counted(self, compiled_forest):
+        """Test concurrent requests are answered correctly, batched and counted."""
+        from scoring_server import ScoringServer, _post_json, fetch_metrics, load_test
+        from synthetic_data import FEATURE_COLUMNS, generate_cohort
+
+        patient = generate_cohort(1, seed=7)[FEATURE_COLUMNS].iloc[0].astype(float).to_dict()
+
+        async def scenario():
+            server = ScoringServer(compiled_forest, port=0, max_batch=16, max_wait_ms=20)
+            await server.start()
+            try:
+                report = await load_test(port=server.port, n_requests=200, concurrency=16)
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                ok = await _post_json(reader, writer, "127.0.0.1", "/predict", patient)
+                bad = await _post_json(reader, writer, "127.0.0.1", "/predict", {"Age": 50})
+                writer.close()
+                return report, ok, bad, await fetch_metrics(port=server.port)
+            finally:
+                await server.stop()
+
+        report, (ok_status, ok_body), (bad_status, _), metrics = asyncio.run(scenario())
+
+        assert report["statuses"] == {200: 200}
+        assert ok_status == 200 and bad_status == 400
+        expected = compiled_forest.predict_proba(np.array([list(patient.values())]))[0]
+        assert ok_body["risk"] == compiled_forest.classes_[np.argmax(expected)]
+        assert list(ok_body["probabilities"].values()) == expected.tolist()
+        assert metrics["requests"] == 202 and metrics["errors"] == 1
+        assert metrics["mean_batch_size"] > 1
+        assert metrics["latency_p99_ms"] >= metrics["latency_p50_ms"] > 0
+
+    @pytest.mark.unit
+    def test_bad_requests_get_400_responses(self, compiled_forest):
+        """Test non-numeric features and malformed requests are answered with 400, not dropped."""
+        from scoring_server import ScoringServer, _post_json
+        from synthetic_data import FEATURE_COLUMNS, generate_cohort
+
+        patient = generate_cohort(1, seed=7)[FEATURE_COLUMNS].iloc[0].astype(float).to_dict()
+
+        async def scenario():
+            server = ScoringServer(compiled_forest, port=0)
+            await server.start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                responses = [await _post_json(reader, writer, "127.0.0.1", "/predict", dict(patient, **bad))
+                             for bad in [{"Age": None}, {"Age": "old"}, {"Age": [50]}, {"Age": float("nan")},
+                                         {"Heart_Rate": True}, {"Age": "1e400"}, {}]]
+                writer.close()
+
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                writer.write(b"GARBAGE\r\n\r\n")
+                await writer.drain()
+                malformed = await reader.read()
+                writer.close()
+                return responses, malformed
+            finally:
+                await server.stop()
+
+        responses, malformed = asyncio.run(scenario())
+
+        *rejected, (ok_status, _) = responses
+        assert [status for status, _ in rejected] == [400] * 6
+        for (_, body), name in zip(rejected, ["Age", "Age", "Age", "Age", "Heart_Rate", "Age"]):
+            assert name in body["error"]
+        assert ok_status == 200, "the connection should survive bad requests"
+        assert malformed.startswith(b"HTTP/1.1 400 Bad Request")
+        assert b"Connection: close" in malformed
+
+    @pytest.mark.unit
+    def test_server_built_outside_event_loop(self, compiled_forest):
+        """Test a server constructed before asyncio.run (as main() does) serves on each new loop."""
+        from scoring_server import ScoringServer, _post_json
+        from synthetic_data import FEATURE_COLUMNS, generate_cohort
+
+        patient = generate_cohort(1, seed=7)[FEATURE_COLUMNS].iloc[0].astype(float).to_dict()
+        server = ScoringServer(compiled_forest, port=0)
+
+        async def scenario():
+            await server.start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                status, _ = await asyncio.wait_for(
+                    _post_json(reader, writer, "127.0.0.1", "/predict", patient), timeout=10)
+                writer.close()
+                return status
+            finally:
+                await server.stop()
+
+        assert asyncio.run(scenario()) == 200
+        server.port = 0
+        assert asyncio.run(scenario()) == 200
@@ -0,0 +1,218 @@
+"""Unit tests for Streamlit-free synthetic cohort generation."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestRiskKernel:
+    """Test the vectorized risk scoring kernel."""
+
+    @pytest.mark.unit
+    def test_kernel_matches_reference_loop(self):
+        """Test that vectorized scores match the original per-patient rules."""
+        from synthetic_data import categorize_risk, compute_risk_scores
+
+        rng = np.random.default_rng(0)
+        n = 2000
+        age = rng.integers(18, 85, n)
+        hr = rng.normal(75, 12, n).astype(int)
+        sbp = rng.normal(120, 15, n).astype(int)
+        dbp = rng.normal(80, 10, n).astype(int)
+        bs = rng.normal(100, 20, n).astype(int)
+
+        expected_scores = []
+        expected_categories = []
+        for i in range(n):
+            score = 0
+            if age[i] > 65:
+                score += 2
+            if hr[i] > 100 or hr[i] < 60:
+                score += 1
+            if sbp[i] > 140:
+                score += 2
+            if dbp[i] > 90:
+                score += 1
+            if bs[i] > 126:
+                score += 1
+            expected_scores.append(score)
+            if score <= 1:
+                expected_categories.append("Low Risk")
+            elif score <= 3:
+                expected_categories.append("Medium Risk")
+            else:
+                expected_categories.append("High Risk")
+
+        scores = compute_risk_scores(age, hr, sbp, dbp, bs)
+        assert scores.tolist() == expected_scores
+        assert categorize_risk(scores).tolist() == expected_categories
+
+
+class TestCohortStreaming:
+    """Test chunked cohort streaming."""
+
+    @pytest.mark.unit
+    def test_output_independent_of_chunk_size(self):
+        """Test that concatenated chunks do not depend on chunk size."""
+        import pandas as pd
+
+        from synthetic_data import BLOCK_SIZE, iter_cohort_chunks
+
+        n = BLOCK_SIZE + 500
+        whole = pd.concat(iter_cohort_chunks(n, chunk_size=n, seed=7))
+        pieces = pd.concat(iter_cohort_chunks(n, chunk_size=9_999, seed=7))
+
+        pd.testing.assert_frame_equal(whole, pieces)
+        assert whole["Patient_ID"].iloc[0] == "P001"
+
+    @pytest.mark.unit
+    def test_csv_sink_writes_all_rows(self, tmp_path):
+        """Test that the CSV sink writes every streamed patient once."""
+        import pandas as pd
+
+        from synthetic_data import write_cohort_csv
+
+        path = tmp_path / "cohort.csv"
+        assert write_cohort_csv(path, 250, chunk_size=100) == 250
+
+        df = pd.read_csv(path)
+        assert len(df) == 250
+        assert df["Patient_ID"].is_unique
+
+
+class TestParallelGeneration:
+    """Test process-pool cohort generation."""
+
+    @pytest.mark.unit
+    def test_identical_for_any_worker_count(self):
+        """Test that sharded generation matches serial and streamed output."""
+        import pandas as pd
+
+        from synthetic_data import BLOCK_SIZE, generate_cohort, iter_cohort_chunks
+
+        n = 2 * BLOCK_SIZE + 123
+        serial = generate_cohort(n, seed=3)
+        parallel = generate_cohort(n, seed=3, n_jobs=3)
+        streamed = pd.concat(iter_cohort_chunks(n, chunk_size=50_000, seed=3))
+
+        pd.testing.assert_frame_equal(serial, parallel)
+        pd.testing.assert_frame_equal(serial, streamed)
+
+    @pytest.mark.unit
+    def test_global_rng_state_untouched(self):
+        """Test that generation leaves the global NumPy RNG alone."""
+        from synthetic_data import generate_cohort
+
+        np.random.seed(123)
+        before = np.random.get_state()[1].copy()
+        generate_cohort(50, seed=1)
+        assert np.array_equal(np.random.get_state()[1], before)
+
+    @pytest.mark.unit
+    def test_resolve_n_jobs(self):
+        """Test the shared n_jobs convention: None/0 run serially, negative uses every core."""
+        from synthetic_data import resolve_n_jobs
+
+        assert resolve_n_jobs(None) == resolve_n_jobs(0) == 1
+        assert resolve_n_jobs(3) == 3
+        assert resolve_n_jobs(-1) == (os.cpu_count() or 1)
+
+
+class TestVirtualCohort:
+    """Test counter-based random-access cohorts."""
+
+    @pytest.mark.unit
+    def test_random_access_matches_range(self):
+        """Test that single patients and sub-ranges match a larger range."""
+        import pandas as pd
+
+        from synthetic_data import VirtualCohort
+
+        cohort = VirtualCohort(seed=11)
+        block = cohort.rows(1_000, 1_200)
+
+        pd.testing.assert_frame_equal(cohort[1_050:1_060], block.iloc[50:60])
+        pd.testing.assert_series_equal(cohort.patient(1_199), block.iloc[-1])
+        assert cohort.patient(999_999_999)["Patient_ID"] == "P1000000000"
+
+    @pytest.mark.unit
+    def test_vitals_follow_cohort_distributions(self):
+        """Test that virtual patients follow the generator's distributions."""
+        from synthetic_data import RISK_CATEGORIES, VirtualCohort
+
+        df = VirtualCohort(seed=5).rows(0, 50_000)
+
+        assert df["Age"].between(18, 84).all()
+        assert abs(df["Heart_Rate"].mean() - 74.5) < 0.5
+        assert abs(df["Systolic_BP"].std() - 15) < 0.5
+        assert set(df["Risk_Category"]) <= set(RISK_CATEGORIES)
+
+
+class TestCompactCohort:
+    """Test the compact cohort representation."""
+
+    @pytest.mark.unit
+    def test_compact_matches_standard_values(self):
+        """Test that compact frames hold the same values in narrow dtypes."""
+        import pandas as pd
+
+        from synthetic_data import frame_patient_ids, generate_cohort, memory_footprint, to_compact
+
+        standard = generate_cohort(1_000, seed=9)
+        compact = generate_cohort(1_000, seed=9, compact=True)
+
+        pd.testing.assert_frame_equal(compact, to_compact(standard))
+        assert compact["Age"].dtype == np.int8
+        assert compact["Temperature"].dtype == np.float32
+        assert compact["Risk_Category"].astype(str).tolist() == standard["Risk_Category"].tolist()
+        assert frame_patient_ids(compact) == standard["Patient_ID"].tolist()
+        assert memory_footprint(compact) < memory_footprint(standard) / 4
+
+    @pytest.mark.unit
+    def test_feature_matrix_is_float32(self):
+        """Test that the feature matrix stays float32 through scaling."""
+        from sklearn.preprocessing import StandardScaler
+
+        from synthetic_data import FEATURE_COLUMNS, feature_matrix, generate_cohort
+
+        X = feature_matrix(generate_cohort(200, compact=True))
+        assert X.shape == (200, len(FEATURE_COLUMNS))
+        assert StandardScaler().fit_transform(X).dtype == np.float32
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_tiny_cohorts_have_requested_size(self, compact):
+        """Test that 0-2 patient cohorts return exactly the rows requested, with the usual dtypes."""
+        from synthetic_data import generate_cohort
+
+        reference = generate_cohort(3, compact=compact)
+        for n_patients in [0, 1, 2]:
+            df = generate_cohort(n_patients, compact=compact)
+            assert len(df) == n_patients
+            assert df.dtypes.equals(reference.dtypes)
+            assert df.equals(reference.iloc[:n_patients])
+        with pytest.raises(ValueError):
+            generate_cohort(-1)
+
+
+class TestCohortExtension:
+    """Test incremental cohort extension."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_extension_equals_fresh_generation(self, compact):
+        """Test that extending continues the RNG substreams exactly."""
+        import pandas as pd
+
+        from synthetic_data import BLOCK_SIZE, extend_cohort, generate_cohort
+
+        base = generate_cohort(BLOCK_SIZE - 100, seed=2, compact=compact)
+        extended = extend_cohort(extend_cohort(base, 150), 50)
+
+        pd.testing.assert_frame_equal(extended, generate_cohort(BLOCK_SIZE + 100, seed=2, compact=compact))
+        assert extended.attrs["cohort_stream"]["position"] == BLOCK_SIZE + 100
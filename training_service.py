@@ -0,0 +1,134 @@
+"""
+Background training service for the clinical risk model.
+
+Models are keyed by a hash of the training dataset and hyperparameters.
+Each key is trained once per process on a background thread; callers poll
+the returned job for progress and get the finished result instantly on
+every later request. With a model registry, cold starts load a previously
+registered model for the same training data instead of training one.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from medical_ai_core import DEFAULT_MODEL_PARAMS, evaluate_predictions, split_dataset, train_risk_model
+from metrics_engine import ThresholdCurve, bootstrap_confusion
+from model_registry import training_data_hash
+from synthetic_data import FEATURE_COLUMNS
+
+
+def dataset_hash(df):
+    """Return a stable content hash of a cohort's features and labels."""
+    hashed = pd.util.hash_pandas_object(df[FEATURE_COLUMNS + ["Risk_Category"]], index=False)
+    return hashlib.sha256(hashed.to_numpy().tobytes()).hexdigest()[:16]
+
+
+class TrainingJob:
+    """Handle to one (dataset, hyperparameters) training run."""
+
+    def __init__(self, key, params):
+        self.key = key
+        self.params = params
+        self.status = "pending"
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.source = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until training finishes; return the result (None on timeout)."""
+        self._done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _run(self, df, test_size, random_state, registry):
+        self.status = "running"
+        self.started_at = time.time()
+        try:
+            X_train, X_test, y_train, y_test = split_dataset(df, test_size=test_size, random_state=random_state)
+            data_hash = training_data_hash(X_train, y_train)
+            registered = registry.find(data_hash, self.params) if registry is not None else None
+
+            if registered is not None:
+                risk_model = registered.risk_model
+                self.source = "registry"
+            else:
+                risk_model = train_risk_model(X_train, y_train, progress=self._set_progress, **self.params)
+                self.source = "trained"
+
+            # Held-out probabilities are kept so threshold changes never re-run the forest
+            y_proba = risk_model.predict_proba(X_test)
+            y_pred = risk_model.classes_[y_proba.argmax(axis=1)]
+            metrics = evaluate_predictions(y_test, y_pred)
+            if registry is not None and registered is None:
+                registered = registry.save(risk_model, data_hash=data_hash, params=self.params, metrics=metrics)
+
+            self.result = {
+                "risk_model": risk_model,
+                "registered_model": registered,
+                "X_test": X_test,
+                "y_test": y_test,
+                "y_pred": y_pred,
+                "y_proba": y_proba,
+                "metrics": metrics,
+                "confidence_intervals": bootstrap_confusion(metrics["confusion_matrix"], metrics["labels"]),
+                "threshold_curve": (ThresholdCurve(y_test, y_proba, risk_model.classes_.tolist())
+                                    if "High Risk" in risk_model.classes_ else None),
+            }
+            self.status = "done"
+        except Exception as e:
+            self.error = e
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+            self.progress = 1.0
+            self._done.set()
+
+    def _set_progress(self, fraction):
+        self.progress = fraction
+
+
+class TrainingService:
+    """Train each (dataset, hyperparameters) combination once per process."""
+
+    def __init__(self, max_workers=1, registry=None):
+        self.registry = registry
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="risk-model-training")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def job_key(df, test_size=0.3, random_state=42, **params):
+        """Return the cache key for a dataset and hyperparameters."""
+        spec = {"data": dataset_hash(df), "test_size": test_size, "random_state": random_state,
+                "params": dict(DEFAULT_MODEL_PARAMS, **params)}
+        return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+    def submit(self, df, test_size=0.3, random_state=42, **params):
+        """Start training in the background, or return the existing job."""
+        key = self.job_key(df, test_size, random_state, **params)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.status == "failed":
+                job = TrainingJob(key, params)
+                self._jobs[key] = job
+                self._executor.submit(job._run, df, test_size, random_state, self.registry)
+        return job
+
+    def jobs(self):
+        """Return all known training jobs."""
+        with self._lock:
+            return list(self._jobs.values())